@@ -2,37 +2,87 @@ import eel
 import os
 import subprocess
 import datetime
-import re
-import screen_brightness_control as sbc
+import math
 import threading
-import time
-import keyboard
-from googletrans import Translator
-from gtts import gTTS
 import tempfile
-import pygame
-import psutil
-import requests
-import pyjokes
+from concurrent.futures import ThreadPoolExecutor
+from tts import ENGINES, AudioCache, Speaker
+from translation import TranslationCache
+from intents import ASSISTANT_ENTITIES, ASSISTANT_INTENTS, IntentRouter
+from response_cache import ResponseCache
+from chat_history import ChatHistory
+from telemetry import TelemetrySampler
+from ui_channel import UiChannel
+from startup import Lazy, startup
+
+startup.mark("assistant imports")
 
 # -------------------- Initialize --------------------
-eel.init("web")
+# pygame, googletrans, pyjokes, screen_brightness_control, keyboard and
+# requests are imported where they're first used, and the objects below
+# that start threads or touch the disk are built on first use (Lazy), so
+# importing this module does neither
 
 VOLUME_STEP = 0.1
 BRIGHTNESS_STEP = 10
 CHROME_PATH = r"C:/Program Files/Google/Chrome/Application/chrome.exe"
+TTS_ENGINE = os.environ.get("ASSISTANT_TTS_ENGINE", "gtts")   # gtts, espeak or silence (offline)
+TTS_CACHE_DIR = os.path.join(tempfile.gettempdir(), "assistant_tts_cache")
+TRANSLATION_CACHE_PATH = os.path.join(tempfile.gettempdir(), "assistant_translations.json")
+RESPONSE_CACHE_PATH = os.path.join(tempfile.gettempdir(), "assistant_responses.json")
+CHAT_HISTORY_PATH = os.path.join(tempfile.gettempdir(), "assistant_chat.jsonl")
+CHAT_HISTORY_RING = 200      # newest turns kept in memory; the rest are paged from disk
+CHAT_PAGE_LIMIT = 100        # most turns one getHistory call returns
+DEFAULT_CITY = "Bangalore"
+WEATHER_TTL = 10 * 60        # seconds served fresh; stale copies are served up to
+NEWS_TTL = 15 * 60           # MAX_STALE while a background refresh runs
+MAX_STALE = 6 * 60 * 60
+PREFETCH_ON_START = True
+TELEMETRY_INTERVAL = 2.0     # seconds between CPU/RAM/battery samples
+TELEMETRY_WINDOW = 5 * 60    # seconds of samples kept
+SHUTDOWN_SPEECH_TIMEOUT = 10.0   # seconds the goodbye may take before the app exits anyway
+STARTUP_REPORT = bool(os.environ.get("ASSISTANT_STARTUP_REPORT"))   # set by --startup-report
 
-mic_active = False
-translator = Translator()
+# every call into the page goes through here, fire-and-forget, in order
+ui = Lazy(lambda: UiChannel(eel).start())
+# googletrans is loaded by the first non-English lookup
+translations = Lazy(lambda: TranslationCache(path=TRANSLATION_CACHE_PATH))
 selected_lang = "en"
+speaker = Lazy(lambda: Speaker(ENGINES[TTS_ENGINE](), AudioCache(TTS_CACHE_DIR)))
+# GESTURE_PID is set by hand_gesture.py when it launches the assistant
+telemetry = TelemetrySampler(interval=TELEMETRY_INTERVAL, window=TELEMETRY_WINDOW)
+# what the chat window shows; the page asks for it a page at a time
+history = Lazy(lambda: ChatHistory(CHAT_HISTORY_PATH, capacity=CHAT_HISTORY_RING))
 
 # -------------------- API Keys --------------------
 OPENWEATHER_KEY = ""   # Put your valid Weather API key here
 NEWSAPI_KEY = ""        # Put your News API key here
 
+# -------------------- HTTP / Workers --------------------
+# Pooled connections, (connect, read) timeouts and in-flight limits per service;
+# CHAT_BASE_URL, WEATHER_BASE_URL and NEWS_BASE_URL override the hosts
+def make_http():
+    from http_client import HttpClient, Service   # imports requests
+    return HttpClient([
+        Service("chat", "https://api-inference.huggingface.co", timeout=(3.05, 20.0), max_concurrency=2),
+        Service("weather", "https://api.openweathermap.org", timeout=(3.05, 5.0), max_concurrency=2),
+        Service("news", "https://newsapi.org", timeout=(3.05, 5.0), max_concurrency=2),
+    ])
+
+http = Lazy(make_http)
+# chat handlers run here so eel's thread is never held by a slow service
+handlers = ThreadPoolExecutor(max_workers=4, thread_name_prefix="assistant")
+
+def service_errors():
+    # network failures, timeouts, bad status codes and unexpected JSON
+    # shapes; an except clause only evaluates this once something was raised
+    import requests
+    return (requests.RequestException, ValueError, LookupError, TypeError, AttributeError)
+
 # -------------------- Helper: Cross-platform Volume --------------------
 def change_volume(action, percent_value=None):
     try:
+        import pygame
         # Initialize mixer once
         pygame.mixer.init()
         current = pygame.mixer.music.get_volume()
@@ -53,144 +103,194 @@ def change_volume(action, percent_value=None):
         return f"Unable to control volume ({e})"
 
 # -------------------- Language --------------------
+STATUS_TEMPLATE = "CPU: {cpu}% (avg {cpu_avg}% over the last minute, {cpu_trend}) | RAM: {ram}% | Battery: {battery}"
+GESTURE_STATUS = " | Gesture control: {gesture_cpu}% CPU, {gesture_rss} MB"
+
+# Fixed responses, pre-translated when the language changes
+RESPONSE_TEMPLATES = [
+    "Hello! I am ready to assist you.",
+    "Hello! How can I help you today?",
+    "Goodbye! Shutting down...",
+    "The current time is {time}",
+    "Today's date is {date}",
+    "Today is {day}",
+    "Searching for {query}...",
+    "Please specify what to search for.",
+    "Opening {name}...",
+    "Failed to open {name}.",
+    "Sorry, I don't recognize that app.",
+    "Volume up",
+    "Volume down",
+    "Volume muted",
+    "Brightness increased",
+    "Brightness decreased",
+    "The weather in {city} is {desc} with {temp}°C.",
+    "Weather not available (no API key).",
+    "Couldn't fetch weather right now.",
+    "Weather service unavailable.",
+    "News not available (no API key).",
+    "No news available right now.",
+    "News service unavailable.",
+    STATUS_TEMPLATE,
+    STATUS_TEMPLATE + GESTURE_STATUS,
+    "You said: {msg}",
+    "Sorry, something went wrong.",
+]
+
 @eel.expose
 def setLanguage(lang_code):
     global selected_lang
     selected_lang = lang_code
+    translations.warm(lang_code, RESPONSE_TEMPLATES)
 
 # -------------------- AI Chat (Hugging Face) --------------------
 def ai_chat(prompt):
     try:
-        url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
         headers = {"Authorization": "Bearer YOUR_HF_API_KEY"}
         payload = {"inputs": prompt}
-        response = requests.post(url, headers=headers, json=payload)
-        return response.json()[0]['generated_text']
-    except:
+        data = http.post_json("chat", "/models/microsoft/DialoGPT-medium", payload, headers=headers)
+        return data[0]['generated_text']
+    except service_errors():
         return "Sorry, I can’t chat right now."
 
 # -------------------- Main Chat Logic --------------------
+router = IntentRouter(ASSISTANT_INTENTS, ASSISTANT_ENTITIES)
+
+APP_COMMANDS = {
+    "chrome": (CHROME_PATH, "Chrome"),
+    "explorer": ("explorer" if os.name == "nt" else "xdg-open ~", "File Explorer"),
+    "notepad": ("notepad" if os.name == "nt" else "gedit", "Notepad"),
+    "calculator": ("calc" if os.name == "nt" else "gnome-calculator", "Calculator"),
+}
+
 @eel.expose
 def getUserInput(msg):
-    msg_lower = msg.lower().strip()
+    # returns the turn's history id, so the page can page around it
+    speaker.cancel()   # a new command cuts off whatever is still being said
+    turn_id = history.append("user", msg)
+    handlers.submit(handle_input, msg).add_done_callback(handler_done)
+    return turn_id
+
+def handler_done(future):
+    error = future.exception()
+    if error:
+        print(f"Handler error: {error!r}")
+        sendResponse("Sorry, something went wrong.")
+
+def handle_input(msg):
+    route = router.route(msg)
+    intent, slots = route.intent, route.slots
+    percent_value = slots.get("percent")
     response = ""
+    values = {}
 
     # Time / Date / Day
-    if any(word in msg_lower for word in ["time", "date", "day"]):
+    if intent in ("time", "date", "day"):
+        now = datetime.datetime.now()
         parts = []
-        if "time" in msg_lower:
-            parts.append(f"The current time is {datetime.datetime.now().strftime('%H:%M:%S')}")
-        if "date" in msg_lower:
-            parts.append(f"Today's date is {datetime.datetime.now().strftime('%Y-%m-%d')}")
-        if "day" in msg_lower:
-            parts.append(f"Today is {datetime.datetime.now().strftime('%A')}")
+        if "time" in route.intents:
+            parts.append("The current time is {time}")
+            values["time"] = now.strftime('%H:%M:%S')
+        if "date" in route.intents:
+            parts.append("Today's date is {date}")
+            values["date"] = now.strftime('%Y-%m-%d')
+        if "day" in route.intents:
+            parts.append("Today is {day}")
+            values["day"] = now.strftime('%A')
         response = ", ".join(parts)
 
-    elif "exit" in msg_lower or "bye" in msg_lower:
-        response = "Goodbye! Shutting down..."
-        sendResponse(response)
+    elif intent == "exit":
+        # the goodbye is spoken to the end (or for SHUTDOWN_SPEECH_TIMEOUT at
+        # most) before the window closes and the process exits
+        spoken = threading.Event()
+        sendResponse("Goodbye! Shutting down...", on_done=spoken.set)
         def shutdown():
-            time.sleep(1)
-            try:
-                eel.close_window()
-            except:
-                pass
+            translations.save()
+            spoken.wait(SHUTDOWN_SPEECH_TIMEOUT)
+            ui.send("close_window")
+            ui.close()   # returns once close_window has gone out
             os._exit(0)
         threading.Thread(target=shutdown, daemon=True).start()
         return
 
     # Web Search
-    elif "search" in msg_lower:
-        query = msg_lower.replace("search", "").replace("for", "").strip()
+    elif intent == "search":
+        query = slots.get("query")
         if query:
             subprocess.Popen(["xdg-open", f"https://www.google.com/search?q={query}"])
-            response = f"Searching for {query}..."
+            response = "Searching for {query}..."
+            values["query"] = query
         else:
             response = "Please specify what to search for."
 
     # Open Apps
-    elif "open" in msg_lower:
-        if "chrome" in msg_lower:
-            openApp(CHROME_PATH, "Chrome")
+    elif intent == "open":
+        if slots.get("app") in APP_COMMANDS:
+            openApp(*APP_COMMANDS[slots["app"]])
             return
-        elif "file explorer" in msg_lower or "explorer" in msg_lower:
-            openApp("explorer" if os.name == "nt" else "xdg-open ~", "File Explorer")
-            return
-        elif "notepad" in msg_lower:
-            openApp("notepad" if os.name == "nt" else "gedit", "Notepad")
-            return
-        elif "calculator" in msg_lower:
-            openApp("calc" if os.name == "nt" else "gnome-calculator", "Calculator")
-            return
-        else:
-            response = "Sorry, I don't recognize that app."
+        response = "Sorry, I don't recognize that app."
 
-    elif "weather" in msg_lower:
-        response = get_weather("Bangalore")
-    elif "news" in msg_lower:
+    elif intent == "weather":
+        response, values = get_weather(DEFAULT_CITY)
+    elif intent == "news":
         response = get_news()
-    elif "joke" in msg_lower:
+    elif intent == "joke":
+        import pyjokes
         response = pyjokes.get_joke()
-    elif "status" in msg_lower or "system" in msg_lower:
-        response = get_system_status()
+    elif intent == "status":
+        response, values = get_system_status()
 
     # Volume / Brightness
+    elif intent == "volume_up":
+        response = change_volume("up", percent_value)
+    elif intent == "volume_down":
+        response = change_volume("down", percent_value)
+    elif intent == "mute":
+        response = change_volume("mute")
+    elif intent == "brightness_up":
+        import screen_brightness_control as sbc
+        step = percent_value if percent_value else BRIGHTNESS_STEP
+        current = sbc.get_brightness(display=0)[0]
+        sbc.set_brightness(min(100, current + step))
+        response = "Brightness increased"
+    elif intent == "brightness_down":
+        import screen_brightness_control as sbc
+        step = percent_value if percent_value else BRIGHTNESS_STEP
+        current = sbc.get_brightness(display=0)[0]
+        sbc.set_brightness(max(0, current - step))
+        response = "Brightness decreased"
+    elif intent == "hello":
+        response = "Hello! How can I help you today?"
     else:
-        match = re.search(r'(\d+)%?', msg_lower)
-        percent_value = int(match.group(1)) if match else None
-
-        if "volume up" in msg_lower or "increase volume" in msg_lower:
-            response = change_volume("up", percent_value)
-        elif "volume down" in msg_lower or "decrease volume" in msg_lower:
-            response = change_volume("down", percent_value)
-        elif "mute" in msg_lower:
-            response = change_volume("mute")
-        elif "brightness up" in msg_lower:
-            step = percent_value if percent_value else BRIGHTNESS_STEP
-            current = sbc.get_brightness(display=0)[0]
-            sbc.set_brightness(min(100, current + step))
-            response = "Brightness increased"
-        elif "brightness down" in msg_lower:
-            step = percent_value if percent_value else BRIGHTNESS_STEP
-            current = sbc.get_brightness(display=0)[0]
-            sbc.set_brightness(max(0, current - step))
-            response = "Brightness decreased"
-        elif "hello" in msg_lower:
-            response = "Hello! How can I help you today?"
-        else:
-            response = f"You said: {msg}"
+        response = "You said: {msg}"
+        values["msg"] = msg
 
-    sendResponse(response)
+    sendResponse(response, **values)
 
 # -------------------- Send Response --------------------
-def sendResponse(text):
+def sendResponse(text, on_done=None, **values):
+    # `text` may be a template from RESPONSE_TEMPLATES with its `values`;
+    # on_done runs once it has been spoken (or cut off)
     try:
-        translated = translator.translate(text, dest=selected_lang).text
-        eel.addMsgToChat(translated)
-
-        eel.stopListening()()
-        speak_with_gtts(translated, selected_lang)
-        eel.startListening()()
+        translated = translations.format(text, selected_lang, **values)
     except Exception:
-        eel.addMsgToChat(text)
-
-# -------------------- gTTS TTS --------------------
-def speak_with_gtts(text, lang):
-    try:
-        tmp_path = os.path.join(tempfile.gettempdir(), "assistant_tts.mp3")
-        tts = gTTS(text=text, lang=lang)
-        tts.save(tmp_path)
+        text = text.format(**values) if values else text
+        ui.send("addMsgToChat", text, history.append("bot", text))
+        if on_done:
+            on_done()
+        return
+    ui.send("addMsgToChat", translated, history.append("bot", translated))
+    # queued on the speaker thread; returns before any audio is synthesized.
+    # The mic is closed while this utterance plays.
+    token = object()
 
-        pygame.mixer.init()
-        pygame.mixer.music.load(tmp_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+    def spoken():
+        ui.speech_ended(token)
+        if on_done:
+            on_done()
 
-        pygame.mixer.quit()
-        os.remove(tmp_path)
-    except Exception as e:
-        print(f"TTS error: {e}")
+    speaker.say(translated, selected_lang,
+                on_start=lambda: ui.speech_started(token), on_done=spoken)
 
 # -------------------- Open App --------------------
 def openApp(path_or_cmd, name):
@@ -199,71 +299,122 @@ def openApp(path_or_cmd, name):
             os.startfile(path_or_cmd)
         else:  # Linux
             subprocess.Popen(path_or_cmd, shell=True)
-        sendResponse(f"Opening {name}...")
+        sendResponse("Opening {name}...", name=name)
     except Exception:
-        sendResponse(f"Failed to open {name}.")
+        sendResponse("Failed to open {name}.", name=name)
 
 # -------------------- Extra Feature Functions --------------------
+# get_weather and get_system_status return (template, values) for sendResponse
+def fetch_weather(city):
+    params = {"q": city, "appid": OPENWEATHER_KEY, "units": "metric"}
+    data = http.get_json("weather", "/data/2.5/weather", params=params)
+    return {"temp": data["main"]["temp"], "desc": data["weather"][0]["description"]}
+
 def get_weather(city):
     if not OPENWEATHER_KEY:
-        return "Weather not available (no API key)."
+        return "Weather not available (no API key).", {}
     try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_KEY}&units=metric"
-        data = requests.get(url).json()
-        if data.get("main"):
-            temp = data["main"]["temp"]
-            desc = data["weather"][0]["description"]
-            return f"The weather in {city} is {desc} with {temp}°C."
-        else:
-            return "Couldn't fetch weather right now."
-    except:
-        return "Weather service unavailable."
+        weather = responses.get("weather", city)
+    except LookupError:
+        return "Couldn't fetch weather right now.", {}
+    except service_errors():
+        return "Weather service unavailable.", {}
+    return "The weather in {city} is {desc} with {temp}°C.", {"city": city, **weather}
+
+def fetch_news():
+    params = {"country": "in", "apiKey": NEWSAPI_KEY}
+    data = http.get_json("news", "/v2/top-headlines", params=params)
+    return [a["title"] for a in data.get("articles", [])[:3]]
 
 def get_news():
     if not NEWSAPI_KEY:
         return "News not available (no API key)."
     try:
-        url = f"https://newsapi.org/v2/top-headlines?country=in&apiKey={NEWSAPI_KEY}"
-        data = requests.get(url).json()
-        articles = data.get("articles", [])[:3]
-        if articles:
-            headlines = [f"{i+1}. {a['title']}" for i, a in enumerate(articles)]
-            return "Top News:\n" + "\n".join(headlines)
-        else:
-            return "No news available right now."
-    except:
+        titles = responses.get("news")
+    except service_errors():
         return "News service unavailable."
+    if titles:
+        headlines = [f"{i+1}. {title}" for i, title in enumerate(titles)]
+        return "Top News:\n" + "\n".join(headlines)
+    else:
+        return "No news available right now."
+
+# Weather and news only change every few minutes
+def make_responses():
+    cache = ResponseCache(path=RESPONSE_CACHE_PATH)
+    cache.register("weather", fetch_weather, ttl=WEATHER_TTL, max_stale=MAX_STALE)
+    cache.register("news", fetch_news, ttl=NEWS_TTL, max_stale=MAX_STALE)
+    return cache
+
+responses = Lazy(make_responses)
+
+@eel.expose
+def getCacheStats():
+    # {provider: {hits, stale_hits, misses, refreshes, errors}}
+    return responses.stats()
 
 def get_system_status():
-    cpu = psutil.cpu_percent()
-    ram = psutil.virtual_memory().percent
-    battery = psutil.sensors_battery()
-    if battery:
-        return f"CPU: {cpu}% | RAM: {ram}% | Battery: {battery.percent}%"
-    else:
-        return f"CPU: {cpu}% | RAM: {ram}% | Battery: N/A"
+    # answered from the sampler's ring buffer
+    if telemetry.latest() is None:
+        telemetry.sample()   # asked before the first tick, or before main() started it
+    latest = telemetry.latest()
+    battery = latest["battery"]
+    values = {
+        "cpu": round(latest["cpu"]),
+        "cpu_avg": round(telemetry.average("cpu", 60)),
+        "cpu_trend": telemetry.trend("cpu", 60),
+        "ram": round(latest["ram"]),
+        "battery": "N/A" if math.isnan(battery) else f"{round(battery)}%",
+    }
+    template = STATUS_TEMPLATE
+    gesture_cpu = telemetry.average("gesture_cpu", 60)
+    if gesture_cpu is not None and not math.isnan(gesture_cpu) and not math.isnan(latest["gesture_rss_mb"]):
+        values["gesture_cpu"] = round(gesture_cpu)
+        values["gesture_rss"] = round(latest["gesture_rss_mb"])
+        template += GESTURE_STATUS
+    return template, values
+
+# -------------------- Chat History --------------------
+@eel.expose
+def getHistory(before=None, after=None, limit=50):
+    # [{id, t, sender, text}], oldest first: the newest turns, or the ones
+    # just before/after a turn id the page already has
+    return history.page(before=before, after=after, limit=max(0, min(int(limit), CHAT_PAGE_LIMIT)))
 
 # -------------------- Hotkeys --------------------
-def hotkey_listener():
-    global mic_active
-    keyboard.on_press_key("shift", lambda _: push_to_talk(True))
-    keyboard.on_release_key("shift", lambda _: push_to_talk(False))
-    while True:
-        time.sleep(1)
-
-def push_to_talk(active):
-    global mic_active
-    if active and not mic_active:
-        mic_active = True
-        eel.startListening()()
-    elif not active and mic_active:
-        mic_active = False
-        eel.stopListening()()
+# keyboard runs the hooks on its own listener thread; they only enqueue, and
+# auto-repeated presses are absorbed by the channel's mic state
+def register_hotkeys():
+    import keyboard
+    keyboard.on_press_key("shift", lambda _: ui.push_to_talk(True))
+    keyboard.on_release_key("shift", lambda _: ui.push_to_talk(False))
 
 # -------------------- Main --------------------
-if __name__ == "__main__":
-    threading.Thread(target=hotkey_listener, daemon=True).start()
-    def startup_greeting():
-        sendResponse("Hello! I am ready to assist you.")
-    threading.Timer(1.0, startup_greeting).start()
+page_ready = threading.Event()
+
+@eel.expose
+def uiReady():
+    # called by the page's onload; greets on the first load only
+    startup.mark("window on screen")
+    if page_ready.is_set():
+        return
+    page_ready.set()
+    sendResponse("Hello! I am ready to assist you.")
+
+def main():
+    # hand_gesture.py --assistant thread runs this on its main thread
+    if STARTUP_REPORT:
+        startup.print_on("window on screen")
+    with startup.phase("assistant init"):
+        eel.init("web")
+        telemetry.start()
+        register_hotkeys()
+        if PREFETCH_ON_START:
+            if OPENWEATHER_KEY:
+                responses.prefetch("weather", DEFAULT_CITY)
+            if NEWSAPI_KEY:
+                responses.prefetch("news")
     eel.start("index.html", size=(500, 650), block=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Cost of the chat history store as its log grows: startup (opening the
+# log and serving the newest page, which refills the ring from the tail),
+# paging back from deep in the log, paging forward, appending, and the
+# memory the ring holds. Logs of --turns sizes are written to a temp dir
+# with a few days' worth of kiosk-like chat.
+#
+#   python benchmarks/bench_chat_history.py [--turns 1000 100000 1000000] [--page 50]
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_history import ChatHistory  # noqa: E402
+
+REPLIES = ["Hello! I am ready to assist you.", "The time is 10:42 AM.",
+           "Top News:\n" + "\n".join(f"Headline number {i} about something" for i in range(5)),
+           "Volume set to 40%.", "CPU 12% (avg 9%, steady), RAM 48%, battery N/A."]
+
+
+def write_log(path, turns):
+    history = ChatHistory(path, capacity=1)
+    rng = random.Random(turns)
+    ids = []
+    for i in range(turns):
+        if i % 2:
+            ids.append(history.append("bot", rng.choice(REPLIES)))
+        else:
+            ids.append(history.append("user", f"what's the weather {i}"))
+    history.close()
+    return ids
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--ring", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_chat_history_")
+    print(f"ring {args.ring}, pages of {args.page}, median ms over {args.repeat} runs")
+    print(f"{'turns':>9} {'log MiB':>8} {'startup':>8} {'page back':>10} {'page fwd':>9} "
+          f"{'append':>8} {'ring KiB':>9}")
+    for turns in args.turns:
+        path = os.path.join(folder, f"chat_{turns}.jsonl")
+        ids = write_log(path, turns)
+        rng = random.Random(0)
+
+        def startup():
+            ChatHistory(path, capacity=args.ring).page(limit=args.page)
+
+        history = ChatHistory(path, capacity=args.ring)
+        tracemalloc.start()
+        history.page(limit=args.page)
+        ring_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        back = timed(lambda: history.page(before=rng.choice(ids), limit=args.page), args.repeat)
+        forward = timed(lambda: history.page(after=rng.choice(ids), limit=args.page), args.repeat)
+        append = timed(lambda: history.append("user", "what's the time"), args.repeat)
+        history.close()
+        print(f"{turns:9d} {os.path.getsize(path) / 2 ** 20:8.1f} {timed(startup, args.repeat):8.2f} "
+              f"{back:10.2f} {forward:9.2f} {append:8.3f} {ring_bytes / 1024:9.0f}")
+        os.remove(path)
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Gesture classifiers on synthetic hands: accuracy and per-frame cost of the
+# rules against the nearest-centroid model, trained the way
+# train_gestures.py trains it (one recorded session per gesture). THUMB is
+# a gesture the rules can't express, to show the model adding one.
+#
+#   python benchmarks/bench_classifier.py [--per-class 400] [--frames 20000]
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hand_gesture import CentroidClassifier, Gest, HLabel, RuleClassifier  # noqa: E402
+from make_fixtures import FIST, OPEN, hand_pose  # noqa: E402
+from replay import save_session  # noqa: E402
+from train_gestures import load_examples  # noqa: E402
+
+# an open hand is LAST4 to the rules (the thumb bit is never set)
+POSES = {
+    Gest.LAST4: dict(fingers=OPEN),
+    Gest.V_GEST: dict(fingers=(1, 1, 0, 0), spread=True),
+    Gest.TWO_FINGER_CLOSED: dict(fingers=(1, 1, 0, 0)),
+    Gest.MID: dict(fingers=(0, 1, 0, 0)),
+    Gest.INDEX: dict(fingers=(1, 0, 0, 0)),
+    Gest.FIST: dict(fingers=FIST),
+    Gest.PINCH_MAJOR: dict(fingers=OPEN, pinch=True),
+    Gest.THUMB: dict(fingers=FIST),
+}
+
+
+def sample(gesture, rng, noise=0.003):
+    size = rng.uniform(0.09, 0.15)
+    points = hand_pose(rng.uniform(0.3, 0.7), rng.uniform(0.4, 0.6), size=size, **POSES[gesture])
+    if gesture == Gest.THUMB:
+        # thumbs up: thumb straight above the folded fingers
+        for k in range(4):
+            points[1 + k] = points[5] + (-0.35 * size, -(0.1 + 0.3 * k) * size, 0.0)
+    # small roll about the wrist and an occasional mirrored (left) hand
+    angle = math.radians(rng.uniform(-12, 12))
+    rot = np.array([[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]])
+    xy = (points[:, :2] - points[0, :2]) @ rot.T
+    if rng.random() < 0.5:
+        xy[:, 0] *= -1
+    points[:, :2] = points[0, :2] + xy
+    return points + rng.normal(0.0, noise, points.shape).astype(np.float32)
+
+
+def make_set(per_class, seed):
+    rng = np.random.default_rng(seed)
+    coords, gestures = [], []
+    for gesture in POSES:
+        for _ in range(per_class):
+            coords.append(sample(gesture, rng))
+            gestures.append(int(gesture))
+    return np.array(coords, dtype=np.float32), np.array(gestures)
+
+
+def write_sessions(coords, gestures, directory):
+    # one single-hand session per gesture, as train_gestures.py expects
+    specs = []
+    for gesture in np.unique(gestures):
+        hands = coords[gestures == gesture]
+        landmarks = np.zeros((len(hands), 2, 21, 3), dtype=np.float32)
+        landmarks[:, 0] = hands
+        labels = np.full((len(hands), 2), -1, dtype=np.int8)
+        labels[:, 0] = 1
+        path = os.path.join(directory, f"{Gest(gesture).name.lower()}.npz")
+        save_session(path, np.arange(len(hands)) / 30.0, landmarks, labels,
+                     np.full((len(hands), 2), 0.95, dtype=np.float32))
+        specs.append(f"{path}={Gest(gesture).name}")
+    return specs
+
+
+def accuracy(classifier, coords, gestures):
+    predicted = np.array(classifier.classify(coords, [HLabel.MAJOR] * len(coords)))
+    per_class = {Gest(g).name: float((predicted[gestures == g] == g).mean()) for g in np.unique(gestures)}
+    return float((predicted == gestures).mean()), per_class
+
+
+def per_frame_us(classifier, coords, frames):
+    # two hands scored in one call per frame, as HandRecog.classify does
+    labels = [HLabel.MAJOR, HLabel.MINOR]
+    pairs = [coords[i:i + 2] for i in range(0, len(coords) - 1, 2)]
+    t0 = time.perf_counter()
+    for i in range(frames):
+        classifier.classify(pairs[i % len(pairs)], labels)
+    return (time.perf_counter() - t0) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-class", type=int, default=400)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    train_coords, train_gestures = make_set(args.per_class, seed=1)
+    test_coords, test_gestures = make_set(args.per_class, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        coords, gestures = load_examples(write_sessions(train_coords, train_gestures, tmp))
+        path = os.path.join(tmp, "model.npz")
+        CentroidClassifier.fit(coords, gestures).save(path)
+        model = CentroidClassifier.load(path)
+        backed = CentroidClassifier.load(path, fallback=RuleClassifier())
+
+    # the rules can't emit THUMB; score them on the gestures they know too
+    known = test_gestures != Gest.THUMB
+    for name, classifier in (("rules", RuleClassifier()), ("centroid", model),
+                             ("centroid + rules", backed)):
+        total, per_class = accuracy(classifier, test_coords, test_gestures)
+        known_acc, _ = accuracy(classifier, test_coords[known], test_gestures[known])
+        us = per_frame_us(classifier, test_coords, args.frames)
+        print(f"{name:<17} {us:6.1f} us/frame (2 hands) | accuracy {total:6.1%}, "
+              f"without THUMB {known_acc:6.1%} | THUMB {per_class['THUMB']:6.1%}")
+    _, per_class = accuracy(backed, test_coords, test_gestures)
+    print("centroid + rules per class: " + ", ".join(f"{k} {v:.0%}" for k, v in per_class.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Per-frame cost of GestureController.classify_hands against the original
+# MessageToDict version, plus how often each one swaps major/minor when
+# MediaPipe flips the handedness labels of two hands that haven't moved.
+#
+#   python benchmarks/bench_classify_hands.py [--frames 20000]
+
+import argparse
+import os
+import random
+import sys
+import time
+from functools import partial
+
+from google.protobuf.json_format import MessageToDict
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_gesture import GestureController  # noqa: E402
+from input_backends import NullInput  # noqa: E402
+from system_controls import MemorySystemControls  # noqa: E402
+
+
+class NoCamera:
+    # just enough of cv2.VideoCapture to construct a GestureController
+    def get(self, prop):
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+class Results:
+    def __init__(self, multi_hand_landmarks, multi_handedness):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+
+
+def make_hand(cx, cy, label, score):
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for i in range(21):
+        landmarks.landmark.add(x=cx + 0.01 * (i % 5), y=cy - 0.01 * (i // 5), z=0.0)
+    handedness = classification_pb2.ClassificationList()
+    handedness.classification.add(index=0 if label == 'Left' else 1,
+                                  score=score, label=label)
+    return landmarks, handedness
+
+
+def make_frames(n, flip_rate, rng):
+    # right hand on the left of the mirrored image, left hand on the right;
+    # every so often MediaPipe gets both labels backwards for a frame
+    frames = []
+    for _ in range(n):
+        flip = rng.random() < flip_rate
+        right = make_hand(0.3 + rng.uniform(-0.01, 0.01), 0.5,
+                          'Left' if flip else 'Right', rng.uniform(0.8, 1.0))
+        left = make_hand(0.7 + rng.uniform(-0.01, 0.01), 0.5,
+                         'Right' if flip else 'Left', rng.uniform(0.8, 1.0))
+        hands = [right, left]
+        rng.shuffle(hands)
+        frames.append(Results([h[0] for h in hands], [h[1] for h in hands]))
+    return frames
+
+
+def classify_hands_message_to_dict(controller, results):
+    # the original implementation
+    left, right = None, None
+    try:
+        handedness_dict = MessageToDict(results.multi_handedness[0])
+        if handedness_dict['classification'][0]['label'] == 'Right':
+            right = results.multi_hand_landmarks[0]
+        else:
+            left = results.multi_hand_landmarks[0]
+    except Exception:
+        pass
+    try:
+        handedness_dict = MessageToDict(results.multi_handedness[1])
+        if handedness_dict['classification'][0]['label'] == 'Right':
+            right = results.multi_hand_landmarks[1]
+        else:
+            left = results.multi_hand_landmarks[1]
+    except Exception:
+        pass
+    controller.hr_major = right
+    controller.hr_minor = left
+
+
+def run(controller, classify, frames):
+    controller.hand_centers = {'Right': None, 'Left': None}
+    swaps = 0
+    prev_major = None
+    t0 = time.perf_counter()
+    for results in frames:
+        classify(results)
+    elapsed = time.perf_counter() - t0
+
+    controller.hand_centers = {'Right': None, 'Left': None}
+    for results in frames:
+        classify(results)
+        major_x = controller.hr_major.landmark[9].x
+        if prev_major is not None and abs(major_x - prev_major) > 0.2:
+            swaps += 1
+        prev_major = major_x
+    return elapsed, swaps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--flip-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.flip_rate, random.Random(args.seed))
+    controller = GestureController(headless=True, idle=False, source=NoCamera(),
+                                   input_backend=NullInput(), system_controls=MemorySystemControls(),
+                                   tracker_factory=lambda: None)
+    for name, classify in [("MessageToDict", partial(classify_hands_message_to_dict, controller)),
+                           ("direct", controller.classify_hands)]:
+        elapsed, swaps = run(controller, classify, frames)
+        print(f"{name:14s} {elapsed / args.frames * 1e6:7.1f} us/frame, "
+              f"{swaps} major/minor swaps")
+
+
+if __name__ == "__main__":
+    main()
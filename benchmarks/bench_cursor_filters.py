@@ -0,0 +1,87 @@
+# Cursor filters on synthetic hand traces: minimum-jerk reaches between
+# random points with pauses in between, landmark noise and frame-time
+# jitter like a 30 fps webcam. Writes the traces as landmark sessions and
+# scores them with eval_cursor.py.
+#
+#   python benchmarks/bench_cursor_filters.py [--sessions 4] [--noise 0.0015] [--latency 0.06]
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from eval_cursor import evaluate  # noqa: E402
+from make_fixtures import hand_pose  # noqa: E402
+from replay import save_session  # noqa: E402
+
+FILTERS = (
+    "step",
+    "one_euro",
+    "one_euro:min_cutoff=0.5,beta=0.003",
+    "kalman:lead_scale=0",
+    "kalman",
+    "kalman:q=3e6",
+)
+
+
+def reach_trace(rng, seconds=30.0, fps=30.0):
+    # hand center (normalized) at frame times with 3 ms of jitter
+    t = np.cumsum(rng.normal(1.0 / fps, 0.003, int(seconds * fps)).clip(0.5 / fps))
+    t -= t[0]
+    points = np.zeros((len(t), 2))
+    pos = rng.uniform(0.3, 0.7, 2)
+    start = 0.0
+    i = 0
+    while i < len(t):
+        target = rng.uniform(0.2, 0.8, 2)
+        duration = rng.uniform(0.3, 0.8)
+        pause = rng.uniform(0.3, 1.0)
+        while i < len(t) and t[i] < start + duration + pause:
+            u = min(1.0, (t[i] - start) / duration)
+            k = 10 * u ** 3 - 15 * u ** 4 + 6 * u ** 5   # minimum jerk
+            points[i] = pos + (target - pos) * k
+            i += 1
+        pos, start = target, start + duration + pause
+    return t, points
+
+
+def write_session(path, rng, noise):
+    t, centers = reach_trace(rng)
+    landmarks = np.zeros((len(t), 2, 21, 3), dtype=np.float32)
+    for f, (cx, cy) in enumerate(centers):
+        landmarks[f, 0] = hand_pose(cx, cy, fingers=(1, 1, 0, 0), spread=True)
+    landmarks[:, 0] += rng.normal(0.0, noise, landmarks[:, 0].shape)
+    labels = np.full((len(t), 2), -1, dtype=np.int8)
+    labels[:, 0] = 1
+    save_session(path, t, landmarks, labels, np.full((len(t), 2), 0.95, dtype=np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.0015, help="landmark noise, normalized units")
+    parser.add_argument("--latency", type=float, default=0.06, help="pipeline latency, s")
+    parser.add_argument("--filter", action="append", dest="filters", metavar="SPEC")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.sessions):
+            paths.append(os.path.join(tmp, f"reach_{i}.npz"))
+            write_session(paths[-1], rng, args.noise)
+        rows = evaluate(paths, args.filters or FILTERS, latency=args.latency)
+    print(f"{args.sessions} x 30 s sessions, noise {args.noise} (~{args.noise * 1920:.1f} px), "
+          f"latency {args.latency * 1000:.0f} ms")
+    print(f"{'filter':<36} {'jitter px/s':>11} {'lag ms':>8} {'error px/s':>10} {'us/update':>9}")
+    for spec, jitter, lag, error, us in rows:
+        print(f"{spec:<36} {jitter:11.1f} {lag:8.0f} {error:10.1f} {us:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
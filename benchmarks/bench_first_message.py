@@ -0,0 +1,108 @@
+# Time to first chat message: how long sendResponse takes from being called
+# to handing text to eel.addMsgToChat. Before, every response (English
+# included) went through translator.translate; after, it goes through
+# TranslationCache. The backend is simulated with a fixed round trip so the
+# numbers don't depend on the network; --live uses googletrans instead.
+#
+#   python benchmarks/bench_first_message.py [--latency 0.15] [--lang hi] [--live]
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translation import TranslationCache  # noqa: E402
+
+# what a short session asks for, as (template, values)
+SESSION = [
+    ("Hello! I am ready to assist you.", {}),
+    ("The current time is {time}", {"time": "10:15:02"}),
+    ("Volume up", {}),
+    ("Volume up", {}),
+    ("Brightness increased", {}),
+    ("Today is {day}", {"day": "Monday"}),
+    ("The current time is {time}", {"time": "10:16:40"}),
+    ("CPU: {cpu}% | RAM: {ram}% | Battery: N/A", {"cpu": 12.5, "ram": 41.0}),
+    ("Opening {name}...", {"name": "Chrome"}),
+    ("CPU: {cpu}% | RAM: {ram}% | Battery: N/A", {"cpu": 8.0, "ram": 40.2}),
+    ("Volume down", {}),
+    ("The current time is {time}", {"time": "10:18:05"}),
+]
+
+
+class SimulatedTranslator:
+    # googletrans-shaped; sleeps for one round trip per call
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def translate(self, text, dest):
+        self.calls += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(text=f"[{dest}] {text}")
+
+
+def before(backend, lang):
+    # the original sendResponse: format, then translate every time
+    times = []
+    for template, values in SESSION:
+        t0 = time.perf_counter()
+        backend.translate(template.format(**values), dest=lang)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def after(cache, lang):
+    times = []
+    for template, values in SESSION:
+        t0 = time.perf_counter()
+        cache.format(template, lang, **values)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def report(name, times, calls):
+    print(f"{name:<26} first {times[0] * 1000:7.1f} ms | median {statistics.median(times) * 1000:7.1f} ms"
+          f" | total {sum(times) * 1000:8.1f} ms | backend calls {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.15, help="simulated round trip, s")
+    parser.add_argument("--lang", default="hi")
+    parser.add_argument("--live", action="store_true", help="use googletrans over the network")
+    args = parser.parse_args()
+
+    def make_backend():
+        if args.live:
+            from googletrans import Translator
+            backend = Translator()
+            backend.calls = 0
+            return backend
+        return SimulatedTranslator(args.latency)
+
+    for lang in ("en", args.lang):
+        backend = make_backend()
+        report(f"before ({lang})", before(backend, lang), backend.calls)
+
+        backend = make_backend()
+        report(f"after, cold ({lang})", after(TranslationCache(backend), lang), backend.calls)
+
+        backend = make_backend()
+        path = os.path.join(tempfile.mkdtemp(), "translations.json")
+        cache = TranslationCache(backend, path=path)
+        cache.warm(lang, [template for template, _ in SESSION] + ["Monday", "Chrome"]).join()
+        warm_calls = backend.calls
+        report(f"after, warmed ({lang})", after(cache, lang), backend.calls - warm_calls)
+
+        backend = make_backend()
+        report(f"after, from disk ({lang})", after(TranslationCache(backend, path=path), lang), backend.calls)
+
+
+if __name__ == "__main__":
+    main()
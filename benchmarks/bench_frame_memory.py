@@ -0,0 +1,155 @@
+# Memory behaviour of the frame path over a long run: RSS over time, page
+# faults per frame (each fresh full-frame array faults its pages in) and
+# the numpy/cv2 temporaries alive within one frame (tracemalloc peak above
+# the frame's baseline). Runs this tree and the tree before the frame pool
+# (the parent of the commit that added FramePool, or --ref) on the same
+# simulated 720p camera, with real MediaPipe tracking a drawn hand.
+#
+#   python benchmarks/bench_frame_memory.py [--minutes 10] [--fps 30] [--ref REV]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, sys.argv[1])
+frames, width, height = int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+import cv2
+import numpy as np
+import psutil
+import hand_gesture
+from input_backends import RecordingInput
+from system_controls import MemorySystemControls
+
+
+def drawn_hand(cx, cy):
+    img = np.full((height, width, 3), (200, 210, 220), np.uint8)
+    skin = (140, 170, 225)
+    cv2.ellipse(img, (cx, cy), (110, 130), 0, 0, 360, skin, -1)
+    for ang, length in [(-25, 210), (-8, 240), (8, 230), (24, 190)]:
+        a = np.radians(ang - 90)
+        base = (int(cx + np.cos(a) * 60), int(cy + np.sin(a) * 60))
+        tip = (int(cx + np.cos(a) * (80 + length)), int(cy + np.sin(a) * (80 + length)))
+        cv2.line(img, base, tip, skin, 48)
+    cv2.line(img, (cx - 90, cy + 40), (cx - 230, cy - 80), skin, 52)
+    return img
+
+
+class Camera:
+    # cv2.VideoCapture-like: read(image) fills `image` when it fits
+    def __init__(self, source):
+        self.templates = [drawn_hand(width // 2 - 140 + 8 * k, height * 2 // 3) for k in range(4)]
+        self.index = 0
+        self.samples = []
+        self.extra = np.zeros(frames, np.int64)   # preallocated, so it doesn't show as growth
+        self.proc = psutil.Process()
+
+    def isOpened(self):
+        return self.index < frames
+
+    def read(self, image=None):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.index:
+            self.extra[self.index] = peak - self.base
+        if self.index % max(1, frames // 10) == 0 or self.index == frames - 1:
+            self.samples.append((self.index, self.proc.memory_info().rss,
+                                 resource.getrusage(resource.RUSAGE_SELF).ru_minflt, current))
+        template = self.templates[(self.index // 15) % len(self.templates)]
+        self.index += 1
+        if image is not None and image.shape == template.shape:
+            np.copyto(image, template)
+        else:
+            image = template.copy()
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+        return True, image
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height}.get(prop, 0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        pass
+
+
+class CountingInput(RecordingInput):
+    # counts instead of keeping every event, so the list doesn't grow
+    count = 0
+
+    def record(self, action, *args):
+        CountingInput.count += 1
+
+
+cameras = []
+hand_gesture.cv2.VideoCapture = lambda source: cameras.append(Camera(source)) or cameras[-1]
+gc = hand_gesture.GestureController(headless=True, idle=False, source=0,
+                                    input_backend=CountingInput(),
+                                    system_controls=MemorySystemControls())
+tracemalloc.start()
+t0 = time.perf_counter()
+gc.start()
+elapsed = time.perf_counter() - t0
+camera = cameras[0]
+print(json.dumps({"elapsed": elapsed, "samples": camera.samples, "extra": camera.extra[10:].tolist(),
+                  "actions": CountingInput.count}))
+"""
+
+
+def run(tree, args):
+    frames = int(args.minutes * 60 * args.fps)
+    out = subprocess.run([sys.executable, "-c", CHILD, tree, str(frames), "1280", "720"],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def export(ref):
+    if ref is None:
+        added = subprocess.run(["git", "log", "-S", "class FramePool", "--format=%H", "--", "hand_gesture.py"],
+                               cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        ref = f"{added[-1]}^" if added else "HEAD"
+    tree = tempfile.mkdtemp(prefix="bench_frame_memory_")
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", tree], input=archive, check=True)
+    return ref, tree
+
+
+def report(label, result):
+    samples = result["samples"]
+    warm, last = samples[1], samples[-1]
+    frames = last[0] - warm[0]
+    mib = 1024 * 1024
+    extra = sorted(result["extra"])
+    frame_bytes = 1280 * 720 * 3
+    print(f"{label}: {last[0] + 1} frames in {result['elapsed']:.0f} s "
+          f"({(last[0] + 1) / result['elapsed']:.0f} fps)")
+    print("  RSS MiB over the run: " + " ".join(f"{s[1] / mib:.0f}" for s in samples))
+    print(f"  RSS growth after warm-up: {(last[1] - warm[1]) / mib:+.1f} MiB | "
+          f"traced heap growth: {(last[3] - warm[3]) / 1024:+.0f} KiB")
+    print(f"  page faults/frame: {(last[2] - warm[2]) / max(1, frames):.0f} | "
+          f"temporaries/frame: median {extra[len(extra) // 2] / mib:.2f} MiB "
+          f"({extra[len(extra) // 2] / frame_bytes:.2f} frames), max {extra[-1] / mib:.2f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10.0, help="length of the replay at --fps")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--ref", default=None, help="git revision to compare against")
+    args = parser.parse_args()
+
+    ref, old_tree = export(args.ref)
+    print(f"720p, {args.minutes:g} min at {args.fps:g} fps, sequential loop, MediaPipe on every frame")
+    report(f"before ({ref[:10]})", run(old_tree, args))
+    report("frame pool", run(ROOT, args))
+
+
+if __name__ == "__main__":
+    main()
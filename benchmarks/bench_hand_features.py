@@ -0,0 +1,158 @@
+# Compares RuleClassifier, which classifies hands from the batched NumPy
+# landmark features, against the original per-landmark scalar code: checks
+# that both give the same gesture on random hands and reports per-frame
+# cost.
+#
+#   python benchmarks/bench_hand_features.py [--hands 2] [--frames 20000]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_gesture import Gest, HLabel, RuleClassifier, landmarks_to_array  # noqa: E402
+
+
+class Landmark:
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Hand:
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+except ImportError:
+    landmark_pb2 = None
+
+
+def random_hand(rng, protobuf=True):
+    # hand-shaped enough to hit every finger state: wrist low, fingers
+    # spread above it with random curl
+    wx, wy = rng.uniform(0.3, 0.7), rng.uniform(0.6, 0.9)
+    points = [(wx, wy, 0.0)]
+    for i in range(1, 21):
+        points.append((wx + rng.uniform(-0.2, 0.2),
+                       wy - rng.uniform(-0.1, 0.4),
+                       rng.uniform(-0.15, 0.15)))
+    if protobuf and landmark_pb2 is not None:
+        # the real MediaPipe message type, so attribute access costs are real
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in points:
+            hand.landmark.add(x=x, y=y, z=z)
+        return hand
+    return Hand([Landmark(x, y, z) for x, y, z in points])
+
+
+class ScalarHandRecog:
+    # the original implementation, kept here as the reference
+    def __init__(self, hand_label):
+        self.finger = 0
+        self.hand_result = None
+        self.hand_label = hand_label
+
+    def get_signed_dist(self, point):
+        sign = -1
+        if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
+            sign = 1
+        dist = (self.hand_result.landmark[point[0]].x -
+                self.hand_result.landmark[point[1]].x) ** 2
+        dist += (self.hand_result.landmark[point[0]].y -
+                 self.hand_result.landmark[point[1]].y) ** 2
+        return math.sqrt(dist) * sign
+
+    def get_dist(self, point):
+        dist = (self.hand_result.landmark[point[0]].x -
+                self.hand_result.landmark[point[1]].x) ** 2
+        dist += (self.hand_result.landmark[point[0]].y -
+                 self.hand_result.landmark[point[1]].y) ** 2
+        return math.sqrt(dist)
+
+    def get_dz(self, point):
+        return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
+
+    def set_finger_state(self):
+        points = [[8, 5, 0], [12, 9, 0], [16, 13, 0], [20, 17, 0]]
+        self.finger = 0
+        for point in points:
+            dist = self.get_signed_dist(point[:2])
+            dist2 = self.get_signed_dist(point[1:])
+            try:
+                ratio = round(dist / dist2, 1)
+            except ZeroDivisionError:
+                ratio = round(dist / 0.01, 1)
+            self.finger = self.finger << 1
+            if ratio > 0.5:
+                self.finger = self.finger | 1
+
+    def raw_gesture(self):
+        if self.finger in [Gest.LAST3, Gest.LAST4] and self.get_dist([8, 4]) < 0.05:
+            return Gest.PINCH_MINOR if self.hand_label == HLabel.MINOR else Gest.PINCH_MAJOR
+        if self.finger == Gest.FIRST2:
+            if self.get_dist([8, 12]) / self.get_dist([5, 9]) > 1.7:
+                return Gest.V_GEST
+            return Gest.TWO_FINGER_CLOSED if self.get_dz([8, 12]) < 0.1 else Gest.MID
+        return self.finger
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hands", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("landmarks:", "protobuf" if landmark_pb2 is not None else
+          "plain Python objects (mediapipe not installed)")
+    rng = random.Random(args.seed)
+    frames = [[random_hand(rng) for _ in range(args.hands)] for _ in range(args.frames)]
+    labels = ([HLabel.MAJOR, HLabel.MINOR] * args.hands)[:args.hands]
+
+    scalar = [ScalarHandRecog(label) for label in labels]
+    classifier = RuleClassifier()
+
+    def classify(frame):
+        # what HandRecog.classify runs on a frame, without the debounce
+        return classifier.classify(np.stack([landmarks_to_array(hand) for hand in frame]), labels)
+
+    mismatches = 0
+    for frame in frames:
+        for hand, rec in zip(frame, scalar):
+            rec.hand_result = hand
+            rec.set_finger_state()
+        for s, gesture in zip(scalar, classify(frame)):
+            if s.raw_gesture() != gesture:
+                mismatches += 1
+    print(f"parity: {mismatches} mismatches over {args.frames * args.hands} hands")
+
+    t0 = time.perf_counter()
+    for frame in frames:
+        for hand, rec in zip(frame, scalar):
+            rec.hand_result = hand
+            rec.set_finger_state()
+            rec.raw_gesture()
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for frame in frames:
+        classify(frame)
+    t_vector = time.perf_counter() - t0
+
+    print(f"scalar:  {t_scalar / args.frames * 1e6:8.1f} us/frame")
+    print(f"batched: {t_vector / args.frames * 1e6:8.1f} us/frame")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# HttpClient against a local stub HTTP server: connection reuse, timeouts
+# and per-service concurrency limits, next to plain requests.get calls like
+# the ones app.py used to make.
+#
+#   python benchmarks/bench_http.py [--requests 50] [--delay 0.2]
+#
+# StubServer is also handy for pointing the assistant at canned responses:
+#   WEATHER_BASE_URL=http://127.0.0.1:8765 NEWS_BASE_URL=... python app.py
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import HttpClient, Service  # noqa: E402
+
+WEATHER = {"main": {"temp": 27.4}, "weather": [{"description": "scattered clouds"}]}
+NEWS = {"articles": [{"title": f"Headline {i}"} for i in range(1, 6)]}
+
+
+class StubServer:
+    # Serves OpenWeather- and NewsAPI-shaped JSON. ?delay=<s> holds the reply;
+    # counts connections and the peak number of requests in flight.
+    def __init__(self, port=0):
+        stub = self
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.hits = {}
+        self.lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                self.reply()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply()
+
+            def reply(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                with stub.lock:
+                    stub.hits[url.path] = stub.hits.get(url.path, 0) + 1
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                try:
+                    time.sleep(float(query.get("delay", ["0"])[0]))
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+                try:
+                    if url.path.startswith("/data/2.5/weather"):
+                        body = WEATHER
+                    elif url.path.startswith("/v2/top-headlines"):
+                        body = NEWS
+                    elif url.path.startswith("/models/"):
+                        body = [{"generated_text": "Hi from the stub."}]
+                    else:
+                        body = {"path": url.path}
+                    data = json.dumps(body).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.peak_in_flight = 0
+
+
+def make_client(url, timeout=(1.0, 2.0), max_concurrency=4):
+    return HttpClient([Service("weather", url, timeout=timeout, max_concurrency=max_concurrency)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2, help="stub latency for the concurrency run")
+    args = parser.parse_args()
+    path = "/data/2.5/weather"
+
+    with StubServer() as stub:
+        # keep-alive: sequential requests, fresh connection each vs pooled
+        t0 = time.perf_counter()
+        for _ in range(args.requests):
+            requests.get(stub.url + path, params={"q": "Bangalore"}).json()
+        plain = time.perf_counter() - t0
+        plain_connections = stub.connections
+        stub.reset()
+        client = make_client(stub.url)
+        t0 = time.perf_counter()
+        for _ in range(args.requests):
+            client.get_json("weather", path, params={"q": "Bangalore"})
+        pooled = time.perf_counter() - t0
+        print(f"sequential x{args.requests}: requests.get {plain / args.requests * 1000:.2f} ms/req, "
+              f"{plain_connections} connections | HttpClient {pooled / args.requests * 1000:.2f} ms/req, "
+              f"{stub.connections} connections")
+
+        # concurrency: 8 callers against a 2-slot service
+        stub.reset()
+        client = make_client(stub.url, max_concurrency=2)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: client.get_json("weather", path, params={"delay": args.delay}),
+                          range(8)))
+        elapsed = time.perf_counter() - t0
+        print(f"8 callers, max_concurrency=2, {args.delay:.2f} s replies: {elapsed:.2f} s total, "
+              f"peak in flight at the server {stub.peak_in_flight}")
+        print(f"client stats: {client.stats['weather']}")
+
+        # timeout: a reply that takes 5 s against a 0.5 s read timeout
+        client = make_client(stub.url, timeout=(1.0, 0.5))
+        t0 = time.perf_counter()
+        try:
+            client.get_json("weather", path, params={"delay": 5})
+            outcome = "no timeout"
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        print(f"slow endpoint, 0.5 s read timeout: {outcome} after {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# How long each gesture's action blocks the thread that sends it, per input
+# backend. The first column is PyAutoGuiInput from before chords (the
+# parent of the commit that added ChordInput, or --ref). Both pyautogui
+# columns drive a stand-in for the module that sleeps pyautogui.PAUSE after
+# every call not made with _pause=False, as pyautogui does, so they run
+# without a display; --real-pyautogui uses the real module instead (and
+# moves your mouse). uinput is measured when /dev/uinput is writable and
+# SendInput on Windows.
+#
+#   python benchmarks/bench_input_latency.py [--repeat 10] [--ref REV] [--real-pyautogui]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import input_backends  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# gesture -> the backend call Controller.handle_controls makes for it
+ACTIONS = [
+    ("V_GEST move", lambda b: b.move_to(800, 600)),
+    ("FIST grab", lambda b: b.mouse_down()),
+    ("FIST release", lambda b: b.mouse_up()),
+    ("MID click", lambda b: b.click()),
+    ("INDEX right click", lambda b: b.click(button='right')),
+    ("TWO_FINGER_CLOSED double", lambda b: b.double_click()),
+    ("PINCH_MINOR scroll", lambda b: b.scroll(120)),
+    ("PINCH_MINOR hscroll", lambda b: b.hscroll(-120)),
+]
+
+
+class PausingPyAutoGui:
+    # pyautogui's timing without its side effects: every call sleeps PAUSE
+    # afterwards unless passed _pause=False
+    PAUSE = 0.1
+    FAILSAFE = False
+
+    def pause(self, kwargs):
+        if kwargs.get('_pause', True):
+            time.sleep(self.PAUSE)
+
+    def size(self):
+        return (1920, 1080)
+
+    def position(self):
+        return (960, 540)
+
+    def call(self, *args, **kwargs):
+        self.pause(kwargs)
+
+    moveTo = mouseDown = mouseUp = click = doubleClick = call
+    scroll = hscroll = keyDown = keyUp = call
+
+
+def previous_backends(ref):
+    if ref is None:
+        added = subprocess.run(["git", "log", "-S", "class ChordInput", "--format=%H", "--", "input_backends.py"],
+                               cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        ref = f"{added[-1]}^" if added else "HEAD"
+    source = subprocess.run(["git", "show", f"{ref}:input_backends.py"],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType("previous_input_backends")
+    exec(compile(source, "previous_input_backends.py", "exec"), module.__dict__)
+    return ref, module
+
+
+def with_module(cls, gui):
+    # PyAutoGuiInput around `gui`, skipping the import in __init__
+    backend = cls.__new__(cls)
+    backend.pyautogui = gui
+    return backend
+
+
+def backends(args):
+    ref, previous = previous_backends(args.ref)
+    if args.real_pyautogui:
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        gui = pyautogui
+    else:
+        gui = PausingPyAutoGui()
+    found = [(f"pyautogui {ref[:10]}", with_module(previous.PyAutoGuiInput, gui)),
+             ("pyautogui chords", with_module(input_backends.PyAutoGuiInput, gui)),
+             ("memory", input_backends.MemoryInput(keep=False))]
+    if os.access("/dev/uinput", os.W_OK):
+        found.append(("uinput", input_backends.UInputBackend()))
+    if sys.platform == "win32":
+        found.append(("sendinput", input_backends.SendInputBackend()))
+    return found
+
+
+def measure(backend, action, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        action(backend)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--ref", default=None, help="git revision for the pyautogui baseline")
+    parser.add_argument("--real-pyautogui", action="store_true")
+    args = parser.parse_args()
+
+    found = backends(args)
+    print(f"median ms per action over {args.repeat} runs")
+    print(f"{'gesture':<26}" + "".join(f"{name:>22}" for name, _ in found))
+    for gesture, action in ACTIONS:
+        row = [measure(backend, action, args.repeat) for _, backend in found]
+        print(f"{gesture:<26}" + "".join(f"{ms:22.3f}" for ms in row))
+    for _, backend in found:
+        if hasattr(backend, 'close'):
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# Accuracy and per-message cost of the intent router against the original
+# if/elif substring chain in getUserInput, over a generated corpus of a few
+# thousand utterances (English, Hindi and Spanish, with filler prefixes and
+# suffixes). Every utterance has an expected intent and slots; the script
+# lists router mismatches and exits non-zero if there are any.
+#
+#   python benchmarks/bench_intents.py [--repeat 5] [--show 10]
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intents import ASSISTANT_ENTITIES, ASSISTANT_INTENTS, IntentRouter  # noqa: E402
+
+# (utterance, intent, slots); intent None means the "You said" fallback
+ROWS = [
+    ("what time is it", 'time', {}),
+    ("tell me the time", 'time', {}),
+    ("what's the time", 'time', {}),
+    ("समय क्या है", 'time', {}),
+    ("अभी क्या टाइम है", 'time', {}),
+    ("qué hora es", 'time', {}),
+    ("what is the date", 'date', {}),
+    ("today's date", 'date', {}),
+    ("आज की तारीख बताओ", 'date', {}),
+    ("cuál es la fecha", 'date', {}),
+    ("what day is it", 'day', {}),
+    ("which day of the week is it", 'day', {}),
+    ("आज कौन सा दिन है", 'day', {}),
+    ("qué día es hoy", 'day', {}),
+    ("what is the time and date", 'time', {}),
+    ("bye", 'exit', {}),
+    ("goodbye", 'exit', {}),
+    ("exit", 'exit', {}),
+    ("quit the assistant", 'exit', {}),
+    ("अलविदा", 'exit', {}),
+    ("adiós", 'exit', {}),
+    ("open chrome", 'open', {'app': 'chrome'}),
+    ("launch the calculator", 'open', {'app': 'calculator'}),
+    ("open file explorer", 'open', {'app': 'explorer'}),
+    ("open notepad", 'open', {'app': 'notepad'}),
+    ("start the browser", 'open', {'app': 'chrome'}),
+    ("start the calculator", 'open', {'app': 'calculator'}),
+    ("open spotify", 'open', {}),
+    ("क्रोम खोलो", 'open', {'app': 'chrome'}),
+    ("नोटपैड खोलें", 'open', {'app': 'notepad'}),
+    ("abre la calculadora", 'open', {'app': 'calculator'}),
+    ("what's the weather like", 'weather', {}),
+    ("weather forecast", 'weather', {}),
+    ("आज का मौसम कैसा है", 'weather', {}),
+    ("cómo está el clima", 'weather', {}),
+    ("read me the news", 'news', {}),
+    ("latest headlines", 'news', {}),
+    ("when does the news start", 'news', {}),
+    ("आज की खबर", 'news', {}),
+    ("noticias de hoy", 'news', {}),
+    ("tell me a joke", 'joke', {}),
+    ("make me laugh", 'joke', {}),
+    ("एक चुटकुला सुनाओ", 'joke', {}),
+    ("cuéntame un chiste", 'joke', {}),
+    ("system status", 'status', {}),
+    ("how is my battery", 'status', {}),
+    ("cpu usage", 'status', {}),
+    ("सिस्टम स्थिति", 'status', {}),
+    ("estado del sistema", 'status', {}),
+    ("volume up", 'volume_up', {}),
+    ("turn up the volume", 'volume_up', {}),
+    ("louder", 'volume_up', {}),
+    ("system volume up", 'volume_up', {}),
+    ("आवाज़ बढ़ाओ", 'volume_up', {}),
+    ("sube el volumen", 'volume_up', {}),
+    ("volume down", 'volume_down', {}),
+    ("turn the volume down", 'volume_down', {}),
+    ("quieter", 'volume_down', {}),
+    ("आवाज कम करो", 'volume_down', {}),
+    ("baja el volumen", 'volume_down', {}),
+    ("mute", 'mute', {}),
+    ("mute volume", 'mute', {}),
+    ("म्यूट", 'mute', {}),
+    ("silenciar", 'mute', {}),
+    ("brightness up", 'brightness_up', {}),
+    ("increase the brightness", 'brightness_up', {}),
+    ("चमक बढ़ाओ", 'brightness_up', {}),
+    ("sube el brillo", 'brightness_up', {}),
+    ("brightness down", 'brightness_down', {}),
+    ("dim the screen", 'brightness_down', {}),
+    ("चमक कम करो", 'brightness_down', {}),
+    ("baja el brillo", 'brightness_down', {}),
+    ("hello", 'hello', {}),
+    ("hi there", 'hello', {}),
+    ("नमस्ते", 'hello', {}),
+    ("hola", 'hello', {}),
+    # substring traps for the old chain
+    ("reopen the tab", None, {}),
+    ("what a lovely holiday", None, {}),
+    ("today is great", None, {}),
+    ("unmute", None, {}),
+    ("i love sandwiches", None, {}),
+    ("the ecosystem is fragile", None, {}),
+]
+
+# slot-carrying rows only take punctuation suffixes, the tail is the slot
+QUERY_ROWS = [
+    ("search for cats", 'search', {'query': 'cats'}),
+    ("search python tutorials", 'search', {'query': 'python tutorials'}),
+    ("google weather in paris", 'search', {'query': 'weather in paris'}),
+    ("look up the news", 'search', {'query': 'news'}),
+    ("search", 'search', {}),
+    ("मौसम खोजो", 'search', {'query': 'मौसम'}),
+    ("buscar recetas", 'search', {'query': 'recetas'}),
+]
+
+PERCENT_ROWS = [
+    ("volume up by {n}%", 'volume_up'),
+    ("increase volume {n}", 'volume_up'),
+    ("volume down {n}%", 'volume_down'),
+    ("brightness up {n}%", 'brightness_up'),
+    ("decrease brightness by {n} percent", 'brightness_down'),
+]
+
+PREFIXES = ["", "please ", "hey assistant, ", "can you ", "could you please "]
+SUFFIXES = ["", " please", " now", " for me", "?", " thanks"]
+
+
+def corpus():
+    cases = []
+    for prefix in PREFIXES:
+        for text, intent, slots in ROWS:
+            for suffix in SUFFIXES:
+                cases.append((prefix + text + suffix, intent, slots))
+        for text, intent, slots in QUERY_ROWS:
+            for suffix in ("", "?", "!"):
+                cases.append((prefix + text + suffix, intent, slots))
+        for text, intent in PERCENT_ROWS:
+            for n in range(5, 100, 5):
+                cases.append((prefix + text.format(n=n), intent, {'percent': n}))
+    # "hey" is a greeting on its own; with a real request after it, the
+    # request wins, and alone it is still a greeting
+    return [(text, 'hello' if intent is None and text.startswith("hey ") else intent, slots)
+            for text, intent, slots in cases]
+
+
+def legacy_route(msg):
+    # the original getUserInput chain, reduced to (intent, slots)
+    msg_lower = msg.lower().strip()
+    if any(word in msg_lower for word in ["time", "date", "day"]):
+        return [w for w in ("time", "date", "day") if w in msg_lower][0], {}
+    elif "exit" in msg_lower or "bye" in msg_lower:
+        return 'exit', {}
+    elif "search" in msg_lower:
+        query = msg_lower.replace("search", "").replace("for", "").strip()
+        return 'search', {'query': query} if query else {}
+    elif "open" in msg_lower:
+        for app, words in (('chrome', ["chrome"]), ('explorer', ["file explorer", "explorer"]),
+                           ('notepad', ["notepad"]), ('calculator', ["calculator"])):
+            if any(w in msg_lower for w in words):
+                return 'open', {'app': app}
+        return 'open', {}
+    elif "weather" in msg_lower:
+        return 'weather', {}
+    elif "news" in msg_lower:
+        return 'news', {}
+    elif "joke" in msg_lower:
+        return 'joke', {}
+    elif "status" in msg_lower or "system" in msg_lower:
+        return 'status', {}
+    match = re.search(r'(\d+)%?', msg_lower)
+    slots = {'percent': int(match.group(1))} if match else {}
+    if "volume up" in msg_lower or "increase volume" in msg_lower:
+        return 'volume_up', slots
+    elif "volume down" in msg_lower or "decrease volume" in msg_lower:
+        return 'volume_down', slots
+    elif "mute" in msg_lower:
+        return 'mute', {}
+    elif "brightness up" in msg_lower:
+        return 'brightness_up', slots
+    elif "brightness down" in msg_lower:
+        return 'brightness_down', slots
+    elif "hello" in msg_lower:
+        return 'hello', {}
+    return None, {}
+
+
+def check(route, cases):
+    # (mismatches, cases); slots are compared only for the keys we expect,
+    # plus percent, which must be absent when not expected
+    mismatches = []
+    for text, intent, slots in cases:
+        got_intent, got_slots = route(text)
+        wanted = dict(slots)
+        got = {key: got_slots.get(key) for key in set(wanted) | {'percent'}}
+        wanted.setdefault('percent', None)
+        if got_intent != intent or got != wanted:
+            mismatches.append((text, intent, slots, got_intent, got_slots))
+    return mismatches
+
+
+def time_per_call(route, cases, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text, _, _ in cases:
+            route(text)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(cases) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--show", type=int, default=10, help="mismatches to print")
+    args = parser.parse_args()
+
+    cases = corpus()
+    t0 = time.perf_counter()
+    router = IntentRouter(ASSISTANT_INTENTS, ASSISTANT_ENTITIES)
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    def routed(text):
+        result = router.route(text)
+        return result.intent, result.slots
+
+    print(f"corpus: {len(cases)} utterances, router compiled in {compile_ms:.2f} ms")
+    failed = False
+    for name, route in (("router", routed), ("if/elif chain", legacy_route)):
+        mismatches = check(route, cases)
+        us = time_per_call(route, cases, args.repeat)
+        accuracy = 100.0 * (len(cases) - len(mismatches)) / len(cases)
+        print(f"{name:<14} accuracy {accuracy:6.2f}% ({len(mismatches)} wrong) | {us:6.2f} us/message")
+        for text, intent, slots, got_intent, got_slots in mismatches[:args.show]:
+            print(f"    {text!r}: expected {intent} {slots}, got {got_intent} {got_slots}")
+        if name == "router" and mismatches:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
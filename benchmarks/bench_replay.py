@@ -0,0 +1,71 @@
+# Replays recorded sessions through GestureController with recording
+# backends and reports frames/sec, per-stage latency and the gestures and
+# actions emitted. Runs headless; with no paths it replays the synthetic
+# session from make_fixtures.py.
+#
+#   python benchmarks/bench_replay.py [session.npz | video.mp4 ...] [--json out.json]
+
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_gesture import Gest  # noqa: E402
+from make_fixtures import synthetic_session  # noqa: E402
+from replay import gesture_runs, run_replay, save_session  # noqa: E402
+
+
+def gesture_name(value):
+    try:
+        return Gest(value).name
+    except ValueError:
+        return str(value)
+
+
+def report(path, result):
+    print(f"== {path}")
+    print(f"frames {result.frames}  elapsed {result.elapsed:.2f} s  fps {result.fps:.1f}")
+    for name, stage in result.metrics['stages'].items():
+        print(f"  {name:12s} p50 {stage['p50_ms']:7.3f} ms  p95 {stage['p95_ms']:7.3f} ms  "
+              f"max {stage['max_ms']:7.3f} ms")
+    runs = gesture_runs(result.gestures)
+    print("gestures: " + " ".join(f"{gesture_name(g)}x{n}" for g, n in runs))
+    actions = collections.Counter(event[1] for event in result.input_events)
+    actions.update(event[1] for event in result.system_events)
+    print("actions:  " + ", ".join(f"{name} {n}" for name, n in sorted(actions.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--roi", action="store_true")
+    parser.add_argument("--infer-width", type=int, default=None)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic_session.npz")
+        save_session(path, *synthetic_session(repeat=10))
+        paths = [path]
+
+    out = {}
+    for path in paths:
+        result = run_replay(path, roi=args.roi, infer_width=args.infer_width)
+        report(path, result)
+        out[path] = {
+            'frames': result.frames, 'elapsed_s': result.elapsed, 'fps': result.fps,
+            'stages': result.metrics['stages'], 'gestures': gesture_runs(result.gestures),
+            'actions': collections.Counter(e[1] for e in result.input_events + result.system_events),
+        }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(out, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# ResponseCache over the stub server from bench_http.py: latency of a miss,
+# a fresh hit and a stale hit (served while the refresh runs), a restart
+# answered from the disk snapshot, and the hit/miss counters. Time is
+# simulated so TTLs don't have to elapse.
+#
+#   python benchmarks/bench_response_cache.py [--delay 0.3]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_http import StubServer  # noqa: E402
+from http_client import HttpClient, Service  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.3, help="stub latency, s")
+    args = parser.parse_args()
+    path = os.path.join(tempfile.mkdtemp(), "responses.json")
+
+    with StubServer() as stub:
+        http = HttpClient([Service("weather", stub.url, timeout=(1.0, 5.0))])
+
+        def fetch_weather(city):
+            data = http.get_json("weather", "/data/2.5/weather", params={"q": city, "delay": args.delay})
+            return {"temp": data["main"]["temp"], "desc": data["weather"][0]["description"]}
+
+        def make_cache(clock):
+            cache = ResponseCache(path=path, clock=clock)
+            cache.register("weather", fetch_weather, ttl=600, max_stale=6 * 3600)
+            return cache
+
+        def timed(label, cache):
+            t0 = time.perf_counter()
+            cache.get("weather", "Bangalore")
+            print(f"{label:<34} {(time.perf_counter() - t0) * 1000:8.2f} ms   upstream calls {stub.hits.get('/data/2.5/weather', 0)}")
+
+        clock = Clock()
+        cache = make_cache(clock)
+        timed("cold miss", cache)
+        timed("fresh hit", cache)
+        clock.now += 601
+        timed("stale hit (refresh in background)", cache)
+        time.sleep(args.delay + 0.2)
+        timed("fresh hit after the refresh", cache)
+        print(f"counters: {cache.stats()['weather']}")
+
+        clock.now += 60
+        restarted = make_cache(clock)
+        timed("restart, answered from snapshot", restarted)
+        clock.now += 7 * 3600
+        timed("past max_stale: blocking miss", restarted)
+        print(f"counters after restart: {restarted.stats()['weather']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# Time from launching the gesture process to its first processed frame,
+# for this tree and for the tree before lazy startup (the parent of the
+# commit that added startup.py, or --ref). The camera is simulated: opening
+# it takes --camera-open seconds, as a USB webcam does, and then it returns
+# blank frames. The real HandTracker runs on them.
+#
+# Then `import app` on its own, in a fresh interpreter: how long it takes,
+# the threads it leaves running and which heavy modules it pulled in, for
+# this tree and the tree before app.py built its objects lazily (the parent
+# of the commit that added startup.Lazy, or --app-ref). Needs eel and
+# keyboard installed, as app.py does.
+#
+#   python benchmarks/bench_startup.py [--runs 3] [--camera-open 0.5] [--ref REV] [--app-ref REV]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import sys, time
+sys.path.insert(0, sys.argv[1])
+camera_open = float(sys.argv[2])
+print("start", time.time(), flush=True)
+import numpy as np
+import hand_gesture
+from input_backends import RecordingInput
+from system_controls import MemorySystemControls
+print("imported", time.time(), flush=True)
+done = False
+
+
+class SlowCamera:
+    def __init__(self, source):
+        time.sleep(camera_open)
+        self.frame = np.zeros((480, 640, 3), np.uint8)
+
+    def isOpened(self):
+        return not done
+
+    def read(self, image=None):
+        return True, self.frame.copy()
+
+    def get(self, prop):
+        return 0
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        pass
+
+
+hand_gesture.cv2.VideoCapture = SlowCamera
+GC = hand_gesture.GestureController
+detect = GC.detect
+
+
+def first_detect(*args):
+    # (tracker, image), or (self, tracker, image) once detect is a method
+    global done
+    results = detect(*args)
+    print("first frame", time.time(), flush=True)
+    done = True
+    return results
+
+
+GC.detect = first_detect
+gc = GC(headless=True, idle=False, source=0, input_backend=RecordingInput(),
+        system_controls=MemorySystemControls())
+gc.start()
+"""
+
+APP_CHILD = r"""
+import sys, threading, time
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import app
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ("requests", "keyboard", "pygame", "googletrans", "mediapipe") if m in sys.modules]
+print("app", elapsed, threading.active_count() - 1, ",".join(heavy) or "-", flush=True)
+"""
+
+
+def run_once(tree, camera_open):
+    t0 = time.time()
+    out = subprocess.run([sys.executable, "-c", CHILD, tree, str(camera_open)],
+                         capture_output=True, text=True, check=True).stdout
+    events = {}
+    for line in out.splitlines():
+        name, _, stamp = line.rpartition(" ")
+        if name in ("start", "imported", "first frame"):
+            events[name] = float(stamp) - t0
+    return events
+
+
+def import_app(tree):
+    # (seconds, threads left running, heavy modules imported)
+    out = subprocess.run([sys.executable, "-c", APP_CHILD, tree],
+                         capture_output=True, text=True, check=True).stdout
+    _, elapsed, threads, heavy = out.strip().splitlines()[-1].split()
+    return float(elapsed), int(threads), heavy
+
+
+def export(ref, args=("--diff-filter=A", "--", "startup.py")):
+    if ref is None:
+        added = subprocess.run(["git", "log", *args[:-2], "--format=%H", *args[-2:]],
+                               cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        ref = f"{added[-1]}^" if added else "HEAD"
+    tree = tempfile.mkdtemp(prefix="bench_startup_")
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", tree], input=archive, check=True)
+    return ref, tree
+
+
+def summarize(label, tree, args):
+    runs = [run_once(tree, args.camera_open) for _ in range(args.runs)]
+    med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+    print(f"{label:<22} interpreter {med['start']:.3f} s | imports done {med['imported']:.3f} s | "
+          f"first frame {med['first frame']:.3f} s")
+    return med
+
+
+def summarize_app(label, tree, args):
+    runs = [import_app(tree) for _ in range(args.runs)]
+    elapsed = statistics.median(r[0] for r in runs)
+    _, threads, heavy = runs[-1]
+    print(f"{label:<22} import app {elapsed * 1000:6.1f} ms | threads left running {threads} | "
+          f"heavy modules: {heavy}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--camera-open", type=float, default=0.5, help="simulated camera open time, s")
+    parser.add_argument("--ref", default=None, help="git revision to compare against")
+    parser.add_argument("--app-ref", default=None, help="git revision to compare `import app` against")
+    args = parser.parse_args()
+
+    ref, old_tree = export(args.ref)
+    print(f"camera open {args.camera_open:.2f} s, median of {args.runs} runs")
+    before = summarize(f"before ({ref[:10]})", old_tree, args)
+    after = summarize("lazy startup", ROOT, args)
+    print(f"first frame: {before['first frame']:.3f} s -> {after['first frame']:.3f} s "
+          f"({after['first frame'] / before['first frame']:.0%} of before)")
+
+    app_ref, app_tree = export(args.app_ref, ("-S", "class Lazy", "--", "startup.py"))
+    print(f"\nimport app alone, median of {args.runs} runs")
+    before = summarize_app(f"before ({app_ref[:10]})", app_tree, args)
+    after = summarize_app("lazy objects", ROOT, args)
+    print(f"import app: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
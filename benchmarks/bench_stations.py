@@ -0,0 +1,110 @@
+# Throughput of N camera stations under supervisor.py, one process each,
+# for N = 1 .. --max-stations (default: the cores this process may use).
+# Every station reads a simulated 720p camera as fast as it can and runs
+# MediaPipe on a drawn hand, so the numbers are inference-bound. Total fps
+# is measured after --warmup seconds, from the stations' own metrics.
+#
+#   python benchmarks/bench_stations.py [--max-stations 4] [--seconds 20] [--warmup 5]
+
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supervisor import Station, Supervisor, allowed_cpus  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def drawn_hand(cx, cy):
+    img = np.full((HEIGHT, WIDTH, 3), (200, 210, 220), np.uint8)
+    skin = (140, 170, 225)
+    cv2.ellipse(img, (cx, cy), (110, 130), 0, 0, 360, skin, -1)
+    for ang, length in [(-25, 210), (-8, 240), (8, 230), (24, 190)]:
+        a = np.radians(ang - 90)
+        base = (int(cx + np.cos(a) * 60), int(cy + np.sin(a) * 60))
+        tip = (int(cx + np.cos(a) * (80 + length)), int(cy + np.sin(a) * (80 + length)))
+        cv2.line(img, base, tip, skin, 48)
+    cv2.line(img, (cx - 90, cy + 40), (cx - 230, cy - 80), skin, 52)
+    return img
+
+
+class SyntheticCamera:
+    # cv2.VideoCapture-like, never runs dry; built inside the station's process
+    def __init__(self):
+        self.templates = [drawn_hand(WIDTH // 2 - 140 + 8 * k, HEIGHT * 2 // 3) for k in range(4)]
+        self.index = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        template = self.templates[(self.index // 15) % len(self.templates)]
+        self.index += 1
+        if image is not None and image.shape == template.shape:
+            np.copyto(image, template)
+            return True, image
+        return True, template.copy()
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: WIDTH, cv2.CAP_PROP_FRAME_HEIGHT: HEIGHT}.get(prop, 0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        pass
+
+
+def run(count, args):
+    samples = {}    # station -> [(uptime, frames)]
+
+    def on_metrics(name, snap):
+        samples.setdefault(name, []).append((snap['uptime_s'], snap['frames']))
+
+    stations = [Station(f"station{i}", source=SyntheticCamera, sink='none', idle=False,
+                        pipelined=args.pipelined) for i in range(count)]
+    supervisor = Supervisor(stations, on_metrics=on_metrics, metrics_interval=1.0,
+                            pin=not args.no_pin)
+    summary = supervisor.run(duration=args.warmup + args.seconds)
+    if summary['errors']:
+        raise SystemExit(f"stations failed: {summary['errors']}")
+    rates = []
+    for name in sorted(samples):
+        steady = [s for s in samples[name] if s[0] >= args.warmup] or samples[name]
+        (t0, f0), (t1, f1) = steady[0], steady[-1]
+        rates.append((f1 - f0) / (t1 - t0) if t1 > t0 else 0.0)
+    inference = [s['stages'].get('inference', {}).get('p50_ms', 0.0)
+                 for s in summary['stations'].values()]
+    return rates, float(np.mean(inference)) if inference else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-stations", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=20.0, help="measured time per run")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds left out at the start")
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--no-pin", action="store_true")
+    args = parser.parse_args()
+
+    cores = len(allowed_cpus())
+    max_stations = args.max_stations or cores
+    print(f"{cores} cores, 720p, unpaced cameras, {args.seconds:g} s after {args.warmup:g} s warm-up")
+    print(f"{'stations':>8} {'total fps':>10} {'per station':>12} {'inference p50':>14} {'scaling':>8}")
+    single = None
+    counts = sorted({1, max_stations} | {2 ** k for k in range(1, 8) if 2 ** k < max_stations})
+    for count in counts:
+        rates, inference = run(count, args)
+        total = sum(rates)
+        single = single or total
+        print(f"{count:8d} {total:10.1f} {total / count:12.1f} {inference:11.1f} ms "
+              f"{total / (single * count):8.0%}")
+
+
+if __name__ == "__main__":
+    main()
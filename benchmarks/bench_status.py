@@ -0,0 +1,62 @@
+# Cost of answering a status request: the original direct psutil calls
+# against reading TelemetrySampler's ring buffer, and the buffer's memory
+# once it is full. The buffer is there for a CPU figure that means
+# something and for averages and trends, not for speed; expect the
+# buffered read to be the slower of the two.
+#
+#   python benchmarks/bench_status.py [--calls 200] [--interval 0.05]
+
+import argparse
+import os
+import sys
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import TelemetrySampler  # noqa: E402
+
+
+def direct_status():
+    # the original get_system_status
+    cpu = psutil.cpu_percent()
+    ram = psutil.virtual_memory().percent
+    battery = psutil.sensors_battery()
+    return cpu, ram, battery.percent if battery else None
+
+
+def buffered_status(sampler):
+    latest = sampler.latest()
+    return (latest['cpu'], sampler.average('cpu', 60), sampler.trend('cpu', 60),
+            latest['ram'], latest['battery'], latest['gesture_rss_mb'])
+
+
+def per_call_us(fn, calls):
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.05, help="sampling interval for the run, s")
+    args = parser.parse_args()
+
+    print(f"first direct call after start: cpu={direct_status()[0]} (meaningless without a prior call)")
+    print(f"direct psutil status:  {per_call_us(direct_status, args.calls):8.1f} us/request")
+
+    # the buffer holds 300 s at the default 2 s interval: 150 samples
+    window = 150 * args.interval
+    sampler = TelemetrySampler(interval=args.interval, window=window, pid=os.getpid()).start()
+    time.sleep(window + 5 * args.interval)
+    print(f"buffered status:       {per_call_us(lambda: buffered_status(sampler), args.calls):8.1f} us/request "
+          f"(cpu {sampler.latest()['cpu']}%, avg {sampler.average('cpu', 60):.1f}%)")
+    print(f"ring buffer: {len(sampler)} samples, {sys.getsizeof(sampler.data) / 1024:.1f} KiB")
+    sampler.stop()
+
+
+if __name__ == "__main__":
+    main()
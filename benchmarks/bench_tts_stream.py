@@ -0,0 +1,93 @@
+# Time to first audio for whole-utterance vs streamed (sentence-chunked)
+# speech, for responses of growing length, plus how quickly cancel() stops
+# a long response. Synthesis is simulated with a fixed round trip plus a
+# per-character cost; playback sleeps for the clip's duration instead of
+# touching an audio device.
+#
+#   python benchmarks/bench_tts_stream.py [--rtt 0.25] [--per-char 0.004]
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tts import AudioCache, SilenceEngine, Speaker  # noqa: E402
+
+SENTENCES = [
+    "Markets rallied after the central bank held rates steady, signalling patience for the rest of the year.",
+    "The monsoon arrived two days early across the southern coast.",
+    "Local commuters can expect delays on the metro line this weekend due to maintenance work.",
+    "A new study suggests that short walks after meals help regulate blood sugar.",
+    "The city council approved funding for three new public libraries.",
+]
+
+
+class SlowEngine(SilenceEngine):
+    # silent audio, 10 ms per character, after a network-like delay
+    def __init__(self, rtt, per_char):
+        super().__init__(seconds_per_char=0.01)
+        self.name = "slow"
+        self.rtt = rtt
+        self.per_char = per_char
+
+    def synthesize(self, text, lang):
+        time.sleep(self.rtt + self.per_char * len(text))
+        return super().synthesize(text, lang)
+
+
+class TimedSpeaker(Speaker):
+    def play(self, data, cancelled):
+        with wave.open(io.BytesIO(data)) as w:
+            cancelled.wait(w.getnframes() / w.getframerate())
+
+
+def response(n_sentences):
+    return " ".join(SENTENCES[i % len(SENTENCES)] for i in range(n_sentences))
+
+
+def speak(speaker, text, cancel_after=None):
+    started, done = threading.Event(), threading.Event()
+    t0 = time.perf_counter()
+    speaker.say(text, "en", on_start=started.set, on_done=done.set)
+    started.wait()
+    first = time.perf_counter() - t0
+    if cancel_after is not None:
+        time.sleep(cancel_after)
+        t1 = time.perf_counter()
+        speaker.cancel()
+        done.wait()
+        return first, time.perf_counter() - t1
+    done.wait()
+    return first, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt", type=float, default=0.25, help="simulated synthesis round trip, s")
+    parser.add_argument("--per-char", type=float, default=0.004, help="simulated synthesis cost per char, s")
+    args = parser.parse_args()
+
+    print(f"{'chars':>6} | {'whole: first audio':>18} {'total':>7} | {'streamed: first audio':>21} {'total':>7}")
+    for n in (1, 2, 5, 10):
+        text = response(n)
+        row = []
+        for stream in (False, True):
+            engine = SlowEngine(args.rtt, args.per_char)
+            speaker = TimedSpeaker(engine, AudioCache(), stream=stream)
+            row.append(speak(speaker, text))
+            speaker.close()
+        print(f"{len(text):>6} | {row[0][0]:>17.2f}s {row[0][1]:>6.2f}s | {row[1][0]:>20.2f}s {row[1][1]:>6.2f}s")
+
+    speaker = TimedSpeaker(SlowEngine(args.rtt, args.per_char), AudioCache(), stream=True)
+    first, stop = speak(speaker, response(10), cancel_after=0.5)
+    print(f"cancel 0.5 s into a {len(response(10))}-char response: stopped {stop * 1000:.0f} ms after cancel()")
+    speaker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Push-to-talk against a simulated page: how long key hooks block, how many
+# mic calls reach the page, and whether the mic ends up where it should.
+# The old path made a blocking eel round trip from inside the hook; the new
+# one enqueues on UiChannel. The scenario holds shift (auto-repeat) while a
+# response is being spoken, then releases it.
+#
+#   python benchmarks/bench_ui_channel.py [--rtt 0.03]
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui_channel import UiChannel  # noqa: E402
+
+
+class FakePage:
+    # eel-like: page.fn(args) sends; calling the result waits for the reply
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.calls = []
+        self.listening = True
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        def send(*args):
+            with self.lock:
+                self.calls.append(name)
+                if name in ("startListening", "stopListening"):
+                    want = name == "startListening"
+                    if want == self.listening and want:
+                        self.errors += 1   # recognition.start() while running throws
+                    self.listening = want
+
+            def reply():
+                time.sleep(self.rtt)
+            return reply
+        return send
+
+
+def scenario(press, release, speak_start, speak_end, repeats=25, repeat_gap=0.03):
+    # shift held with auto-repeat; a response starts and ends while it is held
+    latencies = []
+
+    def hook(fn, *args):
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+
+    for i in range(repeats):
+        hook(press)
+        if i == 5:
+            speak_start()
+        if i == 15:
+            speak_end()
+        time.sleep(repeat_gap)
+    hook(release)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt", type=float, default=0.03, help="simulated websocket round trip, s")
+    args = parser.parse_args()
+
+    # the original push_to_talk / sendResponse mic handling
+    page = FakePage(args.rtt)
+    state = {'mic_active': False}
+
+    def push_to_talk(active):
+        if active and not state['mic_active']:
+            state['mic_active'] = True
+            page.startListening()()
+        elif not active and state['mic_active']:
+            state['mic_active'] = False
+            page.stopListening()()
+
+    latencies = scenario(lambda: push_to_talk(True), lambda: push_to_talk(False),
+                         lambda: page.stopListening()(), lambda: page.startListening()())
+    print(f"blocking eel calls: hook max {max(latencies) * 1000:6.2f} ms | page mic calls "
+          f"{len(page.calls)} | start-while-running errors {page.errors} | "
+          f"mic after release: {'on' if page.listening else 'off'}")
+
+    page = FakePage(args.rtt)
+    ui = UiChannel(page).start()
+    token = object()
+    latencies = scenario(lambda: ui.push_to_talk(True), lambda: ui.push_to_talk(False),
+                         lambda: ui.speech_started(token), lambda: ui.speech_ended(token))
+    time.sleep(0.2)
+    ui.close()
+    print(f"UiChannel:          hook max {max(latencies) * 1000:6.2f} ms | page mic calls "
+          f"{len(page.calls)} | start-while-running errors {page.errors} | "
+          f"mic after release: {'on' if page.listening else 'off'} | {ui.stats}")
+
+
+if __name__ == "__main__":
+    main()
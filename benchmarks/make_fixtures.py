@@ -0,0 +1,116 @@
+# Writes synthetic landmark sessions for the replay benchmarks, so they run
+# in CI without a camera or a recorded fixture. The hand model is crude but
+# lands every finger state HandRecog cares about.
+#
+#   python benchmarks/make_fixtures.py [--out benchmarks/fixtures]
+
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import save_session  # noqa: E402
+
+INDEX, MIDDLE, RING, PINKY = 0, 1, 2, 3
+OPEN = (1, 1, 1, 1)
+FIST = (0, 0, 0, 0)
+
+
+def hand_pose(cx, cy, fingers=OPEN, spread=False, pinch=False, size=0.12):
+    s = size
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[0] = (cx, cy + s, 0.0)
+    for j, dx in enumerate((-0.08, -0.025, 0.025, 0.08)):
+        base = 5 + 4 * j
+        mcp = np.array([cx + dx * s * 3, cy, 0.0])
+        if fingers[j]:
+            tip_dx = 0.0
+            if spread and j == INDEX:
+                tip_dx = -0.25 * s
+            elif spread and j == MIDDLE:
+                tip_dx = 0.25 * s
+            steps = [(tip_dx * 0.4, -0.3 * s), (tip_dx * 0.7, -0.55 * s), (tip_dx, -0.8 * s)]
+        else:
+            steps = [(0.0, -0.2 * s), (0.0, 0.0), (0.0, 0.15 * s)]
+        points[base] = mcp
+        for k, (ox, oy) in enumerate(steps):
+            points[base + k + 1] = mcp + (ox, oy, 0.0)
+    thumb = [(-0.3, 0.7), (-0.45, 0.45), (-0.55, 0.25), (-0.6, 0.1)]
+    for k, (ox, oy) in enumerate(thumb):
+        points[1 + k] = (cx + ox * s, cy + oy * s, 0.0)
+    if pinch:
+        points[4] = points[8] + (0.02 * s, 0.0, 0.0)
+    return points
+
+
+# (seconds, right hand pose, left hand pose or None, motion)
+SCRIPT = [
+    (1.0, dict(fingers=OPEN), None, 'still'),
+    (3.0, dict(fingers=(1, 1, 0, 0), spread=True), None, 'circle'),       # V_GEST: move
+    (0.5, dict(fingers=(0, 1, 0, 0)), None, 'still'),                     # MID: click
+    (0.5, dict(fingers=(1, 1, 0, 0), spread=True), None, 'still'),
+    (0.5, dict(fingers=(1, 0, 0, 0)), None, 'still'),                     # INDEX: right click
+    (0.5, dict(fingers=(1, 1, 0, 0), spread=True), None, 'still'),
+    (0.5, dict(fingers=(1, 1, 0, 0)), None, 'still'),                     # TWO_FINGER_CLOSED
+    (2.0, dict(fingers=FIST), None, 'line'),                              # FIST: drag
+    (0.5, dict(fingers=OPEN), None, 'still'),
+    (2.0, dict(fingers=OPEN, pinch=True), None, 'up'),                    # PINCH_MAJOR: volume
+    (0.5, dict(fingers=OPEN), None, 'still'),
+    (2.0, dict(fingers=OPEN), dict(fingers=OPEN, pinch=True), 'right'),   # PINCH_MINOR: hscroll
+    (1.0, None, None, 'still'),
+]
+
+
+def synthetic_session(repeat=1, fps=30, noise=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(repeat):
+        for seconds, right, left, motion in SCRIPT:
+            n = int(seconds * fps)
+            for i in range(n):
+                u = i / max(1, n - 1)
+                dx, dy = {
+                    'still': (0.0, 0.0),
+                    'circle': (0.1 * math.cos(2 * math.pi * u) - 0.1, 0.1 * math.sin(2 * math.pi * u)),
+                    'line': (0.2 * u, 0.05 * u),
+                    'up': (0.0, -0.15 * u),
+                    'right': (0.15 * u, 0.0),
+                }[motion]
+                hands = []
+                if right is not None:
+                    hands.append((1, hand_pose(0.35 + dx, 0.5 + dy, **right)))
+                if left is not None:
+                    hands.append((0, hand_pose(0.7 + (dx if motion == 'right' else 0.0),
+                                               0.5, **left)))
+                frames.append(hands)
+
+    count = len(frames)
+    landmarks = np.zeros((count, 2, 21, 3), dtype=np.float32)
+    labels = np.full((count, 2), -1, dtype=np.int8)
+    scores = np.zeros((count, 2), dtype=np.float32)
+    for f, hands in enumerate(frames):
+        for h, (label, points) in enumerate(hands):
+            landmarks[f, h] = points + rng.normal(0.0, noise, points.shape)
+            labels[f, h] = label
+            scores[f, h] = 0.95
+    timestamps = np.arange(count, dtype=np.float64) / fps
+    return timestamps, landmarks, labels, scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, "synthetic_session.npz")
+    save_session(path, *synthetic_session(repeat=args.repeat))
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Chat history for the web UI: the newest `capacity` turns in a ring in
+# memory, every turn in an append-only JSON-lines file. A turn's id is the
+# byte offset of its line, so paging from any id seeks straight there and
+# reads only the lines asked for; nothing is indexed, and startup reads just
+# the tail of the file to refill the ring.
+#
+#   history = ChatHistory("chat_history.jsonl", capacity=200)
+#   turn_id = history.append("user", "what's the time")
+#   history.page(limit=50)                   # the newest 50, oldest first
+#   history.page(before=turn_id, limit=50)   # the 50 before that turn
+#   history.page(after=turn_id, limit=50)    # and after it
+#
+# Every turn is {'id', 't', 'sender', 'text'}. A line cut short by a crash
+# is skipped.
+
+
+class ChatHistory:
+    def __init__(self, path, capacity=200, block_size=64 * 1024, clock=time.time):
+        self.path = path
+        self.capacity = capacity
+        self.block_size = block_size
+        self.clock = clock
+        self.ring = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+        self.file = None
+        self.size = None        # bytes in the log; None until loaded
+        self.partial = False    # the log ends in a cut-off line
+
+    def load(self):
+        # with the lock held; the first append or page pays for it
+        if self.size is not None:
+            return
+        try:
+            self.size = os.path.getsize(self.path)
+        except OSError:
+            self.size = 0
+        if self.size:
+            with open(self.path, 'rb') as f:
+                f.seek(self.size - 1)
+                self.partial = f.read(1) != b'\n'
+        self.ring.extend(self.read_before(self.size, self.capacity))
+
+    def append(self, sender, text):
+        with self.lock:
+            self.load()
+            if self.file is None:
+                folder = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(folder, exist_ok=True)
+                self.file = open(self.path, 'ab')
+            if self.partial:
+                self.file.write(b'\n')
+                self.size += 1
+                self.partial = False
+            turn = {'id': self.size, 't': round(self.clock(), 3), 'sender': sender, 'text': text}
+            line = json.dumps({'t': turn['t'], 'sender': sender, 'text': text},
+                              ensure_ascii=False).encode('utf-8') + b'\n'
+            self.file.write(line)
+            self.file.flush()
+            self.size += len(line)
+            self.ring.append(turn)
+            return turn['id']
+
+    def page(self, before=None, after=None, limit=50):
+        # up to `limit` turns, oldest first: the newest ones, the ones just
+        # before turn id `before` or the ones just after turn id `after`
+        with self.lock:
+            self.load()
+            ring = list(self.ring)
+            size = self.size
+        if limit <= 0:
+            return []
+        if after is not None:
+            if ring and after >= ring[0]['id']:
+                return [turn for turn in ring if turn['id'] > after][:limit]
+            return self.read_after(after, limit, size)
+        if before is None:
+            before = size
+        turns = [turn for turn in ring if turn['id'] < before][-limit:]
+        if len(turns) == limit:
+            return turns
+        # the ring only holds the newest turns; anything older is on disk
+        start = min(before, ring[0]['id']) if ring else before
+        return self.read_before(start, limit - len(turns)) + turns
+
+    def parse(self, offset, line):
+        try:
+            entry = json.loads(line)
+            return {'id': offset, 't': entry['t'], 'sender': entry['sender'], 'text': entry['text']}
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def read_before(self, offset, limit):
+        # the last `limit` turns whose lines start before byte `offset`, which
+        # is a line start; read backwards a block at a time
+        turns = []
+        if offset <= 0 or limit <= 0:
+            return turns
+        with open(self.path, 'rb') as f:
+            end, carry = offset, b''
+            while end > 0 and len(turns) < limit:
+                start = max(0, end - self.block_size)
+                f.seek(start)
+                chunk = f.read(end - start) + carry
+                lines = chunk.split(b'\n')
+                # unless at the start of the file the first piece is the tail
+                # of a line that began in an earlier block
+                carry = lines.pop(0) if start else b''
+                position = start + (len(carry) + 1 if start else 0)
+                found = []
+                for line in lines:
+                    if line:
+                        found.append((position, line))
+                    position += len(line) + 1
+                for position, line in reversed(found):
+                    turn = self.parse(position, line)
+                    if turn is not None:
+                        turns.append(turn)
+                        if len(turns) == limit:
+                            break
+                end = start
+        turns.reverse()
+        return turns
+
+    def read_after(self, offset, limit, size):
+        # the first `limit` turns after the one at byte `offset`, up to `size`
+        turns = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            position = offset + len(f.readline())
+            while position < size and len(turns) < limit:
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                turn = self.parse(position, line)
+                if turn is not None:
+                    turns.append(turn)
+                position += len(line)
+        return turns
+
+    def stats(self):
+        with self.lock:
+            self.load()
+            return {'in_memory': len(self.ring), 'log_bytes': self.size}
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,166 @@
+import math
+
+# Cursor filters for Controller.get_position. A filter takes the raw hand
+# position in screen pixels once per frame and returns a filtered one:
+#
+#   f.reset()                        # hand lost, or a new gesture took over
+#   x, y = f.update(x, y, t, lead)   # t: frame timestamp (s)
+#
+# `lead` is how far behind the hand the cursor will be when this frame's
+# move lands (inference, actuation and camera delay, in seconds); filters
+# that predict extrapolate by it. The cursor moves by `gain` times the
+# change in filtered position.
+#
+# Specs as used on the command line: "kalman", "one_euro:beta=0.02",
+# "kalman:q=4e6,r=30,lead_scale=0.5", "step". eval_cursor.py scores them
+# on recorded sessions.
+
+# Defaults per gesture, moving (V_GEST) and dragging (FIST). Both stay on
+# step until a filter beats it on jitter and error in
+# benchmarks/bench_cursor_filters.py: kalman halves the lag but lets through
+# more jitter, and one_euro is steadier at rest but lags behind.
+DEFAULT_MOVE_FILTER = "step"
+DEFAULT_DRAG_FILTER = "step"
+
+
+class StepRatioFilter:
+    # The original get_position rule: moves under 5 px are dropped, moves
+    # up to 30 px are scaled by 0.07 * d, anything larger by 2.1 (`gain`).
+    # Expressed in hand space, so the gain brings it back to cursor pixels.
+    def __init__(self, gain=2.1):
+        self.gain = gain
+        self.reset()
+
+    def reset(self):
+        self.raw = None
+        self.out = None
+
+    def update(self, x, y, t, lead=0.0):
+        if self.raw is None:
+            self.raw = self.out = (x, y)
+            return self.out
+        dx, dy = x - self.raw[0], y - self.raw[1]
+        distsq = dx * dx + dy * dy
+        if distsq <= 25:
+            ratio = 0.0
+        elif distsq <= 900:
+            ratio = 0.07 * math.sqrt(distsq)
+        else:
+            ratio = 2.1
+        scale = ratio / self.gain
+        self.raw = (x, y)
+        self.out = (self.out[0] + dx * scale, self.out[1] + dy * scale)
+        return self.out
+
+
+class OneEuroFilter:
+    # Casiez et al., "1€ Filter" (CHI 2012): a first-order low-pass whose
+    # cutoff rises with speed, so slow hands are smoothed hard and fast ones
+    # barely lag. min_cutoff (Hz) sets jitter at rest, beta (per px/s) how
+    # quickly the cutoff opens up. Both axes share the speed estimate.
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, gain=2.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.gain = gain
+        self.reset()
+
+    def reset(self):
+        self.t = None
+
+    def alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, x, y, t, lead=0.0):
+        if self.t is None or t <= self.t:
+            if self.t is None:
+                self.x, self.y, self.vx, self.vy = x, y, 0.0, 0.0
+            self.t = t
+            return self.x, self.y
+        dt = t - self.t
+        a = OneEuroFilter.alpha(self.d_cutoff, dt)
+        self.vx += a * ((x - self.x) / dt - self.vx)
+        self.vy += a * ((y - self.y) / dt - self.vy)
+        cutoff = self.min_cutoff + self.beta * math.hypot(self.vx, self.vy)
+        a = OneEuroFilter.alpha(cutoff, dt)
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        self.t = t
+        return self.x, self.y
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter, x and y independent. q is the
+    # white-noise acceleration density (px^2/s^3), r the landmark noise
+    # variance (px^2). Both axes see the same timing and noise, so they share
+    # one covariance. The output is extrapolated lead_scale * lead seconds
+    # ahead (capped at max_lead) to cancel the pipeline delay. Extrapolating
+    # noise makes a resting cursor shake, so the lead fades out for speeds
+    # below about lead_speed (px/s).
+    def __init__(self, q=1e6, r=100.0, lead_scale=1.0, max_lead=0.1, lead_speed=300.0, gain=2.1):
+        self.q = q
+        self.r = r
+        self.lead_scale = lead_scale
+        self.max_lead = max_lead
+        self.lead_speed = lead_speed
+        self.gain = gain
+        self.reset()
+
+    def reset(self):
+        self.t = None
+
+    def update(self, x, y, t, lead=0.0):
+        if self.t is None:
+            self.x, self.y, self.vx, self.vy = x, y, 0.0, 0.0
+            # P = [[p00, p01], [p01, p11]]; velocity starts unknown
+            self.p00, self.p01, self.p11 = self.r, 0.0, 1e6
+            self.t = t
+            return x, y
+        dt = t - self.t
+        if dt > 0:
+            # predict
+            self.x += self.vx * dt
+            self.y += self.vy * dt
+            q = self.q
+            p11 = self.p11 + q * dt
+            p01 = self.p01 + dt * self.p11 + q * dt * dt / 2
+            p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+            self.t = t
+        else:
+            p00, p01, p11 = self.p00, self.p01, self.p11
+        # correct
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        ex, ey = x - self.x, y - self.y
+        self.x += k0 * ex
+        self.y += k0 * ey
+        self.vx += k1 * ex
+        self.vy += k1 * ey
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        ahead = min(self.max_lead, max(0.0, lead * self.lead_scale))
+        if ahead and self.lead_speed:
+            speed_sq = self.vx * self.vx + self.vy * self.vy
+            ahead *= speed_sq / (speed_sq + self.lead_speed * self.lead_speed)
+        return self.x + self.vx * ahead, self.y + self.vy * ahead
+
+
+CURSOR_FILTERS = {
+    'step': StepRatioFilter,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+}
+
+
+def make_cursor_filter(spec):
+    # "kalman:q=4e6,r=30" -> KalmanFilter(q=4e6, r=30.0)
+    name, _, params = spec.partition(':')
+    if name not in CURSOR_FILTERS:
+        raise ValueError(f"unknown cursor filter {name!r} (choose from {', '.join(CURSOR_FILTERS)})")
+    kwargs = {}
+    for item in filter(None, params.split(',')):
+        key, _, value = item.partition('=')
+        kwargs[key.strip()] = float(value)
+    return CURSOR_FILTERS[name](**kwargs)
@@ -0,0 +1,144 @@
+import argparse
+import time
+
+import numpy as np
+
+from cursor_filters import make_cursor_filter
+from replay import LABELS, load_session
+
+# Scores cursor filters on recorded landmark sessions (hand_gesture.py
+# --record PATH), offline. The hand trace is landmark 9 of one hand scaled to
+# the screen, and each filter runs over it as Controller.get_position would.
+# Scoring is done on velocities, so relative filters like the original step
+# rule (which drops slow motion) are comparable with absolute ones:
+#
+#   lag     delay (ms) between the output's motion and the hand's, including
+#           the pipeline latency the output lands after; a predicting filter
+#           can bring it below that latency
+#   jitter  RMS speed error (px/s) while the hand is still or slow, with
+#           the lag taken out, i.e. landmark noise let through
+#   error   RMS speed error (px/s) against the hand while it moves, after
+#           the pipeline latency
+#
+# The hand's true motion is taken to be the trace smoothed without delay
+# (centered Gaussian over --ref-sigma frames).
+#
+#   python eval_cursor.py session.npz [--filter kalman --filter "one_euro:beta=0.02"]
+
+DEFAULT_FILTERS = ("step", "one_euro", "kalman:lead_scale=0", "kalman")
+
+
+def hand_trace(path, hand="Right", screen=(1920, 1080)):
+    # -> timestamps (F,), positions (F, 2) in px, NaN where the hand is missing
+    session = load_session(path)
+    label = LABELS.index(hand)
+    positions = np.full((len(session['timestamps']), 2), np.nan)
+    for h in range(session['labels'].shape[1]):
+        present = session['labels'][:, h] == label
+        positions[present] = session['landmarks'][present, h, 9, :2] * screen
+    return session['timestamps'], positions
+
+
+def run_filter(cursor_filter, timestamps, positions, latency):
+    # filtered positions per frame; the filter is reset wherever the hand is lost
+    out = np.full_like(positions, np.nan)
+    lost = True
+    t0 = time.perf_counter()
+    for i, (t, (x, y)) in enumerate(zip(timestamps.tolist(), positions.tolist())):
+        if x != x:   # NaN
+            lost = True
+            continue
+        if lost:
+            cursor_filter.reset()
+            lost = False
+        out[i] = cursor_filter.update(x, y, t, latency)
+    updates = int((~np.isnan(positions[:, 0])).sum())
+    return out, (time.perf_counter() - t0) / max(1, updates) * 1e6
+
+
+def smooth(positions, sigma):
+    # centered (zero-delay) Gaussian smoothing inside each run of tracked frames
+    radius = int(3 * sigma)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    out = np.full_like(positions, np.nan)
+    tracked = ~np.isnan(positions[:, 0])
+    edges = np.flatnonzero(np.diff(np.r_[0, tracked.astype(int), 0]))
+    for start, end in zip(edges[::2], edges[1::2]):
+        run = positions[start:end]
+        padded = np.pad(run, ((radius, radius), (0, 0)), mode='edge')
+        weights = np.convolve(np.ones(len(padded)), kernel, mode='valid')
+        for axis in range(2):
+            out[start:end, axis] = np.convolve(padded[:, axis], kernel, mode='valid') / weights
+    return out
+
+
+def velocity(timestamps, positions):
+    v = np.full_like(positions, np.nan)
+    dt = np.diff(timestamps)[:, None]
+    v[1:] = np.diff(positions, axis=0) / np.where(dt > 0, dt, np.nan)
+    return v
+
+
+def score(timestamps, out, reference, latency, still_speed, max_shift=0.3):
+    v_out = velocity(timestamps, out)
+    v_ref = velocity(timestamps, reference)
+    speed_ref = np.hypot(*v_ref.T)
+
+    def shifted(delay):
+        # hand velocity `delay` seconds before each output frame lands
+        t = timestamps + latency - delay
+        return np.stack([np.interp(t, timestamps, np.nan_to_num(v_ref[:, axis]))
+                         for axis in range(2)], axis=1)
+
+    valid = ~np.isnan(v_out[:, 0]) & ~np.isnan(v_ref[:, 0])
+    still = valid & (speed_ref < still_speed)
+    moving = valid & ~still
+    if not moving.any() or not still.any():
+        return float('nan'), float('nan'), float('nan')
+
+    def rms_error(delay, frames):
+        return float(np.sqrt(np.mean(np.sum((v_out[frames] - shifted(delay)[frames]) ** 2, axis=1))))
+
+    delays = np.arange(-0.1, max_shift, 0.005)
+    lag = float(delays[np.argmin([rms_error(d, moving) for d in delays])])
+    return rms_error(lag, still), lag * 1000, rms_error(0.0, moving)
+
+
+def evaluate(paths, specs, latency=0.06, hand="Right", ref_sigma=2.0, still_speed=40.0):
+    rows = []
+    traces = [hand_trace(path, hand) for path in paths]
+    for spec in specs:
+        results, costs = [], []
+        for timestamps, positions in traces:
+            out, us = run_filter(make_cursor_filter(spec), timestamps, positions, latency)
+            reference = smooth(positions, ref_sigma)
+            results.append(score(timestamps, out, reference, latency, still_speed))
+            costs.append(us)
+        jitter, lag, error = np.nanmean(np.array(results), axis=0)
+        rows.append((spec, jitter, lag, error, float(np.mean(costs))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score cursor filters on recorded landmark sessions")
+    parser.add_argument("sessions", nargs="+", help=".npz landmark sessions")
+    parser.add_argument("--filter", action="append", dest="filters", metavar="SPEC",
+                        help=f"filter spec, repeatable (default: {', '.join(DEFAULT_FILTERS)})")
+    parser.add_argument("--latency", type=float, default=0.06,
+                        help="pipeline latency (s) between a frame and its cursor move")
+    parser.add_argument("--hand", choices=LABELS, default="Right")
+    parser.add_argument("--ref-sigma", type=float, default=2.0,
+                        help="smoothing (frames) for the reference hand motion")
+    parser.add_argument("--still-speed", type=float, default=40.0,
+                        help="hand speed (px/s) below which it counts as still")
+    args = parser.parse_args()
+
+    rows = evaluate(args.sessions, args.filters or DEFAULT_FILTERS, latency=args.latency,
+                    hand=args.hand, ref_sigma=args.ref_sigma, still_speed=args.still_speed)
+    print(f"{'filter':<36} {'jitter px/s':>11} {'lag ms':>8} {'error px/s':>10} {'us/update':>9}")
+    for spec, jitter, lag, error, us in rows:
+        print(f"{spec:<36} {jitter:11.1f} {lag:8.0f} {error:10.1f} {us:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
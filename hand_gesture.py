@@ -1,21 +1,43 @@
+import argparse
+import os
 import subprocess
 import sys
-import screen_brightness_control as sbcontrol
-from google.protobuf.json_format import MessageToDict
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 import cv2
-import mediapipe as mp
-import pyautogui
+import numpy as np
 import math
+import queue
+import threading
+import time
 from enum import IntEnum
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from comtypes import GUID
-IID_IAudioEndpointVolume = GUID('{5CDF2C82-841E-4546-9722-0CF74078229A}')
+from types import SimpleNamespace
+from cursor_filters import DEFAULT_DRAG_FILTER, DEFAULT_MOVE_FILTER, make_cursor_filter
+from input_backends import INPUT_BACKENDS, default_input_backend, make_input_backend
+from metrics import Metrics
+from replay import LandmarkRecorder
+from startup import startup
+from system_controls import default_system_controls
 
-pyautogui.FAILSAFE = False
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+startup.mark("gesture imports")
+
+# MediaPipe takes longer to import than everything else put together, so it
+# is loaded on first use; GestureController starts loading it in the
+# background while the camera opens. Replays never need it.
+mp_solutions = None
+mp_lock = threading.Lock()
+
+
+def load_mediapipe():
+    global mp_solutions
+    with mp_lock:
+        if mp_solutions is None:
+            with startup.phase("import mediapipe"):
+                import mediapipe as mp
+                mp_solutions = mp.solutions
+    return mp_solutions
+
+
+def preload_mediapipe():
+    threading.Thread(target=load_mediapipe, daemon=True).start()
 
 # Gesture encoding
 
@@ -42,77 +64,177 @@ class HLabel(IntEnum):
     MAJOR = 1
 
 
+# Landmark features
+
+# Landmark pairs measured each frame: tip->mcp and mcp->wrist for the four
+# fingers, then thumb-index pinch, index-middle tip spread and knuckle width.
+PAIR_FROM = np.array([8, 12, 16, 20, 5, 9, 13, 17, 8, 8, 5])
+PAIR_TO = np.array([5, 9, 13, 17, 0, 0, 0, 0, 4, 12, 9])
+FINGER_WEIGHTS = np.array([8, 4, 2, 1])
+
+
+def landmarks_to_array(hand_result):
+    # one pass over the protobuf per hand per frame -> contiguous (21, 3)
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_result.landmark],
+                    dtype=np.float32)
+
+
+def hand_features(coords):
+    # coords is (N, 21, 3). Returns, per hand: the finger bitmask used by
+    # Gest, the thumb-index pinch distance, the index/middle spread ratio
+    # and the index/middle tip depth difference. Math is done in float64 to
+    # match the scalar code, which worked on Python floats.
+    coords = coords.astype(np.float64)
+    diff = np.take(coords, PAIR_FROM, axis=1) - np.take(coords, PAIR_TO, axis=1)
+    dist = np.hypot(diff[:, :, 0], diff[:, :, 1])
+    # positive when the first point is above the second
+    signed = np.copysign(dist, -diff[:, :, 1])
+
+    dist2 = signed[:, 4:8]
+    dist2[dist2 == 0] = 0.01
+    ratio = np.round(signed[:, :4] / dist2, 1)
+    finger = (ratio > 0.5) @ FINGER_WEIGHTS
+
+    spread = np.divide(dist[:, 9], dist[:, 10], out=np.full(len(dist), np.inf),
+                       where=dist[:, 10] != 0)
+    dz = np.abs(diff[:, 9, 2])
+    return finger, dist[:, 8], spread, dz
+
+
+def landmark_vectors(coords):
+    # (N, 21, 3) -> (N, 63) for learned classifiers: wrist at the origin,
+    # scaled so wrist -> middle knuckle is 1, and mirrored so the index
+    # knuckle is right of the pinky knuckle, which makes left and right
+    # hands look alike.
+    v = coords.astype(np.float32) - coords[:, :1]
+    scale = np.hypot(v[:, 9, 0], v[:, 9, 1])
+    scale[scale == 0] = 1.0
+    v /= scale[:, None, None]
+    flip = v[:, 5, 0] < v[:, 17, 0]
+    v[flip, :, 0] *= -1
+    return v.reshape(len(v), -1)
+
+
+# Gesture classifiers
+
+# A classifier turns a batch of hands into raw Gest values in one call:
+#   classify(coords, hand_labels) -> sequence of N gesture ints
+# coords is (N, 21, 3) normalized landmarks and hand_labels the HLabel of
+# each hand (pinches are reported as PINCH_MAJOR or PINCH_MINOR by it).
+# HandRecog debounces the output over frames, whatever produced it.
+
+
+class RuleClassifier:
+    # The original hand-tuned thresholds on hand_features().
+    pinch_dist = 0.05
+    v_spread = 1.7
+    closed_dz = 0.1
+
+    def classify(self, coords, hand_labels):
+        features = zip(*(f.tolist() for f in hand_features(coords)), hand_labels)
+        gestures = []
+        for finger, pinch, spread, dz, label in features:
+            if finger in (Gest.LAST3, Gest.LAST4) and pinch < self.pinch_dist:
+                g = Gest.PINCH_MINOR if label == HLabel.MINOR else Gest.PINCH_MAJOR
+            elif finger == Gest.FIRST2:
+                if spread > self.v_spread:
+                    g = Gest.V_GEST
+                else:
+                    g = Gest.TWO_FINGER_CLOSED if dz < self.closed_dz else Gest.MID
+            else:
+                g = finger
+            gestures.append(g)
+        return gestures
+
+
+class CentroidClassifier:
+    # Nearest class centroid on landmark_vectors(), trained from recorded
+    # sessions (see train_gestures.py). Hands further than `max_dist` from
+    # every centroid go to `fallback` (e.g. RuleClassifier) when one is set,
+    # so a model trained on a few new gestures can sit on top of the rules.
+    def __init__(self, centroids, classes, max_dist=None, fallback=None):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.classes = np.asarray(classes, dtype=np.int64)
+        self.max_dist = max_dist
+        self.fallback = fallback
+        self.sq_norms = (self.centroids ** 2).sum(axis=1)
+
+    def classify(self, coords, hand_labels):
+        x = landmark_vectors(coords)
+        # |x - c|^2 without materializing (N, K, 63)
+        d = self.sq_norms - 2.0 * (x @ self.centroids.T)
+        best = d.argmin(axis=1)
+        gestures = self.classes[best].tolist()
+        for i, g in enumerate(gestures):
+            if g == Gest.PINCH_MAJOR:
+                gestures[i] = Gest.PINCH_MINOR if hand_labels[i] == HLabel.MINOR else Gest.PINCH_MAJOR
+        if self.fallback is not None and self.max_dist is not None:
+            sq_dist = d.min(axis=1) + np.einsum('ij,ij->i', x, x)
+            if (sq_dist > self.max_dist ** 2).any():
+                unsure = np.flatnonzero(sq_dist > self.max_dist ** 2)
+                fallback = self.fallback.classify(coords[unsure], [hand_labels[i] for i in unsure])
+                for i, g in zip(unsure.tolist(), fallback):
+                    gestures[i] = g
+        return gestures
+
+    def fit(coords, gestures, fallback=None, margin=1.5):
+        # coords (N, 21, 3), gestures (N,) Gest values. Both pinches are one
+        # hand shape; classify() tells them apart by hand label. max_dist is
+        # `margin` times the 99th percentile distance of a training hand to
+        # its own centroid.
+        x = landmark_vectors(coords)
+        gestures = np.asarray(gestures, dtype=np.int64)
+        gestures = np.where(gestures == Gest.PINCH_MINOR, int(Gest.PINCH_MAJOR), gestures)
+        classes = np.unique(gestures)
+        centroids = np.stack([x[gestures == c].mean(axis=0) for c in classes])
+        own = np.linalg.norm(x - centroids[np.searchsorted(classes, gestures)], axis=1)
+        return CentroidClassifier(centroids, classes,
+                                  max_dist=float(np.percentile(own, 99) * margin),
+                                  fallback=fallback)
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, classes=self.classes,
+                 max_dist=np.nan if self.max_dist is None else self.max_dist)
+
+    def load(path, fallback=None):
+        with np.load(path) as data:
+            max_dist = float(data['max_dist'])
+            return CentroidClassifier(data['centroids'], data['classes'],
+                                      max_dist=None if math.isnan(max_dist) else max_dist,
+                                      fallback=fallback)
+
+
 class HandRecog:
-    def __init__(self, hand_label):  # Fixed constructor name to __init_
-        self.finger = 0
+    def __init__(self, hand_label, classifier=None):  # Fixed constructor name to __init_
+        self.classifier = classifier or RuleClassifier()
+        self.raw_gesture = Gest.PALM
         self.ori_gesture = Gest.PALM
         self.prev_gesture = Gest.PALM
         self.frame_count = 0
         self.hand_result = None
+        self.coords = None
         self.hand_label = hand_label
 
     def update_hand_result(self, hand_result):
         self.hand_result = hand_result
+        self.coords = None if hand_result is None else landmarks_to_array(hand_result)
 
-    def get_signed_dist(self, point):
-        sign = -1
-        if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
-            sign = 1
-        dist = (self.hand_result.landmark[point[0]].x -
-                self.hand_result.landmark[point[1]].x) ** 2
-        dist += (self.hand_result.landmark[point[0]].y -
-                 self.hand_result.landmark[point[1]].y) ** 2
-        dist = math.sqrt(dist)
-        return dist * sign
-
-    def get_dist(self, point):
-        dist = (self.hand_result.landmark[point[0]].x -
-                self.hand_result.landmark[point[1]].x) ** 2
-        dist += (self.hand_result.landmark[point[0]].y -
-                 self.hand_result.landmark[point[1]].y) ** 2
-        return math.sqrt(dist)
-
-    def get_dz(self, point):
-        return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
-
-    def set_finger_state(self):
-        if self.hand_result is None:
+    def classify(hands):
+        # Scores every tracked hand in one call, with the first hand's
+        # classifier (hands of one controller share it).
+        hands = [hand for hand in hands if hand.coords is not None]
+        if not hands:
             return
-
-        points = [[8, 5, 0], [12, 9, 0], [16, 13, 0], [20, 17, 0]]
-        self.finger = 0
-        self.finger = self.finger | 0
-        for idx, point in enumerate(points):
-            dist = self.get_signed_dist(point[:2])
-            dist2 = self.get_signed_dist(point[1:])
-            try:
-                ratio = round(dist / dist2, 1)
-            except:
-                ratio = round(dist / 0.01, 1)
-
-            self.finger = self.finger << 1
-            if ratio > 0.5:
-                self.finger = self.finger | 1
+        gestures = hands[0].classifier.classify(
+            np.stack([hand.coords for hand in hands]), [hand.hand_label for hand in hands])
+        for hand, gesture in zip(hands, gestures):
+            hand.raw_gesture = gesture
 
     def get_gesture(self):
         if self.hand_result is None:
             return Gest.PALM
 
-        current_gesture = Gest.PALM
-        if self.finger in [Gest.LAST3, Gest.LAST4] and self.get_dist([8, 4]) < 0.05:
-            current_gesture = Gest.PINCH_MINOR if self.hand_label == HLabel.MINOR else Gest.PINCH_MAJOR
-        elif self.finger == Gest.FIRST2:
-            point = [[8, 12], [5, 9]]
-            dist1 = self.get_dist(point[0])
-            dist2 = self.get_dist(point[1])
-            ratio = dist1 / dist2
-            if ratio > 1.7:
-                current_gesture = Gest.V_GEST
-            else:
-                current_gesture = Gest.TWO_FINGER_CLOSED if self.get_dz(
-                    [8, 12]) < 0.1 else Gest.MID
-        else:
-            current_gesture = self.finger
+        current_gesture = self.raw_gesture
 
         if current_gesture == self.prev_gesture:
             self.frame_count += 1
@@ -126,248 +248,992 @@ class HandRecog:
         return self.ori_gesture
 
 
+# Cursor actuation
+
+
+def ease_out_quad(u):
+    return -u * (u - 2)
+
+
+class CursorActuator:
+    # Glides the cursor toward the latest target on its own thread at a fixed
+    # rate, so the vision loop never sleeps inside a blocking moveTo. Screen
+    # size is cached and re-read on this thread, never per frame. With
+    # rate=None there is no thread: every move_to lands at once, on the
+    # caller's thread (replays use this to stay deterministic).
+    def __init__(self, backend, rate=120, glide=0.1, curve=None, geometry_interval=2.0):
+        self.backend = backend
+        self.rate = rate
+        self.glide = glide
+        self.curve = curve or ease_out_quad
+        self.geometry_interval = geometry_interval
+        self.lock = threading.Lock()
+        self.screen = backend.size()
+        self.current = backend.position()
+        self.start_pos = self.current
+        self.target = None
+        self.start_time = 0.0
+        self.last_geometry = time.perf_counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.rate is None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        with self.lock:
+            return self.target if self.target is not None else self.current
+
+    def move_to(self, x, y):
+        with self.lock:
+            if self.target == (x, y):
+                return
+            self.start_pos = self.current
+            self.target = (x, y)
+            self.start_time = time.perf_counter()
+        if self.rate is None:
+            self.finish()
+
+    def finish(self):
+        # Jump straight to the pending target, e.g. before releasing a drag.
+        with self.lock:
+            if self.target is not None:
+                self.current = self.target
+                self.target = None
+                self.backend.move_to(*self.current)
+
+    def step(self, now):
+        with self.lock:
+            if self.target is None:
+                return
+            if self.glide > 0:
+                u = min(1.0, (now - self.start_time) / self.glide)
+            else:
+                u = 1.0
+            k = self.curve(u)
+            x = int(round(self.start_pos[0] + (self.target[0] - self.start_pos[0]) * k))
+            y = int(round(self.start_pos[1] + (self.target[1] - self.start_pos[1]) * k))
+            if (x, y) != self.current:
+                self.backend.move_to(x, y)
+                self.current = (x, y)
+            if u >= 1.0:
+                self.target = None
+
+    def refresh_geometry(self, now):
+        self.last_geometry = now
+        self.screen = self.backend.size()
+        with self.lock:
+            if self.target is None:
+                # pick up cursor moves made with the physical mouse
+                self.current = self.backend.position()
+
+    def run(self):
+        interval = 1.0 / self.rate
+        while self.running:
+            now = time.perf_counter()
+            self.step(now)
+            if now - self.last_geometry >= self.geometry_interval:
+                self.refresh_geometry(now)
+            time.sleep(max(0.0, interval - (time.perf_counter() - now)))
+
+
 class Controller:
-    tx_old = 0
-    ty_old = 0
-    trial = True
-    flag = False
-    grabflag = False
-    pinchmajorflag = False
-    pinchminorflag = False
-    pinchstartxcoord = None
-    pinchstartycoord = None
-    pinchdirectionflag = None
-    prevpinchlv = 0
-    pinchlv = 0
-    framecount = 0
-    prev_hand = None
-    pinch_threshold = 0.3
-
-    def getpinchylv(hand_result):
-        return round((Controller.pinchstartycoord - hand_result.landmark[8].y) * 10, 1)
-
-    def getpinchxlv(hand_result):
-        return round((hand_result.landmark[8].x - Controller.pinchstartxcoord) * 10, 1)
-
-    def changesystembrightness():
-        current = sbcontrol.get_brightness(display=0)[0] / 100.0
-        current += Controller.pinchlv / 50.0
-        current = max(0.0, min(1.0, current))
-        sbcontrol.fade_brightness(
-            int(100 * current), start=sbcontrol.get_brightness(display=0)[0])
-
-    def changesystemvolume():
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(
-            IID_IAudioEndpointVolume, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
-        current = volume.GetMasterVolumeLevelScalar()
-        current += Controller.pinchlv / 50.0
-        current = max(0.0, min(1.0, current))
-        volume.SetMasterVolumeLevelScalar(current, None)
-
-    def scrollVertical():
-        pyautogui.scroll(120 if Controller.pinchlv > 0.0 else -120)
-
-    def scrollHorizontal():
-        pyautogui.keyDown('shift')
-        pyautogui.keyDown('ctrl')
-        pyautogui.scroll(-120 if Controller.pinchlv > 0.0 else 120)
-        pyautogui.keyUp('ctrl')
-        pyautogui.keyUp('shift')
-
-    @staticmethod
-    def get_position(hand_result):
-        point = 9  # base of index finger
-        pos = [hand_result.landmark[point].x, hand_result.landmark[point].y]
-        screen_w, screen_h = pyautogui.size()
-        x_new, y_new = int(pos[0] * screen_w), int(pos[1] * screen_h)
+    # Turns gestures into cursor, click, scroll and level actions on its own
+    # input backend, system controls and actuator. All state is per
+    # instance, so every GestureController (one per camera) has its own.
+    # With recorded_time=True timestamps come from a recording, and a frame
+    # is handled at its own timestamp rather than at the wall clock's now.
+    def __init__(self, input_backend, system_controls, actuator, cursor_filters,
+                 output_latency=0.0, pinch_threshold=0.3, recorded_time=False):
+        self.input = input_backend
+        self.system = system_controls
+        self.actuator = actuator
+        self.cursor_filters = cursor_filters   # Gest -> filter; gestures not listed use V_GEST's
+        self.cursor_filter = None
+        self.cursor_rest = [0.0, 0.0]
+        self.output_latency = output_latency   # camera + actuation delay not seen in timestamps
+        self.pinch_threshold = pinch_threshold
+        self.recorded_time = recorded_time
+        self.flag = False
+        self.grabflag = False
+        self.pinchmajorflag = False
+        self.pinchminorflag = False
+        self.pinchstartxcoord = None
+        self.pinchstartycoord = None
+        self.pinchdirectionflag = None
+        self.prevpinchlv = 0
+        self.pinchlv = 0
+        self.framecount = 0
+        self.prev_hand = None
 
-        if Controller.prev_hand is None:
-            Controller.prev_hand = [x_new, y_new]
+    def getpinchylv(self, hand_result):
+        return round((self.pinchstartycoord - hand_result.landmark[8].y) * 10, 1)
 
-        dx = x_new - Controller.prev_hand[0]
-        dy = y_new - Controller.prev_hand[1]
+    def getpinchxlv(self, hand_result):
+        return round((hand_result.landmark[8].x - self.pinchstartxcoord) * 10, 1)
 
-        distsq = dx**2 + dy**2
+    def changesystembrightness(self):
+        self.system.change_brightness(self.pinchlv / 50.0)
 
-        # Adjust ratio for smoother movement
-        if distsq <= 25:
-            ratio = 0
-        elif distsq <= 900:
-            ratio = 0.07 * math.sqrt(distsq)
-        else:
-            ratio = 2.1
+    def changesystemvolume(self):
+        self.system.change_volume(self.pinchlv / 50.0)
+
+    def scrollVertical(self):
+        self.input.scroll(120 if self.pinchlv > 0.0 else -120)
+
+    def scrollHorizontal(self):
+        self.input.hscroll(-120 if self.pinchlv > 0.0 else 120)
+
+    def get_position(self, hand_result, gesture=Gest.V_GEST, timestamp=None):
+        # The hand position goes through the gesture's cursor filter and the
+        # cursor moves by the filter's gain times the change in filtered
+        # position, relative to where it already is.
+        point = 9  # base of index finger
+        screen_w, screen_h = self.actuator.size()
+        x_new = hand_result.landmark[point].x * screen_w
+        y_new = hand_result.landmark[point].y * screen_h
+
+        now = time.perf_counter()
+        if timestamp is None:
+            timestamp = now
+        elif self.recorded_time:
+            now = timestamp
+        cursor_filter = self.cursor_filters.get(gesture) or \
+            self.cursor_filters[Gest.V_GEST]
+        if self.prev_hand is None or cursor_filter is not self.cursor_filter:
+            # hand just found, or another gesture's filter takes over
+            cursor_filter.reset()
+            self.cursor_filter = cursor_filter
+            self.prev_hand = None
+        # how old this frame will be by the time the cursor gets there
+        lead = now - timestamp + self.output_latency
+        x_f, y_f = cursor_filter.update(x_new, y_new, timestamp, lead)
+
+        if self.prev_hand is None:
+            self.prev_hand = [x_f, y_f]
+            self.cursor_rest = [0.0, 0.0]
 
-        Controller.prev_hand = [x_new, y_new]
+        # whole pixels now, the fraction carried to the next frame
+        dx = (x_f - self.prev_hand[0]) * cursor_filter.gain + self.cursor_rest[0]
+        dy = (y_f - self.prev_hand[1]) * cursor_filter.gain + self.cursor_rest[1]
+        step_x, step_y = int(dx), int(dy)
+        self.cursor_rest = [dx - step_x, dy - step_y]
+        self.prev_hand = [x_f, y_f]
 
         # Apply movement
-        x_old, y_old = pyautogui.position()
-        return x_old + int(dx * ratio), y_old + int(dy * ratio)
-
-    def pinch_control_init(hand_result):
-        Controller.pinchstartxcoord = hand_result.landmark[8].x
-        Controller.pinchstartycoord = hand_result.landmark[8].y
-        Controller.pinchlv = 0
-        Controller.prevpinchlv = 0
-        Controller.framecount = 0
-
-    def pinch_control(hand_result, controlHorizontal, controlVertical):
-        if Controller.framecount == 5:
-            Controller.framecount = 0
-            Controller.pinchlv = Controller.prevpinchlv
-            if Controller.pinchdirectionflag:
+        x_old, y_old = self.actuator.position()
+        return x_old + step_x, y_old + step_y
+
+    def pinch_control_init(self, hand_result):
+        self.pinchstartxcoord = hand_result.landmark[8].x
+        self.pinchstartycoord = hand_result.landmark[8].y
+        self.pinchlv = 0
+        self.prevpinchlv = 0
+        self.framecount = 0
+
+    def pinch_control(self, hand_result, controlHorizontal, controlVertical):
+        if self.framecount == 5:
+            self.framecount = 0
+            self.pinchlv = self.prevpinchlv
+            if self.pinchdirectionflag:
                 controlHorizontal()
             else:
                 controlVertical()
 
-        lvx = Controller.getpinchxlv(hand_result)
-        lvy = Controller.getpinchylv(hand_result)
+        lvx = self.getpinchxlv(hand_result)
+        lvy = self.getpinchylv(hand_result)
 
-        if abs(lvy) > abs(lvx) and abs(lvy) > Controller.pinch_threshold:
-            Controller.pinchdirectionflag = False
-            if abs(Controller.prevpinchlv - lvy) < Controller.pinch_threshold:
-                Controller.framecount += 1
+        if abs(lvy) > abs(lvx) and abs(lvy) > self.pinch_threshold:
+            self.pinchdirectionflag = False
+            if abs(self.prevpinchlv - lvy) < self.pinch_threshold:
+                self.framecount += 1
             else:
-                Controller.prevpinchlv = lvy
-                Controller.framecount = 0
-        elif abs(lvx) > Controller.pinch_threshold:
-            Controller.pinchdirectionflag = True
-            if abs(Controller.prevpinchlv - lvx) < Controller.pinch_threshold:
-                Controller.framecount += 1
+                self.prevpinchlv = lvy
+                self.framecount = 0
+        elif abs(lvx) > self.pinch_threshold:
+            self.pinchdirectionflag = True
+            if abs(self.prevpinchlv - lvx) < self.pinch_threshold:
+                self.framecount += 1
             else:
-                Controller.prevpinchlv = lvx
-                Controller.framecount = 0
+                self.prevpinchlv = lvx
+                self.framecount = 0
 
-    def handle_controls(gesture, hand_result):
+    def handle_controls(self, gesture, hand_result, timestamp=None):
         x, y = None, None
         if gesture != Gest.PALM:
-            x, y = Controller.get_position(hand_result)
+            x, y = self.get_position(hand_result, gesture, timestamp)
 
-        if gesture != Gest.FIST and Controller.grabflag:
-            Controller.grabflag = False
-            pyautogui.mouseUp(button="left")
-        if gesture != Gest.PINCH_MAJOR and Controller.pinchmajorflag:
-            Controller.pinchmajorflag = False
-        if gesture != Gest.PINCH_MINOR and Controller.pinchminorflag:
-            Controller.pinchminorflag = False
+        if gesture != Gest.FIST and self.grabflag:
+            self.grabflag = False
+            self.actuator.finish()
+            self.input.mouse_up()
+        if gesture != Gest.PINCH_MAJOR and self.pinchmajorflag:
+            self.pinchmajorflag = False
+        if gesture != Gest.PINCH_MINOR and self.pinchminorflag:
+            self.pinchminorflag = False
 
         if gesture == Gest.V_GEST:
-            Controller.flag = True
-            pyautogui.moveTo(x, y, duration=0.1)
+            self.flag = True
+            self.actuator.move_to(x, y)
         elif gesture == Gest.FIST:
-            if not Controller.grabflag:
-                Controller.grabflag = True
-                pyautogui.mouseDown(button="left")
-            pyautogui.moveTo(x, y, duration=0.1)
-        elif gesture == Gest.MID and Controller.flag:
-            pyautogui.click()
-            Controller.flag = False
-        elif gesture == Gest.INDEX and Controller.flag:
-            pyautogui.click(button='right')
-            Controller.flag = False
-        elif gesture == Gest.TWO_FINGER_CLOSED and Controller.flag:
-            pyautogui.doubleClick()
-            Controller.flag = False
+            if not self.grabflag:
+                self.grabflag = True
+                self.input.mouse_down()
+            self.actuator.move_to(x, y)
+        elif gesture == Gest.MID and self.flag:
+            self.input.click()
+            self.flag = False
+        elif gesture == Gest.INDEX and self.flag:
+            self.input.click(button='right')
+            self.flag = False
+        elif gesture == Gest.TWO_FINGER_CLOSED and self.flag:
+            self.input.double_click()
+            self.flag = False
         elif gesture == Gest.PINCH_MINOR:
-            if not Controller.pinchminorflag:
-                Controller.pinch_control_init(hand_result)
-                Controller.pinchminorflag = True
-            Controller.pinch_control(
-                hand_result, Controller.scrollHorizontal, Controller.scrollVertical)
+            if not self.pinchminorflag:
+                self.pinch_control_init(hand_result)
+                self.pinchminorflag = True
+            self.pinch_control(
+                hand_result, self.scrollHorizontal, self.scrollVertical)
         elif gesture == Gest.PINCH_MAJOR:
-            if not Controller.pinchmajorflag:
-                Controller.pinch_control_init(hand_result)
-                Controller.pinchmajorflag = True
-            Controller.pinch_control(
-                hand_result, Controller.changesystembrightness, Controller.changesystemvolume)
+            if not self.pinchmajorflag:
+                self.pinch_control_init(hand_result)
+                self.pinchmajorflag = True
+            self.pinch_control(
+                hand_result, self.changesystembrightness, self.changesystemvolume)
+
+
+# Pipeline stages
+
+
+def reuse(buffer, shape, dtype=np.uint8):
+    # `buffer` while it still has the right shape, a new array when it doesn't
+    if buffer is None or buffer.shape != shape:
+        return np.empty(shape, dtype)
+    return buffer
+
+
+class FramePool:
+    # Camera frames are read into arrays from here (cap.read(image)) and
+    # handed back with put() once nobody looks at them any more, so the loop
+    # stops allocating a full frame per read. Whoever holds a frame owns it:
+    # the loop until it's rendered, the preview until it's drawn, the grabber
+    # until it's read. The pool only allocates while it warms up, or after
+    # the frame size changes.
+    def __init__(self, max_free=8):
+        self.free = []
+        self.shape = None
+        self.max_free = max_free
+        self.lock = threading.Lock()
+
+    def get(self):
+        with self.lock:
+            return self.free.pop() if self.free else None
+
+    def put(self, frame):
+        if frame is None:
+            return
+        with self.lock:
+            if frame.shape != self.shape:
+                self.shape = frame.shape
+                self.free = []
+            if len(self.free) < self.max_free:
+                self.free.append(frame)
+
+    def read(self, cap):
+        # cap.read() into a pooled array; a cv2.VideoCapture reallocates on
+        # its own if the size changed
+        buffer = self.get()
+        return cap.read(buffer)
+
+
+class FrameGrabber:
+    # Reads the camera on its own thread and keeps only the newest frame,
+    # so frames never pile up in the driver while a later stage is busy.
+    # A source that isn't live (a video or replay) waits for its frame to be
+    # taken instead, so every frame is processed.
+    def __init__(self, cap, metrics, live=True, pool=None):
+        self.cap = cap
+        self.metrics = metrics
+        self.live = live
+        self.pool = pool or FramePool()
+        self.frame = None
+        self.timestamp = 0.0
+        self.dropped = 0
+        self.running = False
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running and self.cap.isOpened():
+            t0 = time.perf_counter()
+            success, image = self.pool.read(self.cap)
+            t1 = time.perf_counter()
+            if not success:
+                if not self.live:
+                    break
+                time.sleep(0.005)
+                continue
+            self.metrics.record('capture', t0, t1)
+            with self.cond:
+                if not self.live:
+                    self.cond.wait_for(lambda: self.frame is None or not self.running)
+                if self.frame is not None:
+                    self.dropped += 1
+                    self.metrics.count('dropped_frames')
+                    self.pool.put(self.frame)
+                self.frame = image
+                self.timestamp = t1
+                self.cond.notify()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def read(self, timeout=1.0):
+        with self.cond:
+            self.cond.wait_for(
+                lambda: self.frame is not None or not self.running, timeout)
+            image, self.frame = self.frame, None
+            self.cond.notify_all()
+            return image, self.timestamp
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+
+class ActionWorker:
+    # Runs controller.handle_controls off the vision thread. The queue is
+    # bounded; when it is full the oldest pending action is dropped, or with
+    # block=True (sources that aren't live) submit waits for room.
+    def __init__(self, controller, metrics, maxsize=2, block=False):
+        self.controller = controller
+        self.queue = queue.Queue(maxsize)
+        self.metrics = metrics
+        self.block = block
+        self.dropped = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, gesture, hand_result, timestamp, frame_time=None):
+        # `timestamp` is when the frame was read, for the metrics; the
+        # controller sees `frame_time` when it differs (recorded sessions)
+        item = (gesture, hand_result, timestamp,
+                timestamp if frame_time is None else frame_time)
+        if self.block:
+            self.queue.put(item)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                    self.metrics.count('dropped_actions')
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            gesture, hand_result, timestamp, frame_time = item
+            t0 = time.perf_counter()
+            if gesture is None:
+                self.controller.prev_hand = None
+            else:
+                self.controller.handle_controls(gesture, hand_result, frame_time)
+                t1 = time.perf_counter()
+                self.metrics.record('controls', t0, t1)
+                self.metrics.record('end_to_end', timestamp, t1)
+
+    def stop(self):
+        if self.block:
+            self.queue.put(None)   # after whatever is still queued
+            if self.thread is not None:
+                self.thread.join()
+            return
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+
+class HandTracker:
+    # Wraps mp_hands.Hands. Frames can be shrunk to `infer_width` before
+    # inference, and in ROI mode only a padded box around the hands seen last
+    # frame is converted and processed. The frame is never flipped: landmarks
+    # are mirrored and handedness labels swapped afterwards instead, which
+    # gives the same results as processing the mirrored image. Landmarks are
+    # always mapped back to full-frame mirrored coordinates. Resized and RGB
+    # images go into buffers kept across frames. The box only moves when the hands get
+    # near its edge, which keeps MediaPipe's own frame-to-frame tracking
+    # valid. It falls back to the full frame when tracking is lost, and
+    # every `roi_refresh` frames while fewer than two hands are tracked.
+    def __init__(self, metrics, infer_width=None, roi=False, roi_padding=0.3, roi_refresh=30):
+        self.metrics = metrics
+        self.infer_width = infer_width
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self.roi_refresh = roi_refresh
+        self.box = None
+        self.frames_in_roi = 0
+        self.small = None
+        self.rgb = None
+        solutions = load_mediapipe()
+        with startup.phase("hand tracker init"):
+            self.hands = solutions.hands.Hands(
+                max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.hands.close()
+
+    def process(self, frame):
+        t0 = time.perf_counter()
+        frame_h, frame_w = frame.shape[:2]
+        box = self.box if self.roi else None
+        if box is not None and self.frames_in_roi >= self.roi_refresh:
+            box = None
+        if box is None:
+            crop = frame
+            self.frames_in_roi = 0
+        else:
+            # box is in mirrored coordinates, the frame isn't mirrored
+            px0, py0 = int(box[0] * frame_w), int(box[1] * frame_h)
+            px1, py1 = int(box[2] * frame_w), int(box[3] * frame_h)
+            crop = frame[py0:py1, frame_w - px1:frame_w - px0]
+            box = (px0 / frame_w, py0 / frame_h, px1 / frame_w, py1 / frame_h)
+            self.frames_in_roi += 1
+
+        crop_h, crop_w = crop.shape[:2]
+        if self.infer_width and crop_w > self.infer_width:
+            size = (self.infer_width, max(1, round(crop_h * self.infer_width / crop_w)))
+            self.small = reuse(self.small, (size[1], size[0], 3))
+            crop = cv2.resize(crop, size, dst=self.small, interpolation=cv2.INTER_AREA)
+        self.rgb = reuse(self.rgb, crop.shape)
+        self.rgb.flags.writeable = True
+        image = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        image.flags.writeable = False
+        t1 = time.perf_counter()
+        self.metrics.record('convert', t0, t1)
+        results = self.hands.process(image)
+        self.metrics.record('inference', t1)
+
+        if results.multi_hand_landmarks:
+            HandTracker.mirror(results, box)
+        if self.roi:
+            self.update_box(results.multi_hand_landmarks, frame_w, frame_h)
+        return results
+
+    def mirror(results, box=None):
+        # unmirrored crop coordinates -> mirrored full-frame ones, and the
+        # handedness MediaPipe would have reported on the mirrored image
+        x0, y0, x1, y1 = box or (0.0, 0.0, 1.0, 1.0)
+        w, h = x1 - x0, y1 - y0
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = x0 + (1.0 - lm.x) * w
+                lm.y = y0 + lm.y * h
+                lm.z = lm.z * w
+        for handedness in results.multi_handedness:
+            classification = handedness.classification[0]
+            classification.label = 'Left' if classification.label == 'Right' else 'Right'
+
+    def update_box(self, hand_landmarks, frame_w, frame_h):
+        if not hand_landmarks:
+            self.box = None
+            return
+        if len(hand_landmarks) >= 2:
+            self.frames_in_roi = 0
+        xs = [lm.x for hand in hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in hand_landmarks for lm in hand.landmark]
+        hx0, hx1, hy0, hy1 = min(xs), max(xs), min(ys), max(ys)
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            margin_x = (x1 - x0) * self.roi_padding / (1 + 2 * self.roi_padding) / 2
+            margin_y = (y1 - y0) * self.roi_padding / (1 + 2 * self.roi_padding) / 2
+            if (hx0 - x0 >= margin_x and x1 - hx1 >= margin_x and
+                    hy0 - y0 >= margin_y and y1 - hy1 >= margin_y):
+                return
+        # square box in pixels around the hands, padded on every side
+        cx, cy = (hx0 + hx1) / 2 * frame_w, (hy0 + hy1) / 2 * frame_h
+        half = max((hx1 - hx0) * frame_w, (hy1 - hy0) * frame_h) * (0.5 + self.roi_padding)
+        x0, x1 = max(0.0, cx - half) / frame_w, min(frame_w, cx + half) / frame_w
+        y0, y1 = max(0.0, cy - half) / frame_h, min(frame_h, cy + half) / frame_h
+        self.box = (x0, y0, x1, y1)
+
+
+NO_HANDS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+
+class IdleScheduler:
+    # Decides per frame whether hand tracking runs. After `idle_after` frames
+    # with no hand it only runs when a cheap frame-difference motion gate
+    # fires, or at least every `max_wake_latency` seconds, so a hand that
+    # slides in slowly is still found in bounded time. Any hand puts it back
+    # to full rate. CPU time is accounted per state and logged every
+    # `report_interval` seconds as CPU seconds per minute.
+    def __init__(self, idle_after=30, max_wake_latency=0.5, motion_threshold=8.0,
+                 motion_size=(32, 24), report_interval=60.0):
+        self.idle_after = idle_after
+        self.max_wake_latency = max_wake_latency
+        self.motion_threshold = motion_threshold
+        self.motion_size = motion_size
+        self.report_interval = report_interval
+        self.empty_frames = 0
+        self.idle = False
+        self.last_run = 0.0
+        self.small = None
+        self.prev_small = None
+        self.spare = None
+        self.diff = None
+        self.cpu = {'active': 0.0, 'idle': 0.0}
+        self.wall = {'active': 0.0, 'idle': 0.0}
+        self.last_cpu = time.process_time()
+        self.last_wall = time.perf_counter()
+        self.last_report = self.last_wall
+
+    def should_run(self, frame, now):
+        if not self.idle or now - self.last_run >= self.max_wake_latency:
+            return True
+        return self.motion(frame)
+
+    def motion(self, frame):
+        w, h = self.motion_size
+        self.small = cv2.resize(frame, self.motion_size, dst=reuse(self.small, (h, w, 3)),
+                                interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=reuse(self.spare, (h, w)))
+        prev, self.prev_small = self.prev_small, small
+        self.spare = prev
+        if prev is None:
+            return True
+        self.diff = cv2.absdiff(small, prev, dst=reuse(self.diff, (h, w)))
+        return self.diff.mean() > self.motion_threshold
+
+    def update(self, has_hands, now):
+        self.last_run = now
+        if has_hands:
+            self.empty_frames = 0
+            self.idle = False
+        else:
+            self.empty_frames += 1
+            self.idle = self.empty_frames >= self.idle_after
+
+    def account(self, now):
+        cpu = time.process_time()
+        state = 'idle' if self.idle else 'active'
+        self.cpu[state] += cpu - self.last_cpu
+        self.wall[state] += now - self.last_wall
+        self.last_cpu, self.last_wall = cpu, now
+        if now - self.last_report >= self.report_interval:
+            self.last_report = now
+            print(" | ".join(f"{state}: {self.cpu_per_minute(state):.1f} s CPU/min "
+                             f"over {self.wall[state]:.0f} s" for state in ('active', 'idle')))
+
+    def cpu_per_minute(self, state):
+        if self.wall[state] == 0:
+            return 0.0
+        return self.cpu[state] / self.wall[state] * 60.0
+
+
+class PreviewRenderer:
+    # Owns the preview window. Frames are drawn on this thread, at most `fps`
+    # times a second and on a downscaled copy, so the control loop only pays
+    # for handing over a reference. Submitted frames go back to `pool` once
+    # drawn or replaced.
+    def __init__(self, metrics, fps=15, scale=0.5, window='Gesture Controller', pool=None):
+        self.metrics = metrics
+        self.pool = pool or FramePool()
+        self.small = None
+        self.mirrored = None
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.scale = scale
+        self.window = window
+        self.cond = threading.Condition()
+        self.pending = None
+        self.last_submit = 0.0
+        self.closed = False
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def due(self, now):
+        return now - self.last_submit >= self.interval
+
+    def submit(self, image, hand_landmarks, now):
+        with self.cond:
+            if self.pending is not None:
+                self.pool.put(self.pending[0])
+            self.pending = (image, hand_landmarks)
+            self.last_submit = now
+            self.cond.notify()
+
+    def draw(self, image, hand_landmarks):
+        # image is the raw BGR camera frame; mirror it after shrinking
+        if self.scale != 1.0:
+            h, w = image.shape[:2]
+            size = (max(1, round(w * self.scale)), max(1, round(h * self.scale)))
+            self.small = reuse(self.small, (size[1], size[0]) + image.shape[2:])
+            image = cv2.resize(image, size, dst=self.small, interpolation=cv2.INTER_AREA)
+        self.mirrored = reuse(self.mirrored, image.shape)
+        image = cv2.flip(image, 1, dst=self.mirrored)
+        solutions = load_mediapipe()
+        for landmarks in hand_landmarks or []:
+            solutions.drawing_utils.draw_landmarks(
+                image, landmarks, solutions.hands.HAND_CONNECTIONS)
+        cv2.imshow(self.window, image)
+
+    def run(self):
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending is not None or not self.running,
+                                   max(self.interval, 0.05))
+                pending, self.pending = self.pending, None
+            if pending is not None:
+                t0 = time.perf_counter()
+                self.draw(*pending)
+                self.pool.put(pending[0])
+                self.metrics.record('render', t0)
+            # keep the window responsive even when no frame came in
+            if cv2.waitKey(1) & 0xFF == 13:  # Press Enter to exit
+                self.closed = True
+        cv2.destroyAllWindows()
 
 
 class GestureController:
-    gc_mode = 0
-    cap = None
-    CAM_HEIGHT = None
-    CAM_WIDTH = None
-    hr_major = None
-    hr_minor = None
+    # One camera pipeline: capture, tracking, classification and its own
+    # Controller. Everything lives on the instance, so several can run side
+    # by side (supervisor.py runs one per process).
     dom_hand = True
+    track_radius = 0.15
+    action_queue_size = 2
+    roi_padding = 0.3
+    roi_refresh = 30
 
-    def __init__(self):  # Fixed constructor name to __init_
-        GestureController.gc_mode = 1
-        GestureController.cap = cv2.VideoCapture(0)
-        GestureController.CAM_HEIGHT = GestureController.cap.get(
-            cv2.CAP_PROP_FRAME_HEIGHT)
-        GestureController.CAM_WIDTH = GestureController.cap.get(
-            cv2.CAP_PROP_FRAME_WIDTH)
-        GestureController.cap.set(cv2.CAP_PROP_FPS, 30)  # Try 30 or higher
-
-    def classify_hands(results):
-        left, right = None, None
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[0])
-            if handedness_dict['classification'][0]['label'] == 'Right':
-                right = results.multi_hand_landmarks[0]
-            else:
-                left = results.multi_hand_landmarks[0]
-        except:
-            pass
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[1])
-            if handedness_dict['classification'][0]['label'] == 'Right':
-                right = results.multi_hand_landmarks[1]
-            else:
-                left = results.multi_hand_landmarks[1]
-        except:
-            pass
+    def __init__(self, pipelined=False, actuation_rate=120, glide=0.1, curve=None,
+                 headless=False, preview_fps=15, preview_scale=0.5,
+                 infer_width=None, roi=False,
+                 idle=True, idle_after=30, idle_wake=0.5, motion_threshold=8.0,
+                 metrics=None, source=0, input_backend=None, system_controls=None,
+                 tracker_factory=None, on_gesture=None, recorder=None,
+                 classifier=None, cursor_filters=None,
+                 camera_latency=0.03, recorded_time=False):  # Fixed constructor name to __init_
+        self.gc_mode = 1
+        if tracker_factory is None:
+            preload_mediapipe()
+        self.metrics = metrics or Metrics(enabled=False)
+        self.tracker_factory = tracker_factory
+        self.on_gesture = on_gesture
+        self.recorder = recorder
+        self.classifier = classifier or RuleClassifier()
+        self.hr_major = None
+        self.hr_minor = None
+        self.hand_centers = {'Right': None, 'Left': None}
+        self.scheduler = IdleScheduler(
+            idle_after=idle_after, max_wake_latency=idle_wake,
+            motion_threshold=motion_threshold) if idle else None
+        self.pipelined = pipelined
+        self.infer_width = infer_width
+        self.roi = roi
+        self.pool = FramePool()
+        self.preview = None if headless else PreviewRenderer(
+            self.metrics, fps=preview_fps, scale=preview_scale, pool=self.pool)
+        if input_backend is None:
+            with startup.phase("input backend"):
+                input_backend = default_input_backend()
+        # Gest -> filter; V_GEST's is used for gestures without their own
+        cursor_filters = cursor_filters or {
+            Gest.V_GEST: make_cursor_filter(DEFAULT_MOVE_FILTER),
+            Gest.FIST: make_cursor_filter(DEFAULT_DRAG_FILTER),
+        }
+        # the glide reaches about half way in glide / 2
+        self.controller = Controller(
+            input_backend, system_controls or default_system_controls(),
+            CursorActuator(input_backend, rate=actuation_rate, glide=glide, curve=curve),
+            cursor_filters, output_latency=camera_latency + glide / 2,
+            recorded_time=recorded_time)
+        # a camera index is live; a video path or capture-like object is
+        # replayed once and the loop stops at its end
+        self.live = isinstance(source, int)
+        if isinstance(source, (int, str)):
+            with startup.phase("open camera"):
+                self.cap = cv2.VideoCapture(source)
+        else:
+            self.cap = source
+        self.CAM_HEIGHT = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        self.CAM_WIDTH = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        self.cap.set(cv2.CAP_PROP_FPS, 30)  # Try 30 or higher
+
+    def classify_hands(self, results):
+        # Handedness is read straight off the protobuf, most confident hand
+        # first. Two hands can't share a label, and anything past two is
+        # ignored.
+        hands = sorted(
+            zip(results.multi_handedness, results.multi_hand_landmarks),
+            key=lambda hand: -hand[0].classification[0].score)
+        slots = {}
+        for handedness, landmarks in hands:
+            label = handedness.classification[0].label
+            if label in slots:
+                label = 'Left' if label == 'Right' else 'Right'
+                if label in slots:
+                    continue
+            slots[label] = landmarks
+        slots = self.track_hands(slots)
+        right, left = slots.get('Right'), slots.get('Left')
+
+        if self.dom_hand:
+            self.hr_major = right
+            self.hr_minor = left
+        else:
+            self.hr_major = left
+            self.hr_minor = right
+
+    def track_hands(self, slots):
+        # MediaPipe sometimes swaps the labels of hands that haven't moved.
+        # Keep each hand in the slot whose last position it is closest to.
+        prev = self.hand_centers
+        centers = {label: (landmarks.landmark[9].x, landmarks.landmark[9].y)
+                   for label, landmarks in slots.items()}
+
+        def dist(a, b):
+            return math.hypot(a[0] - b[0], a[1] - b[1])
+
+        swap = False
+        if len(slots) == 2 and prev['Right'] and prev['Left']:
+            keep_cost = dist(centers['Right'], prev['Right']) + \
+                dist(centers['Left'], prev['Left'])
+            swap_cost = dist(centers['Right'], prev['Left']) + \
+                dist(centers['Left'], prev['Right'])
+            swap = swap_cost < keep_cost
+        elif len(slots) == 1:
+            label = next(iter(slots))
+            other = 'Left' if label == 'Right' else 'Right'
+            swap = (prev[label] is None and prev[other] is not None and
+                    dist(centers[label], prev[other]) < self.track_radius)
+        if swap:
+            slots = {('Left' if label == 'Right' else 'Right'): landmarks
+                     for label, landmarks in slots.items()}
+            centers = {('Left' if label == 'Right' else 'Right'): center
+                       for label, center in centers.items()}
+
+        self.hand_centers = {
+            'Right': centers.get('Right'), 'Left': centers.get('Left')}
+        return slots
+
+    def detect(self, tracker, image):
+        scheduler = self.scheduler
+        now = time.perf_counter()
+        startup.mark("first frame")
+        if scheduler is not None:
+            scheduler.account(now)
+            if not scheduler.should_run(image, now):
+                self.metrics.count('skipped_frames')
+                return NO_HANDS
+        results = tracker.process(image)
+        if self.recorder is not None:
+            self.recorder.add(results, now)
+        if not results.multi_hand_landmarks:
+            self.hand_centers = {'Right': None, 'Left': None}
+        else:
+            startup.mark("first hand")
+        if scheduler is not None:
+            scheduler.update(bool(results.multi_hand_landmarks), now)
+        return results
+
+    def frame_time(self, image, timestamp):
+        # when the controller sees the frame: when it was read, or with
+        # recorded_time the timestamp its capture recorded (image.timestamp)
+        if self.controller.recorded_time:
+            return image.timestamp
+        return timestamp
+
+    def make_tracker(self):
+        if self.tracker_factory is not None:
+            return self.tracker_factory()
+        return HandTracker(self.metrics,
+                           infer_width=self.infer_width,
+                           roi=self.roi,
+                           roi_padding=self.roi_padding,
+                           roi_refresh=self.roi_refresh)
+
+    def select_gesture(self, results, handmajor, handminor):
+        metrics = self.metrics
+        t0 = time.perf_counter()
+        self.classify_hands(results)
+        t1 = time.perf_counter()
+        metrics.record('classify', t0, t1)
+        handmajor.update_hand_result(self.hr_major)
+        handminor.update_hand_result(self.hr_minor)
+        HandRecog.classify([handmajor, handminor])
+        metrics.record('features', t1)
+        gest_name = handminor.get_gesture()
+        if gest_name == Gest.PINCH_MINOR:
+            hand_result = handminor.hand_result
+        else:
+            gest_name = handmajor.get_gesture()
+            hand_result = handmajor.hand_result
+        startup.mark("first gesture")
+        if self.on_gesture is not None:
+            self.on_gesture(gest_name)
+        return gest_name, hand_result
 
-        if GestureController.dom_hand:
-            GestureController.hr_major = right
-            GestureController.hr_minor = left
+    def render(self, image, results):
+        # Hands the frame to the preview thread when one is due, otherwise
+        # back to the pool; returns False once the preview window asked to
+        # quit.
+        preview = self.preview
+        if preview is None:
+            self.pool.put(image)
+            return True
+        now = time.perf_counter()
+        if preview.due(now):
+            preview.submit(image, results.multi_hand_landmarks, now)
         else:
-            GestureController.hr_major = left
-            GestureController.hr_minor = right
+            self.pool.put(image)
+        return not preview.closed
+
+    def stop(self):
+        # safe from any thread; the loop exits after the current frame
+        self.gc_mode = 0
 
     def start(self):
-        handmajor = HandRecog(HLabel.MAJOR)
-        handminor = HandRecog(HLabel.MINOR)
-        with mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
-            while GestureController.cap.isOpened() and GestureController.gc_mode:
-                success, image = GestureController.cap.read()
+        self.controller.actuator.start()
+        if self.preview is not None:
+            self.preview.start()
+        try:
+            if self.pipelined:
+                self.run_pipelined()
+            else:
+                self.run_sequential()
+        finally:
+            self.controller.actuator.stop()
+            self.controller.input.close()
+            self.controller.system.close()
+            if self.preview is not None:
+                self.preview.stop()
+            if self.recorder is not None:
+                self.recorder.save()
+            self.cap.release()
+
+    def run_sequential(self):
+        metrics = self.metrics
+        controller = self.controller
+        handmajor = HandRecog(HLabel.MAJOR, self.classifier)
+        handminor = HandRecog(HLabel.MINOR, self.classifier)
+        with self.make_tracker() as tracker:
+            while self.cap.isOpened() and self.gc_mode:
+                t0 = time.perf_counter()
+                success, image = self.pool.read(self.cap)
+                timestamp = time.perf_counter()
                 if not success:
+                    if not self.live:
+                        break
                     print("Ignoring empty camera frame.")
+                    metrics.count('empty_frames')
                     continue
+                metrics.record('capture', t0, timestamp)
 
-                image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = hands.process(image)
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                results = self.detect(tracker, image)
 
                 if results.multi_hand_landmarks:
-                    GestureController.classify_hands(results)
-                    handmajor.update_hand_result(GestureController.hr_major)
-                    handminor.update_hand_result(GestureController.hr_minor)
-                    handmajor.set_finger_state()
-                    handminor.set_finger_state()
-                    gest_name = handminor.get_gesture()
-                    if gest_name == Gest.PINCH_MINOR:
-                        Controller.handle_controls(
-                            gest_name, handminor.hand_result)
-                    else:
-                        gest_name = handmajor.get_gesture()
-                        Controller.handle_controls(
-                            gest_name, handmajor.hand_result)
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(
-                            image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                    gest_name, hand_result = self.select_gesture(
+                        results, handmajor, handminor)
+                    t1 = time.perf_counter()
+                    controller.handle_controls(gest_name, hand_result,
+                                               self.frame_time(image, timestamp))
+                    t2 = time.perf_counter()
+                    metrics.record('controls', t1, t2)
+                    metrics.record('end_to_end', timestamp, t2)
                 else:
-                    Controller.prev_hand = None
+                    controller.prev_hand = None
+                metrics.frame()
 
-                cv2.imshow('Gesture Controller', image)
-                if cv2.waitKey(1) & 0xFF == 13:  # Press Enter to exit
+                if not self.render(image, results):
                     break
-        GestureController.cap.release()
-        cv2.destroyAllWindows()
+
+    def run_pipelined(self):
+        # capture -> inference (this thread) -> actuation, each stage timed
+        # separately so a slow stage can't stall the camera
+        metrics = self.metrics
+        grabber = FrameGrabber(self.cap, metrics, live=self.live, pool=self.pool)
+        worker = ActionWorker(self.controller, metrics, maxsize=self.action_queue_size,
+                              block=not self.live)
+        handmajor = HandRecog(HLabel.MAJOR, self.classifier)
+        handminor = HandRecog(HLabel.MINOR, self.classifier)
+        grabber.start()
+        worker.start()
+        try:
+            with self.make_tracker() as tracker:
+                while self.gc_mode:
+                    image, timestamp = grabber.read()
+                    if image is None:
+                        if not grabber.running:
+                            break   # the source ended and its last frame was taken
+                        continue
+
+                    results = self.detect(tracker, image)
+                    if results.multi_hand_landmarks:
+                        gest_name, hand_result = self.select_gesture(
+                            results, handmajor, handminor)
+                        worker.submit(gest_name, hand_result, timestamp,
+                                      self.frame_time(image, timestamp))
+                    else:
+                        worker.submit(None, None, timestamp)
+                    metrics.frame()
+
+                    if not self.render(image, results):
+                        break
+        finally:
+            grabber.stop()
+            worker.stop()
 
 # === ENTRY POINT ===
 
@@ -378,13 +1244,104 @@ def run_voice_assistant():
 
 
 def run_app():
-    subprocess.Popen([sys.executable, "app.py"])
+    # lets the assistant report this process's CPU and memory
+    env = dict(os.environ, GESTURE_PID=str(os.getpid()))
+    subprocess.Popen([sys.executable, "app.py"], env=env)
 
 
-if __name__ == "__main__":
-    # Start web UI (app.py) in a separate process
-    run_app()
+def run_app_here():
+    # Single-process launch: eel's loop needs the main thread, so the caller
+    # moves the gesture loop to a worker first. app and its imports load
+    # while the camera opens and MediaPipe loads.
+    import app
+    app.main()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gesture controlled mouse")
+    parser.add_argument("--source", default="0",
+                        help="camera index, or a video file to replay")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="save the tracked landmarks to a .npz replay file")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, inference and actuation on separate threads")
+    parser.add_argument("--headless", action="store_true",
+                        help="no preview window (stop with Ctrl+C)")
+    parser.add_argument("--preview-fps", type=float, default=15,
+                        help="preview refresh rate")
+    parser.add_argument("--preview-scale", type=float, default=0.5,
+                        help="preview size relative to the camera frame")
+    parser.add_argument("--infer-width", type=int, default=None,
+                        help="downscale frames to this width before hand tracking")
+    parser.add_argument("--roi", action="store_true",
+                        help="only track inside a box around the hands seen last frame")
+    parser.add_argument("--no-idle", action="store_true",
+                        help="run hand tracking on every frame even with no hands in view")
+    parser.add_argument("--idle-after", type=int, default=30,
+                        help="hand-free frames before dropping to idle rate")
+    parser.add_argument("--idle-wake", type=float, default=0.5,
+                        help="longest time (s) between detections while idle")
+    parser.add_argument("--metrics-log", type=float, default=None, metavar="SECONDS",
+                        help="print per-stage latency and fps every SECONDS")
+    parser.add_argument("--metrics-json", default=None, metavar="PATH",
+                        help="keep a JSON metrics snapshot at PATH")
+    parser.add_argument("--cursor-filter", default=DEFAULT_MOVE_FILTER, metavar="SPEC",
+                        help="cursor filter while moving (V_GEST): step, one_euro or kalman, "
+                             "with options as in kalman:q=1e6,lead_scale=0.5")
+    parser.add_argument("--drag-filter", default=DEFAULT_DRAG_FILTER, metavar="SPEC",
+                        help="cursor filter while dragging (FIST)")
+    parser.add_argument("--camera-latency", type=float, default=0.03,
+                        help="camera delay (s) the cursor filter predicts through")
+    parser.add_argument("--input-backend", choices=("auto",) + tuple(INPUT_BACKENDS), default="auto",
+                        help="mouse/keyboard injection: auto is sendinput on Windows, pyautogui "
+                             "elsewhere; uinput needs write access to /dev/uinput")
+    parser.add_argument("--gesture-model", default=None, metavar="PATH",
+                        help="nearest-centroid model from train_gestures.py, backed by the rules")
+    parser.add_argument("--assistant", choices=("process", "thread", "off"), default="process",
+                        help="run the voice assistant in its own process, in this one, or not at all")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print import/init timings once the window is up and the first gesture is seen")
+    return parser.parse_args()
 
-    # Start gesture controller
-    gc1 = GestureController()
+
+def run_gestures(args):
+    gc1 = GestureController(pipelined=args.pipelined, headless=args.headless,
+                            preview_fps=args.preview_fps,
+                            preview_scale=args.preview_scale,
+                            infer_width=args.infer_width, roi=args.roi,
+                            idle=not args.no_idle, idle_after=args.idle_after,
+                            idle_wake=args.idle_wake,
+                            metrics=Metrics(log_interval=args.metrics_log,
+                                            snapshot_path=args.metrics_json)
+                            if args.metrics_log or args.metrics_json else None,
+                            source=int(args.source) if args.source.isdigit() else args.source,
+                            input_backend=make_input_backend(args.input_backend)
+                            if args.input_backend != "auto" else None,
+                            recorder=LandmarkRecorder(args.record) if args.record else None,
+                            classifier=CentroidClassifier.load(
+                                args.gesture_model, fallback=RuleClassifier())
+                            if args.gesture_model else None,
+                            cursor_filters={
+                                Gest.V_GEST: make_cursor_filter(args.cursor_filter),
+                                Gest.FIST: make_cursor_filter(args.drag_filter),
+                            },
+                            camera_latency=args.camera_latency)
     gc1.start()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.startup_report:
+        startup.print_on("first gesture")
+        os.environ["ASSISTANT_STARTUP_REPORT"] = "1"
+
+    if args.assistant == "thread":
+        threading.Thread(target=run_gestures, args=(args,), daemon=True,
+                         name="gestures").start()
+        run_app_here()
+    else:
+        if args.assistant == "process":
+            # Start web UI (app.py) in a separate process
+            run_app()
+        # Start gesture controller
+        run_gestures(args)
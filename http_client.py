@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP client for the assistant's web services. One requests.Session
+# keeps connections alive per host; each service has its own base URL,
+# (connect, read) timeout and a cap on requests in flight, so one slow API
+# can't tie up the others or hang a handler forever.
+#
+#   http = HttpClient([Service("weather", "https://api.openweathermap.org", timeout=(2, 4))])
+#   http.get_json("weather", "/data/2.5/weather", params={"q": "Bangalore"})
+#
+# Base URLs can be overridden with <NAME>_BASE_URL (e.g. WEATHER_BASE_URL)
+# to point a service at a local stub server.
+
+
+class ServiceBusy(requests.RequestException):
+    # raised when a service already has max_concurrency requests in flight
+    # and no slot frees up within the connect timeout
+    pass
+
+
+class Service:
+    def __init__(self, name, base_url, timeout=(3.05, 10.0), max_concurrency=4, headers=None):
+        self.name = name
+        self.base_url = os.environ.get(f"{name.upper()}_BASE_URL", base_url).rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.headers = headers or {}
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+
+class HttpClient:
+    def __init__(self, services, pool_maxsize=10):
+        self.services = {service.name: service for service in services}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.services) or 1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.stats = {name: {'requests': 0, 'errors': 0, 'total_s': 0.0} for name in self.services}
+
+    def request(self, service_name, method, path, **kwargs):
+        service = self.services[service_name]
+        connect_timeout = service.timeout[0] if isinstance(service.timeout, tuple) else service.timeout
+        if not service.slots.acquire(timeout=connect_timeout):
+            raise ServiceBusy(f"{service_name}: {service.max_concurrency} requests already in flight")
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            headers = dict(service.headers, **kwargs.pop("headers", {}))
+            response = self.session.request(method, service.base_url + path, headers=headers,
+                                            timeout=kwargs.pop("timeout", service.timeout), **kwargs)
+            response.raise_for_status()
+            ok = True
+            return response
+        finally:
+            service.slots.release()
+            with self.lock:
+                stats = self.stats[service_name]
+                stats['requests'] += 1
+                stats['errors'] += 0 if ok else 1
+                stats['total_s'] += time.perf_counter() - t0
+
+    def get_json(self, service_name, path, **kwargs):
+        return self.request(service_name, "GET", path, **kwargs).json()
+
+    def post_json(self, service_name, path, payload, **kwargs):
+        return self.request(service_name, "POST", path, json=payload, **kwargs).json()
+
+    def close(self):
+        self.session.close()
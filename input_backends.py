@@ -0,0 +1,363 @@
+import os
+import struct
+import sys
+import threading
+import time
+
+# Mouse/keyboard injection used by Controller and CursorActuator. Every
+# backend has the same methods, so the gesture loop can drive the real
+# desktop or just record what it would have done.
+#
+# Device backends build each action as a chord of primitive events and
+# hand the whole chord to send() at once, with no pause anywhere:
+#
+#   ('key', name, down)       name: 'shift', 'ctrl' or 'alt'
+#   ('button', name, down)    name: 'left', 'right' or 'middle'
+#   ('wheel', clicks)         120 per notch, positive scrolls up
+#   ('hwheel', clicks)
+#   ('move', x, y)            absolute screen pixels
+#
+# A horizontal scroll step (shift+ctrl, wheel, release) is one send().
+# pyautogui would otherwise sleep pyautogui.PAUSE (0.1 s) after each of
+# its five calls.
+
+
+class ChordInput:
+    def send(self, events):
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        self.send([('move', x, y)])
+
+    def mouse_down(self):
+        self.send([('button', 'left', True)])
+
+    def mouse_up(self):
+        self.send([('button', 'left', False)])
+
+    def click(self, button="left"):
+        self.send([('button', button, True), ('button', button, False)])
+
+    def double_click(self):
+        self.send([('button', 'left', True), ('button', 'left', False)] * 2)
+
+    def scroll(self, clicks):
+        self.send([('wheel', clicks)])
+
+    def hscroll(self, clicks):
+        self.send([('key', 'shift', True), ('key', 'ctrl', True), ('wheel', clicks),
+                   ('key', 'ctrl', False), ('key', 'shift', False)])
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiInput(ChordInput):
+    # Plays each chord through pyautogui with _pause=False on every call.
+    def __init__(self):
+        import pyautogui  # needs a display, so only imported when used
+        pyautogui.FAILSAFE = False
+        self.pyautogui = pyautogui
+
+    def size(self):
+        return tuple(self.pyautogui.size())
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def send(self, events):
+        gui = self.pyautogui
+        for event in events:
+            kind = event[0]
+            if kind == 'move':
+                gui.moveTo(event[1], event[2], _pause=False)
+            elif kind == 'button':
+                if event[2]:
+                    gui.mouseDown(button=event[1], _pause=False)
+                else:
+                    gui.mouseUp(button=event[1], _pause=False)
+            elif kind == 'key':
+                if event[2]:
+                    gui.keyDown(event[1], _pause=False)
+                else:
+                    gui.keyUp(event[1], _pause=False)
+            elif kind == 'wheel':
+                gui.scroll(event[1], _pause=False)
+            elif kind == 'hwheel':
+                gui.hscroll(event[1], _pause=False)
+
+
+class SendInputBackend(ChordInput):
+    # Windows: a chord becomes one array of INPUT records and one SendInput
+    # call, so nothing else can slip in between the modifiers and the wheel.
+    VK = {'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12}
+    BUTTON_FLAGS = {'left': (0x0002, 0x0004), 'right': (0x0008, 0x0010),
+                    'middle': (0x0020, 0x0040)}
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_WHEEL = 0x0800
+    MOUSEEVENTF_HWHEEL = 0x1000
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    KEYEVENTF_KEYUP = 0x0002
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG),
+                        ('mouseData', wintypes.DWORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD),
+                        ('dwExtraInfo', ctypes.c_size_t)]
+
+        class INPUT(ctypes.Structure):
+            class UNION(ctypes.Union):
+                _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT)]
+            _anonymous_ = ('u',)
+            _fields_ = [('type', wintypes.DWORD), ('u', UNION)]
+
+        self.ctypes = ctypes
+        self.INPUT = INPUT
+        self.user32 = ctypes.windll.user32
+        self.point = wintypes.POINT()
+
+    def size(self):
+        return self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1)
+
+    def position(self):
+        self.user32.GetCursorPos(self.ctypes.byref(self.point))
+        return self.point.x, self.point.y
+
+    def make_input(self, event, width, height):
+        item = self.INPUT()
+        kind = event[0]
+        if kind == 'key':
+            item.type = 1  # INPUT_KEYBOARD
+            item.ki.wVk = self.VK[event[1]]
+            item.ki.dwFlags = 0 if event[2] else self.KEYEVENTF_KEYUP
+            return item
+        item.type = 0  # INPUT_MOUSE
+        if kind == 'move':
+            # absolute coordinates are 0..65535 across the primary screen
+            item.mi.dx = event[1] * 65535 // max(1, width - 1)
+            item.mi.dy = event[2] * 65535 // max(1, height - 1)
+            item.mi.dwFlags = self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE
+        elif kind == 'button':
+            down, up = self.BUTTON_FLAGS[event[1]]
+            item.mi.dwFlags = down if event[2] else up
+        else:
+            item.mi.mouseData = event[1] & 0xFFFFFFFF
+            item.mi.dwFlags = self.MOUSEEVENTF_WHEEL if kind == 'wheel' else self.MOUSEEVENTF_HWHEEL
+        return item
+
+    def send(self, events):
+        width, height = self.size() if any(e[0] == 'move' for e in events) else (0, 0)
+        items = (self.INPUT * len(events))(*(self.make_input(e, width, height) for e in events))
+        self.user32.SendInput(len(events), items, self.ctypes.sizeof(self.INPUT))
+
+
+class UInputBackend(ChordInput):
+    # Linux: a virtual absolute pointer + modifier keys on /dev/uinput. Works
+    # under X11, Wayland and on a bare console, without a display server
+    # connection; needs write access to /dev/uinput (the `input` group or a
+    # udev rule). A chord is one write() of input_events, each primitive
+    # followed by a SYN_REPORT. The screen size can't be asked for without a
+    # display, so it is given; the cursor position is the last one set.
+    EV_SYN, EV_KEY, EV_REL, EV_ABS = 0, 1, 2, 3
+    SYN_REPORT = 0
+    REL_HWHEEL, REL_WHEEL, REL_WHEEL_HI_RES, REL_HWHEEL_HI_RES = 6, 8, 11, 12
+    ABS_X, ABS_Y = 0, 1
+    KEYS = {'shift': 42, 'ctrl': 29, 'alt': 56}
+    BUTTONS = {'left': 0x110, 'right': 0x111, 'middle': 0x112}
+    UI_SET_EVBIT, UI_SET_KEYBIT, UI_SET_RELBIT, UI_SET_ABSBIT = 0x40045564, 0x40045565, 0x40045566, 0x40045567
+    UI_DEV_CREATE, UI_DEV_DESTROY = 0x5501, 0x5502
+    EVENT = struct.Struct('llHHi')   # struct input_event with a native timeval
+
+    def __init__(self, size=(1920, 1080), path='/dev/uinput', name=b'gesture-mouse'):
+        import fcntl
+        self.fcntl = fcntl
+        self.screen = tuple(size)
+        self.cursor = (self.screen[0] // 2, self.screen[1] // 2)
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            ioctl = fcntl.ioctl
+            for ev in (self.EV_KEY, self.EV_REL, self.EV_ABS):
+                ioctl(self.fd, self.UI_SET_EVBIT, ev)
+            for code in list(self.KEYS.values()) + list(self.BUTTONS.values()):
+                ioctl(self.fd, self.UI_SET_KEYBIT, code)
+            for code in (self.REL_WHEEL, self.REL_HWHEEL, self.REL_WHEEL_HI_RES, self.REL_HWHEEL_HI_RES):
+                ioctl(self.fd, self.UI_SET_RELBIT, code)
+            for code in (self.ABS_X, self.ABS_Y):
+                ioctl(self.fd, self.UI_SET_ABSBIT, code)
+            # legacy struct uinput_user_dev: name, input_id (BUS_VIRTUAL),
+            # ff_effects_max, then absmax/absmin/absfuzz/absflat[64]
+            absmax = [0] * 64
+            absmax[self.ABS_X], absmax[self.ABS_Y] = self.screen[0] - 1, self.screen[1] - 1
+            setup = struct.pack('80sHHHHi' + 'i' * 256, name[:79], 0x06, 0x1, 0x1, 1, 0,
+                                *absmax, *([0] * 192))
+            os.write(self.fd, setup)
+            ioctl(self.fd, self.UI_DEV_CREATE)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def pack(self, event):
+        ev = self.EVENT.pack
+        kind = event[0]
+        if kind == 'move':
+            x = min(max(int(event[1]), 0), self.screen[0] - 1)
+            y = min(max(int(event[2]), 0), self.screen[1] - 1)
+            self.cursor = (x, y)
+            out = ev(0, 0, self.EV_ABS, self.ABS_X, x) + ev(0, 0, self.EV_ABS, self.ABS_Y, y)
+        elif kind == 'key':
+            out = ev(0, 0, self.EV_KEY, self.KEYS[event[1]], int(event[2]))
+        elif kind == 'button':
+            out = ev(0, 0, self.EV_KEY, self.BUTTONS[event[1]], int(event[2]))
+        else:
+            # hi-res axes count 1/120 notch; the plain ones whole notches
+            hi_res, notches = (self.REL_WHEEL_HI_RES, self.REL_WHEEL) if kind == 'wheel' \
+                else (self.REL_HWHEEL_HI_RES, self.REL_HWHEEL)
+            out = ev(0, 0, self.EV_REL, hi_res, event[1])
+            if int(event[1] / 120):
+                out += ev(0, 0, self.EV_REL, notches, int(event[1] / 120))
+        return out + ev(0, 0, self.EV_SYN, self.SYN_REPORT, 0)
+
+    def send(self, events):
+        with self.lock:
+            os.write(self.fd, b''.join(self.pack(event) for event in events))
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                self.fcntl.ioctl(self.fd, self.UI_DEV_DESTROY)
+                os.close(self.fd)
+                self.fd = None
+
+
+class MemoryInput(ChordInput):
+    # send() without a device: keeps every chord as (time, events), tracks
+    # the cursor and which keys and buttons are held. For tests and
+    # benchmarks of the chord path with no display or /dev/uinput.
+    def __init__(self, size=(1920, 1080), keep=True):
+        self.screen = tuple(size)
+        self.cursor = (self.screen[0] // 2, self.screen[1] // 2)
+        self.held = set()
+        self.keep = keep
+        self.chords = []
+        self.lock = threading.Lock()
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def send(self, events):
+        with self.lock:
+            for event in events:
+                if event[0] == 'move':
+                    self.cursor = (event[1], event[2])
+                elif event[0] in ('key', 'button'):
+                    if event[2]:
+                        self.held.add(event[1])
+                    else:
+                        self.held.discard(event[1])
+            if self.keep:
+                self.chords.append((time.perf_counter(), list(events)))
+
+
+class RecordingInput(ChordInput):
+    # Touches nothing; keeps a list of (time, action, args) and a virtual
+    # cursor. Used for replay and on machines with no display.
+    def __init__(self, size=(1920, 1080)):
+        self.screen = tuple(size)
+        self.cursor = (self.screen[0] // 2, self.screen[1] // 2)
+        self.events = []
+        self.lock = threading.Lock()
+
+    def record(self, action, *args):
+        with self.lock:
+            self.events.append((time.perf_counter(), action, args))
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y):
+        self.cursor = (x, y)
+        self.record('move_to', x, y)
+
+    def mouse_down(self):
+        self.record('mouse_down')
+
+    def mouse_up(self):
+        self.record('mouse_up')
+
+    def click(self, button="left"):
+        self.record('click', button)
+
+    def double_click(self):
+        self.record('double_click')
+
+    def scroll(self, clicks):
+        self.record('scroll', clicks)
+
+    def hscroll(self, clicks):
+        self.record('hscroll', clicks)
+
+
+class NullInput(RecordingInput):
+    # The virtual cursor and nothing else, so a long run keeps no event list.
+    def record(self, action, *args):
+        pass
+
+
+class QueueInput(RecordingInput):
+    # Hands every action to a queue as (source, time, action, args) instead of
+    # keeping it; supervisor.py gives each camera station one of these.
+    def __init__(self, queue, source, size=(1920, 1080)):
+        super().__init__(size)
+        self.queue = queue
+        self.source = source
+
+    def record(self, action, *args):
+        self.queue.put((self.source, time.perf_counter(), action, args))
+
+
+INPUT_BACKENDS = {
+    'pyautogui': PyAutoGuiInput,
+    'sendinput': SendInputBackend,
+    'uinput': UInputBackend,
+    'memory': MemoryInput,
+    'record': RecordingInput,
+}
+
+
+def default_input_backend():
+    # SendInput on Windows; elsewhere pyautogui, which needs no permissions
+    if sys.platform == "win32":
+        return SendInputBackend()
+    return PyAutoGuiInput()
+
+
+def make_input_backend(name):
+    if name == 'auto':
+        return default_input_backend()
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"unknown input backend {name!r} (choose from auto, {', '.join(INPUT_BACKENDS)})")
+    return INPUT_BACKENDS[name]()
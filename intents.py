@@ -0,0 +1,229 @@
+import re
+import unicodedata
+from types import SimpleNamespace
+
+# Intent routing for the assistant's chat input. Intents are declared as
+# keyword phrases per language plus a priority; IntentRouter compiles every
+# phrase (and every slot entity, like app names) into one token trie and
+# finds all of them in a single pass over the message:
+#
+#   router = IntentRouter(ASSISTANT_INTENTS, ASSISTANT_ENTITIES)
+#   router.route("open chrome please")
+#   -> intent='open', slots={'app': 'chrome'}, intents=['open']
+#
+# Matching is on whole tokens, so "day" doesn't fire on "today" and "open"
+# doesn't fire on "reopen". When several intents match, the highest priority
+# wins, then the earliest in the message. Guarded phrases only count when
+# the message also fills their slot ("start the browser" opens an app,
+# "when does the news start" doesn't).
+
+TOKEN = re.compile(r"[^\s.,!?;:\"()\[\]]+")
+NUMBER = re.compile(r"(\d+)%?$")
+
+
+class Intent:
+    def __init__(self, name, keywords, priority=0, tail_slot=None, guarded=None):
+        # keywords: {lang: [phrase, ...]}; tail_slot names a slot filled with
+        # the rest of the message after the keyword (or before it, for
+        # verb-final languages); guarded: {slot: {lang: [phrase, ...]}}
+        self.name = name
+        self.keywords = keywords
+        self.priority = priority
+        self.tail_slot = tail_slot
+        self.guarded = guarded or {}
+
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text).casefold()
+
+
+def tokenize(text):
+    # [(token, start, end)] over the normalized text
+    return [(m.group(), m.start(), m.end()) for m in TOKEN.finditer(text)]
+
+
+class IntentRouter:
+    def __init__(self, intents, entities=None, languages=None):
+        # entities: {slot: {value: {lang: [phrase, ...]}}}
+        self.intents = {intent.name: intent for intent in intents}
+        self.trie = {}
+        for intent in intents:
+            for lang, phrases in intent.keywords.items():
+                if languages is None or lang in languages:
+                    for phrase in phrases:
+                        self.add(phrase, ('intent', intent.name))
+            for slot, keywords in intent.guarded.items():
+                for lang, phrases in keywords.items():
+                    if languages is None or lang in languages:
+                        for phrase in phrases:
+                            self.add(phrase, ('guarded', (intent.name, slot)))
+        for slot, values in (entities or {}).items():
+            for value, keywords in values.items():
+                for lang, phrases in keywords.items():
+                    if languages is None or lang in languages:
+                        for phrase in phrases:
+                            self.add(phrase, (slot, value))
+
+    def add(self, phrase, target):
+        node = self.trie
+        for token, _, _ in tokenize(normalize(phrase)):
+            node = node.setdefault(token, {})
+        node.setdefault(None, []).append(target)
+
+    def route(self, msg):
+        text = normalize(msg.strip())
+        tokens = tokenize(text)
+        best = None   # (priority, -start, intent name, start, end) of the winner
+        found = []
+        guarded = []  # (intent name, slot, start, end), decided once all slots are known
+        slots = {}
+        for i, (token, _, _) in enumerate(tokens):
+            match = NUMBER.match(token)
+            if match and 'percent' not in slots:
+                slots['percent'] = int(match.group(1))
+            node = self.trie
+            j = i
+            while j < len(tokens) and tokens[j][0] in node:
+                node = node[tokens[j][0]]
+                j += 1
+                for kind, value in node.get(None, ()):
+                    if kind == 'guarded':
+                        guarded.append(value + (i, j))
+                    elif kind != 'intent':
+                        slots.setdefault(kind, value)
+                    else:
+                        best = self.consider(best, found, value, i, j)
+        for name, slot, i, j in guarded:
+            if slot in slots:
+                best = self.consider(best, found, name, i, j)
+        if best is None:
+            return SimpleNamespace(intent=None, slots=slots, intents=found)
+        name, start, end = best[2:]
+        tail_slot = self.intents[name].tail_slot
+        if tail_slot:
+            tail = self.tail(text, tokens, start, end)
+            if tail:
+                slots[tail_slot] = tail
+        return SimpleNamespace(intent=name, slots=slots, intents=found)
+
+    def consider(self, best, found, name, start, end):
+        # the better of `best` and intent `name` matched at tokens start:end
+        if name not in found:
+            found.append(name)
+        key = (self.intents[name].priority, -start)
+        if best is None or key > best[:2]:
+            return key + (name, start, end)
+        return best
+
+    def tail(self, text, tokens, start, end):
+        for span in (tokens[end:], tokens[:start]):
+            while span and span[0][0] in LEADING_FILLER:
+                span = span[1:]
+            while span and span[-1][0] in TRAILING_FILLER:
+                span = span[:-1]
+            if span:
+                return text[span[0][1]:span[-1][2]]
+        return ""
+
+
+# words trimmed off a tail slot ("can you search for cats please")
+LEADING_FILLER = {"for", "about", "the", "on", "up", "me", "please", "hey", "assistant",
+                  "can", "could", "you", "para", "sobre"}
+TRAILING_FILLER = {"please", "thanks"}
+
+ASSISTANT_INTENTS = [
+    Intent('search', {
+        'en': ["search", "google", "look up"],
+        'hi': ["खोजो", "खोजें", "सर्च"],
+        'es': ["buscar", "busca"],
+    }, priority=90, tail_slot='query'),
+    Intent('open', {
+        'en': ["open", "launch"],
+        'hi': ["खोलो", "खोलें"],
+        'es': ["abrir", "abre"],
+    }, priority=85, guarded={'app': {'en': ["start"]}}),
+    Intent('volume_up', {
+        'en': ["volume up", "increase volume", "increase the volume", "raise volume",
+               "turn up the volume", "turn the volume up", "louder"],
+        'hi': ["आवाज़ बढ़ाओ", "आवाज बढ़ाओ", "वॉल्यूम बढ़ाओ"],
+        'es': ["subir volumen", "sube el volumen", "más volumen"],
+    }, priority=80),
+    Intent('volume_down', {
+        'en': ["volume down", "decrease volume", "decrease the volume", "lower volume",
+               "turn down the volume", "turn the volume down", "quieter"],
+        'hi': ["आवाज़ घटाओ", "आवाज घटाओ", "आवाज़ कम करो", "आवाज कम करो", "वॉल्यूम घटाओ"],
+        'es': ["bajar volumen", "baja el volumen", "menos volumen"],
+    }, priority=80),
+    Intent('mute', {
+        'en': ["mute", "mute volume", "silence"],
+        'hi': ["म्यूट", "आवाज़ बंद करो", "आवाज बंद करो"],
+        'es': ["silenciar", "silencio"],
+    }, priority=80),
+    Intent('brightness_up', {
+        'en': ["brightness up", "increase brightness", "increase the brightness",
+               "raise brightness", "brighter"],
+        'hi': ["चमक बढ़ाओ", "ब्राइटनेस बढ़ाओ"],
+        'es': ["subir brillo", "sube el brillo", "más brillo"],
+    }, priority=80),
+    Intent('brightness_down', {
+        'en': ["brightness down", "decrease brightness", "decrease the brightness",
+               "lower brightness", "dimmer", "dim the screen"],
+        'hi': ["चमक घटाओ", "चमक कम करो", "ब्राइटनेस घटाओ"],
+        'es': ["bajar brillo", "baja el brillo", "menos brillo"],
+    }, priority=80),
+    Intent('exit', {
+        'en': ["exit", "bye", "goodbye", "quit"],
+        'hi': ["अलविदा", "बाय"],
+        'es': ["adiós", "adios", "salir"],
+    }, priority=70),
+    Intent('weather', {
+        'en': ["weather", "forecast", "temperature outside"],
+        'hi': ["मौसम"],
+        'es': ["clima", "el tiempo"],
+    }, priority=60),
+    Intent('news', {
+        'en': ["news", "headlines"],
+        'hi': ["समाचार", "खबर", "ख़बर", "न्यूज़"],
+        'es': ["noticias"],
+    }, priority=60),
+    Intent('joke', {
+        'en': ["joke", "make me laugh"],
+        'hi': ["चुटकुला", "जोक"],
+        'es': ["chiste"],
+    }, priority=60),
+    Intent('status', {
+        'en': ["status", "system", "system status", "cpu", "battery"],
+        'hi': ["स्थिति", "सिस्टम"],
+        'es': ["estado", "sistema", "batería"],
+    }, priority=50),
+    Intent('time', {
+        'en': ["time"],
+        'hi': ["समय", "टाइम"],
+        'es': ["hora"],
+    }, priority=40),
+    Intent('date', {
+        'en': ["date"],
+        'hi': ["तारीख", "तारीख़", "दिनांक"],
+        'es': ["fecha"],
+    }, priority=40),
+    Intent('day', {
+        'en': ["day", "weekday", "day of the week"],
+        'hi': ["दिन", "वार"],
+        'es': ["día", "dia"],
+    }, priority=40),
+    Intent('hello', {
+        'en': ["hello", "hi", "hey"],
+        'hi': ["नमस्ते", "नमस्कार", "हेलो"],
+        'es': ["hola"],
+    }, priority=10),
+]
+
+ASSISTANT_ENTITIES = {
+    'app': {
+        'chrome': {'en': ["chrome", "google chrome", "browser"], 'hi': ["क्रोम"], 'es': ["navegador"]},
+        'explorer': {'en': ["explorer", "file explorer", "files", "file manager"], 'hi': ["फ़ाइल", "फाइल"],
+                     'es': ["archivos", "explorador"]},
+        'notepad': {'en': ["notepad", "text editor", "editor"], 'hi': ["नोटपैड"], 'es': ["bloc de notas"]},
+        'calculator': {'en': ["calculator", "calc"], 'hi': ["कैलकुलेटर"], 'es': ["calculadora"]},
+    },
+}
@@ -0,0 +1,137 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Per-stage latency histograms, frame rate and counters for the gesture loop.
+#
+#   metrics = Metrics(log_interval=10, snapshot_path="metrics.json")
+#   t0 = time.perf_counter()
+#   ...
+#   metrics.record('inference', t0)
+#
+# Metrics(enabled=False) turns every call into an immediate return, so the
+# instrumented loop costs a perf_counter() call per stage and nothing else.
+
+# bucket upper bounds in ms: 1 us .. ~8.4 s, eight buckets per doubling
+BUCKETS_MS = [0.001 * 2 ** (i / 8) for i in range(185)]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class Metrics:
+    def __init__(self, enabled=True, log_interval=None, snapshot_path=None,
+                 snapshot_interval=5.0):
+        self.enabled = enabled
+        self.log_interval = log_interval
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.frames = 0
+        self.started = time.perf_counter()
+        self.window_start = self.started
+        self.window_frames = 0
+        self.fps = 0.0
+        self.last_log = self.started
+        self.last_snapshot = self.started
+
+    def record(self, stage, t0, t1=None):
+        # latency of `stage` is (t1 or now) - t0, both perf_counter seconds
+        if not self.enabled:
+            return
+        if t1 is None:
+            t1 = time.perf_counter()
+        with self.lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.add((t1 - t0) * 1000.0)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def frame(self, now=None):
+        # call once per processed frame; drives fps and the periodic outputs
+        if not self.enabled:
+            return
+        if now is None:
+            now = time.perf_counter()
+        with self.lock:
+            self.frames += 1
+            self.window_frames += 1
+            if now - self.window_start >= 1.0:
+                self.fps = self.window_frames / (now - self.window_start)
+                self.window_start = now
+                self.window_frames = 0
+        if self.log_interval and now - self.last_log >= self.log_interval:
+            self.last_log = now
+            print(self.log_line())
+        if self.snapshot_path and now - self.last_snapshot >= self.snapshot_interval:
+            self.last_snapshot = now
+            self.write_snapshot()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'uptime_s': round(time.perf_counter() - self.started, 3),
+                'frames': self.frames,
+                'fps': round(self.fps, 2),
+                'stages': {name: hist.snapshot() for name, hist in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def log_line(self):
+        snap = self.snapshot()
+        parts = [f"fps {snap['fps']:.1f}"]
+        for name, stage in snap['stages'].items():
+            parts.append(f"{name} {stage['p50_ms']:.1f}/{stage['p95_ms']:.1f} ms")
+        for name, value in snap['counters'].items():
+            parts.append(f"{name} {value}")
+        return " | ".join(parts)
+
+    def write_snapshot(self, path=None):
+        path = path or self.snapshot_path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
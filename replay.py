@@ -0,0 +1,202 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Offline replay for the gesture loop. A session is either a video file
+# (run through MediaPipe as usual) or a recorded landmark stream in .npz:
+#
+#   timestamps  (F,)            float64, seconds from the first frame
+#   landmarks   (F, H, 21, 3)   float32, normalized x, y, z
+#   labels      (F, H)          int8, 0 = Left, 1 = Right, -1 = no hand
+#   scores      (F, H)          float32, handedness confidence
+#
+# Landmark replays skip the camera and MediaPipe entirely, so they run on a
+# headless box with nothing but numpy installed beyond the repo itself.
+
+LABELS = ('Left', 'Right')
+MAX_HANDS = 2
+
+
+class LandmarkRecorder:
+    # Collects MediaPipe results frame by frame; save() writes the .npz.
+    def __init__(self, path, max_hands=MAX_HANDS):
+        self.path = path
+        self.max_hands = max_hands
+        self.timestamps = []
+        self.landmarks = []
+        self.labels = []
+        self.scores = []
+        self.start = None
+
+    def add(self, results, timestamp=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.start is None:
+            self.start = timestamp
+        landmarks = np.zeros((self.max_hands, 21, 3), dtype=np.float32)
+        labels = np.full(self.max_hands, -1, dtype=np.int8)
+        scores = np.zeros(self.max_hands, dtype=np.float32)
+        if results.multi_hand_landmarks:
+            hands = zip(results.multi_hand_landmarks, results.multi_handedness)
+            for i, (hand, handedness) in enumerate(hands):
+                if i == self.max_hands:
+                    break
+                landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                labels[i] = LABELS.index(handedness.classification[0].label)
+                scores[i] = handedness.classification[0].score
+        self.timestamps.append(timestamp - self.start)
+        self.landmarks.append(landmarks)
+        self.labels.append(labels)
+        self.scores.append(scores)
+
+    def save(self):
+        save_session(self.path, np.array(self.timestamps, dtype=np.float64),
+                     np.array(self.landmarks).reshape(-1, self.max_hands, 21, 3),
+                     np.array(self.labels).reshape(-1, self.max_hands),
+                     np.array(self.scores).reshape(-1, self.max_hands))
+
+
+def save_session(path, timestamps, landmarks, labels, scores):
+    np.savez_compressed(path, timestamps=timestamps,
+                        landmarks=landmarks.astype(np.float32),
+                        labels=labels.astype(np.int8),
+                        scores=scores.astype(np.float32))
+
+
+def load_session(path):
+    with np.load(path) as data:
+        return {key: data[key] for key in ('timestamps', 'landmarks', 'labels', 'scores')}
+
+
+def make_results(landmarks, labels, scores):
+    # Builds an object shaped like mp_hands.Hands.process() output.
+    hands, handedness = [], []
+    for i, label in enumerate(labels):
+        if label < 0:
+            continue
+        hands.append(SimpleNamespace(landmark=[
+            SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in landmarks[i]]))
+        handedness.append(SimpleNamespace(classification=[
+            SimpleNamespace(label=LABELS[label], score=float(scores[i]))]))
+    if not hands:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+
+class ReplayFrame(np.ndarray):
+    # A tiny blank frame carrying its recorded hands in `results` and its
+    # recorded `timestamp`, so they travel with the frame through the
+    # grabber and the pool
+    results = None
+    timestamp = 0.0
+
+
+class LandmarkReplayCapture:
+    # Stands in for cv2.VideoCapture. Each read() yields a ReplayFrame for
+    # LandmarkReplayTracker. With realtime=True reads are paced to the
+    # recorded timestamps.
+    def __init__(self, path, realtime=False):
+        self.session = load_session(path)
+        self.realtime = realtime
+        self.index = 0
+        self.start = None
+        self.blank = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.session['timestamps'])
+
+    def isOpened(self):
+        return self.index < len(self)
+
+    def get(self, prop):
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def read(self, image=None):
+        # `image` (a buffer to read into, as for cv2.VideoCapture) is unused:
+        # every frame is a view of the same tiny blank
+        if self.index >= len(self):
+            return False, None
+        if self.realtime:
+            if self.start is None:
+                self.start = time.perf_counter()
+            delay = self.session['timestamps'][self.index] - (time.perf_counter() - self.start)
+            if delay > 0:
+                time.sleep(delay)
+        i = self.index
+        frame = self.blank.view(ReplayFrame)
+        frame.results = make_results(self.session['landmarks'][i], self.session['labels'][i],
+                                     self.session['scores'][i])
+        frame.timestamp = float(self.session['timestamps'][i])
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        self.index = len(self)
+
+
+class LandmarkReplayTracker:
+    # Stands in for HandTracker: returns the hands recorded for the frame.
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def process(self, frame):
+        return frame.results
+
+
+def run_replay(path, input_backend=None, system_controls=None, metrics=None,
+               realtime=False, **options):
+    # Drives GestureController/HandRecog/Controller over a recorded session
+    # with recording backends in place of pyautogui, pycaw and sbcontrol.
+    # `options` go to GestureController (e.g. roi=True, infer_width=320).
+    # Landmark sessions run on their recorded timestamps and the cursor is
+    # moved on the loop's thread without a glide, so the same session always
+    # yields the same events.
+    from hand_gesture import GestureController
+    from input_backends import RecordingInput
+    from metrics import Metrics
+    from system_controls import MemorySystemControls
+
+    input_backend = input_backend or RecordingInput()
+    system_controls = system_controls or MemorySystemControls()
+    metrics = metrics or Metrics()
+    gestures = []
+    if str(path).endswith('.npz'):
+        source = LandmarkReplayCapture(path, realtime=realtime)
+        tracker_factory = LandmarkReplayTracker
+        options.setdefault('recorded_time', True)
+    else:
+        source, tracker_factory = str(path), None
+
+    options.setdefault('idle', False)
+    options.setdefault('glide', 0.0)
+    options.setdefault('actuation_rate', None)
+    controller = GestureController(
+        headless=True, metrics=metrics, source=source, input_backend=input_backend,
+        system_controls=system_controls, tracker_factory=tracker_factory,
+        on_gesture=gestures.append, **options)
+    t0 = time.perf_counter()
+    controller.start()
+    elapsed = time.perf_counter() - t0
+    return SimpleNamespace(
+        frames=metrics.frames, elapsed=elapsed,
+        fps=metrics.frames / elapsed if elapsed else 0.0,
+        gestures=[int(g) for g in gestures], input_events=list(input_backend.events),
+        system_events=list(system_controls.events), metrics=metrics.snapshot())
+
+
+def gesture_runs(gestures):
+    # [(gesture, frames)] with consecutive repeats collapsed
+    runs = []
+    for g in gestures:
+        if runs and runs[-1][0] == g:
+            runs[-1][1] += 1
+        else:
+            runs.append([g, 1])
+    return [tuple(run) for run in runs]
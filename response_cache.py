@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# TTL cache for slow-changing web data (weather, news) with
+# stale-while-revalidate. Each provider is a fetch function plus:
+#   ttl        seconds a value is served as fresh
+#   max_stale  seconds past fetch a value may still be served while a
+#              background refresh runs (and when a refresh fails)
+# Values are the providers' raw data; formatting stays with the caller.
+# With `path` set, the newest values are snapshotted to JSON so a
+# restarted assistant can answer straight away.
+#
+#   cache = ResponseCache(path="responses.json")
+#   cache.register("weather", fetch_weather, ttl=600, max_stale=3 * 3600)
+#   data = cache.get("weather", "Bangalore")
+
+
+class ResponseCache:
+    def __init__(self, path=None, workers=2, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.providers = {}
+        self.entries = {}       # key -> {'value', 'fetched_at'}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="response-cache")
+        if path:
+            self.load()
+
+    def register(self, name, fetch, ttl, max_stale=None):
+        self.providers[name] = {
+            'fetch': fetch, 'ttl': ttl, 'max_stale': ttl if max_stale is None else max_stale,
+            'counters': {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0},
+        }
+
+    def key(self, name, args):
+        return f"{name}:{json.dumps(list(args))}"
+
+    def count(self, name, counter):
+        with self.lock:
+            self.providers[name]['counters'][counter] += 1
+
+    def get(self, name, *args):
+        provider = self.providers[name]
+        key = self.key(name, args)
+        with self.lock:
+            entry = self.entries.get(key)
+        age = self.clock() - entry['fetched_at'] if entry else None
+        if entry and age < provider['ttl']:
+            self.count(name, 'hits')
+            return entry['value']
+        if entry and age < provider['max_stale']:
+            self.count(name, 'stale_hits')
+            self.refresh(name, *args)
+            return entry['value']
+        self.count(name, 'misses')
+        try:
+            return self.fetch(name, key, args)
+        except Exception:
+            if entry:   # too old to serve normally, but better than an error
+                return entry['value']
+            raise
+
+    def fetch(self, name, key, args):
+        provider = self.providers[name]
+        try:
+            value = provider['fetch'](*args)
+        except Exception:
+            self.count(name, 'errors')
+            raise
+        with self.lock:
+            self.entries[key] = {'value': value, 'fetched_at': self.clock()}
+        self.save()
+        return value
+
+    def refresh(self, name, *args):
+        # background fetch, at most one in flight per key
+        key = self.key(name, args)
+        with self.lock:
+            if key in self.refreshing:
+                return None
+            self.refreshing.add(key)
+
+        def run():
+            try:
+                self.count(name, 'refreshes')
+                self.fetch(name, key, args)
+            except Exception as e:
+                print(f"Refreshing {name} failed ({e})")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        return self.pool.submit(run)
+
+    def prefetch(self, name, *args):
+        # warms an entry at startup unless the snapshot already has it fresh
+        key = self.key(name, args)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and self.clock() - entry['fetched_at'] < self.providers[name]['ttl']:
+            return None
+        return self.refresh(name, *args)
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(provider['counters']) for name, provider in self.providers.items()}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                data = json.dumps(self.entries, ensure_ascii=False)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
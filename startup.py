@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Startup timeline shared by hand_gesture.py and app.py (one timer per
+# process, so the single-process launcher gets a combined report).
+#
+#   with startup.phase("open camera"):
+#       cap = cv2.VideoCapture(0)
+#   startup.mark("first gesture")       # only the first call counts
+#   print(startup.report())
+#   startup.print_on("window on screen")  # or print when that mark lands
+#
+# Times are seconds since the interpreter started (psutil's process create
+# time when available, else since this module was imported). Lazy(factory)
+# defers building an object, and whatever it costs, to its first use.
+
+
+def process_start():
+    now = time.perf_counter()
+    try:
+        # Linux: start time in clock ticks since boot, same clock as uptime
+        # (psutil's create_time is off by up to a second there)
+        with open("/proc/self/stat") as f:
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return now - (uptime - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return now - (time.time() - psutil.Process().create_time())
+    except Exception:
+        return now
+
+
+class StartupTimer:
+    def __init__(self):
+        self.t0 = process_start()
+        self.events = []    # (name, start, end), seconds since t0
+        self.seen = set()
+        self.print_marks = set()
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        if name in self.seen:
+            return
+        now = time.perf_counter() - self.t0
+        with self.lock:
+            if name in self.seen:
+                return
+            self.seen.add(name)
+            self.events.append((name, now, now))
+        if name in self.print_marks:
+            print(self.report())
+
+    def print_on(self, *names):
+        self.print_marks.update(names)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter() - self.t0
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.t0
+            with self.lock:
+                self.events.append((name, start, end))
+
+    def report(self):
+        with self.lock:
+            events = sorted(self.events, key=lambda e: e[2])
+        lines = ["startup (s since interpreter start)"]
+        for name, start, end in events:
+            if end > start:
+                lines.append(f"  {end:7.3f}  {name:<28} {(end - start) * 1000:8.1f} ms "
+                             f"(from {start:.3f})")
+            else:
+                lines.append(f"  {end:7.3f}  {name}")
+        return "\n".join(lines)
+
+
+class Lazy:
+    # An object built on first use, by whichever thread gets there first;
+    # attribute access builds it and forwards to it.
+    #
+    #   ui = Lazy(lambda: UiChannel(eel).start())
+    #   ui.send("addMsgToChat", text)     # the channel's thread starts here
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+
+startup = StartupTimer()
+
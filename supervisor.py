@@ -0,0 +1,301 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+
+# Runs several camera stations on one host (say a presenter and an audience
+# camera), each a GestureController in its own process, so every station
+# gets a core and a GIL to itself. Each station has its own capture source
+# and action sink; the supervisor collects their metrics.
+#
+#   supervisor = Supervisor([Station("presenter", source=0),
+#                            Station("audience", source=1, sink="queue")],
+#                           on_action=print)
+#   summary = supervisor.run()      # until every station ends, or Ctrl+C
+#
+# Sinks: "desktop" drives this machine's mouse, volume and brightness,
+# "queue" sends every action to on_action(station, time, action, args) in
+# the supervisor's process, "record" keeps them and returns them when the
+# station ends, "none" drops them. Stations are pinned one per core.
+# Processes are spawned rather than forked: MediaPipe's and the capture
+# threads don't survive a fork, and Windows can only spawn anyway.
+#
+#   python supervisor.py presenter=0 audience=1 --sink queue --metrics-log 5
+
+SINKS = ('desktop', 'queue', 'record', 'none')
+
+
+class Station:
+    # source: camera index, video path, .npz landmark replay, or a picklable
+    # zero-argument callable returning a capture-like object. `options` go
+    # to GestureController (pipelined=True, infer_width=320, ...).
+    def __init__(self, name, source=0, sink='desktop', cpu=None, **options):
+        if sink not in SINKS:
+            raise ValueError(f"unknown sink {sink!r} (choose from {', '.join(SINKS)})")
+        self.name = name
+        self.source = source
+        self.sink = sink
+        self.cpu = cpu
+        self.options = options
+
+
+def allowed_cpus():
+    try:
+        import psutil
+        return sorted(psutil.Process().cpu_affinity())
+    except (ImportError, AttributeError):
+        return list(range(os.cpu_count() or 1))
+
+
+def pin_to(cpu):
+    try:
+        import psutil
+        psutil.Process().cpu_affinity([cpu])
+    except (ImportError, AttributeError, ValueError, OSError) as e:
+        print(f"Unable to pin to cpu {cpu} ({e})")
+
+
+def open_source(source):
+    # -> (source for GestureController, tracker_factory), as run_replay does
+    if isinstance(source, str) and source.endswith('.npz'):
+        from replay import LandmarkReplayCapture, LandmarkReplayTracker
+        capture = LandmarkReplayCapture(source)
+        return capture, LandmarkReplayTracker
+    if callable(source):
+        return source(), None
+    return source, None
+
+
+def make_sink(station, actions):
+    # -> (input backend, system controls); None means GestureController's default
+    from input_backends import NullInput, QueueInput, RecordingInput
+    from system_controls import MemorySystemControls, QueueSystemControls
+    if station.sink == 'desktop':
+        return None, None
+    if station.sink == 'queue':
+        return QueueInput(actions, station.name), QueueSystemControls(actions, station.name)
+    if station.sink == 'record':
+        return RecordingInput(), MemorySystemControls()
+    return NullInput(), MemorySystemControls()
+
+
+def run_station(station, cpu, actions, reports, stop, metrics_interval):
+    # A station's process. Reports go back as (kind, station, payload): a
+    # 'metrics' snapshot every metrics_interval seconds, then 'done' or 'error'.
+    try:
+        if cpu is not None:
+            pin_to(cpu)
+        import cv2
+        cv2.setNumThreads(1)   # a core per station; cv2's own pool would fight the others
+        from hand_gesture import GestureController
+        from metrics import Metrics
+
+        source, tracker_factory = open_source(station.source)
+        input_backend, system_controls = make_sink(station, actions)
+        metrics = Metrics()
+        options = dict(station.options)
+        options.setdefault('headless', True)
+        controller = GestureController(
+            metrics=metrics, source=source, input_backend=input_backend,
+            system_controls=system_controls, tracker_factory=tracker_factory, **options)
+
+        finished = threading.Event()
+
+        def publish():
+            # stop is only polled: a process that dies while waiting on a
+            # multiprocessing.Event hangs whoever sets it next
+            last = time.perf_counter()
+            while not finished.wait(0.1):
+                if stop.is_set():
+                    controller.stop()
+                    break
+                if time.perf_counter() - last >= metrics_interval:
+                    last = time.perf_counter()
+                    reports.put(('metrics', station.name, metrics.snapshot()))
+
+        publisher = threading.Thread(target=publish, daemon=True)
+        publisher.start()
+        try:
+            controller.start()
+        finally:
+            finished.set()
+            publisher.join()
+        events = None
+        if station.sink == 'record':
+            events = {'input': list(input_backend.events), 'system': list(system_controls.events)}
+        reports.put(('done', station.name, {'metrics': metrics.snapshot(), 'events': events}))
+    except Exception:
+        reports.put(('error', station.name, traceback.format_exc()))
+
+
+class Supervisor:
+    def __init__(self, stations, on_action=None, on_metrics=None, metrics_interval=5.0, pin=True):
+        names = [station.name for station in stations]
+        if len(set(names)) != len(names):
+            raise ValueError("station names must be unique")
+        self.stations = stations
+        self.on_action = on_action      # (station, time, action, args) from "queue" sinks
+        self.on_metrics = on_metrics    # (station, snapshot) every metrics_interval
+        self.metrics_interval = metrics_interval
+        self.pin = pin
+        self.context = multiprocessing.get_context('spawn')
+        self.actions = self.context.Queue()
+        self.reports = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = {}
+        self.metrics = {}   # station -> newest snapshot
+        self.results = {}   # station -> {'metrics': ..., 'events': ...} once it ended
+        self.errors = {}    # station -> traceback
+        self.started = None
+
+    def start(self):
+        cpus = allowed_cpus() if self.pin and len(self.stations) > 1 else []
+        for i, station in enumerate(self.stations):
+            cpu = station.cpu
+            if cpu is None and cpus:
+                cpu = cpus[i % len(cpus)]
+            process = self.context.Process(
+                target=run_station, name=f"station-{station.name}", daemon=True,
+                args=(station, cpu, self.actions, self.reports, self.stop_event,
+                      self.metrics_interval))
+            process.start()
+            self.processes[station.name] = process
+        self.started = time.perf_counter()
+        return self
+
+    def drain_actions(self):
+        while True:
+            try:
+                action = self.actions.get_nowait()
+            except queue.Empty:
+                return
+            if self.on_action is not None:
+                self.on_action(*action)
+
+    def handle(self, report):
+        kind, name, payload = report
+        if kind == 'metrics':
+            self.metrics[name] = payload
+            if self.on_metrics is not None:
+                self.on_metrics(name, payload)
+        elif kind == 'done':
+            self.results[name] = payload
+            self.metrics[name] = payload['metrics']
+        else:
+            self.errors[name] = payload
+            print(f"Station {name} failed:\n{payload}")
+
+    def poll(self, timeout=0.1):
+        # Dispatches whatever the stations sent, waiting up to `timeout` for a
+        # report. Queues must be drained for the stations to exit cleanly.
+        self.drain_actions()
+        try:
+            report = self.reports.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while report is not None:
+            self.handle(report)
+            try:
+                report = self.reports.get_nowait()
+            except queue.Empty:
+                report = None
+        self.drain_actions()
+
+    def running(self):
+        return [name for name, process in self.processes.items() if process.is_alive()]
+
+    def stop(self):
+        self.stop_event.set()
+
+    def join(self, timeout=10.0):
+        deadline = time.perf_counter() + timeout
+        while self.running() and time.perf_counter() < deadline:
+            self.poll()
+        for name, process in self.processes.items():
+            if process.is_alive():
+                process.terminate()
+                self.errors.setdefault(name, "did not stop in time, terminated")
+            process.join()
+        self.poll(0)
+
+    def run(self, duration=None):
+        self.start()
+        try:
+            while self.running():
+                self.poll()
+                if duration is not None and time.perf_counter() - self.started >= duration:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            self.join()
+        return self.summary()
+
+    def summary(self):
+        # frames and average fps per station (from its own start) and in total
+        stations = {}
+        for name in self.processes:
+            snap = self.metrics.get(name)
+            if snap is None:
+                continue
+            stations[name] = {
+                'frames': snap['frames'],
+                'fps': round(snap['frames'] / snap['uptime_s'], 2) if snap['uptime_s'] else 0.0,
+                'stages': snap['stages'],
+                'counters': snap['counters'],
+            }
+        return {
+            'frames': sum(s['frames'] for s in stations.values()),
+            'fps': round(sum(s['fps'] for s in stations.values()), 2),
+            'stations': stations,
+            'errors': dict(self.errors),
+        }
+
+
+def parse_station(spec, sink, options):
+    name, _, source = spec.partition("=")
+    if not source:
+        raise SystemExit(f"expected NAME=SOURCE, got {spec!r}")
+    return Station(name, source=int(source) if source.isdigit() else source, sink=sink, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several gesture camera stations, one process each")
+    parser.add_argument("stations", nargs="+", metavar="NAME=SOURCE",
+                        help="station name and camera index, video file or .npz replay")
+    parser.add_argument("--sink", choices=SINKS, default="desktop",
+                        help="where every station's actions go")
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--infer-width", type=int, default=None)
+    parser.add_argument("--no-idle", action="store_true")
+    parser.add_argument("--no-pin", action="store_true", help="don't pin stations to cores")
+    parser.add_argument("--metrics-log", type=float, default=5.0, metavar="SECONDS",
+                        help="print per-station fps every SECONDS")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    options = {'pipelined': args.pipelined, 'infer_width': args.infer_width, 'idle': not args.no_idle}
+    stations = [parse_station(spec, args.sink, options) for spec in args.stations]
+
+    def log_metrics(name, snap):
+        end_to_end = snap['stages'].get('end_to_end', {}).get('p50_ms', 0.0)
+        print(f"{name}: {snap['fps']:.1f} fps, {snap['frames']} frames, end-to-end p50 {end_to_end:.1f} ms")
+
+    def log_action(name, t, action, args):
+        if action != 'move_to':
+            print(f"{name}: {action}{args}")
+
+    supervisor = Supervisor(stations, on_action=log_action, on_metrics=log_metrics,
+                            metrics_interval=args.metrics_log, pin=not args.no_pin)
+    summary = supervisor.run(duration=args.duration)
+    for name, station in summary['stations'].items():
+        print(f"{name}: {station['frames']} frames, {station['fps']:.1f} fps")
+    print(f"total: {summary['frames']} frames, {summary['fps']:.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# Volume and brightness backends driven by the PINCH_MAJOR gesture.
+#
+# Device backends expose get_/set_volume and get_/set_brightness with levels
+# in 0.0 .. 1.0; change_volume/change_brightness(delta) do a read-modify-
+# write synchronously. CoalescingSystemControls wraps a device backend for
+# the frame loop: it tracks the level locally, merges bursts of deltas and
+# writes at most once per interval from its own thread.
+
+
+def clamp(value):
+    return max(0.0, min(1.0, value))
+
+
+class LevelControls:
+    def change_volume(self, delta):
+        self.set_volume(clamp(self.get_volume() + delta))
+
+    def change_brightness(self, delta):
+        self.set_brightness(clamp(self.get_brightness() + delta))
+
+    def close(self):
+        pass
+
+
+class WindowsSystemControls(LevelControls):
+    # pycaw endpoint is opened once, on the thread that first uses it (COM
+    # objects belong to the thread that created them).
+    def __init__(self, display=0):
+        self.display = display
+        self.endpoint = None
+
+    def volume_endpoint(self):
+        if self.endpoint is None:
+            import comtypes
+            from ctypes import cast, POINTER
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+            comtypes.CoInitialize()
+            devices = AudioUtilities.GetSpeakers()
+            interface = devices.Activate(
+                IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+            self.endpoint = cast(interface, POINTER(IAudioEndpointVolume))
+        return self.endpoint
+
+    def get_volume(self):
+        return self.volume_endpoint().GetMasterVolumeLevelScalar()
+
+    def set_volume(self, level):
+        self.volume_endpoint().SetMasterVolumeLevelScalar(clamp(level), None)
+
+    def get_brightness(self):
+        import screen_brightness_control as sbcontrol
+        return sbcontrol.get_brightness(display=self.display)[0] / 100.0
+
+    def set_brightness(self, level):
+        import screen_brightness_control as sbcontrol
+        sbcontrol.set_brightness(int(round(100 * clamp(level))), display=self.display)
+
+
+class LinuxSystemControls(LevelControls):
+    # PulseAudio/PipeWire through pactl, falling back to ALSA's amixer;
+    # brightness through screen_brightness_control (sysfs/ddcutil).
+    def __init__(self, display=0, sink="@DEFAULT_SINK@"):
+        self.display = display
+        self.sink = sink
+
+    def run(self, *args):
+        return subprocess.run(args, capture_output=True, text=True, check=True,
+                              timeout=2).stdout
+
+    def get_volume(self):
+        try:
+            out = self.run("pactl", "get-sink-volume", self.sink)
+        except FileNotFoundError:
+            out = self.run("amixer", "sget", "Master")
+        match = re.search(r"(\d+)%", out)
+        return int(match.group(1)) / 100.0 if match else 0.0
+
+    def set_volume(self, level):
+        percent = f"{int(round(100 * clamp(level)))}%"
+        try:
+            self.run("pactl", "set-sink-volume", self.sink, percent)
+        except FileNotFoundError:
+            self.run("amixer", "-q", "sset", "Master", percent)
+
+    def get_brightness(self):
+        import screen_brightness_control as sbcontrol
+        return sbcontrol.get_brightness(display=self.display)[0] / 100.0
+
+    def set_brightness(self, level):
+        import screen_brightness_control as sbcontrol
+        sbcontrol.set_brightness(int(round(100 * clamp(level))), display=self.display)
+
+
+class MemorySystemControls(LevelControls):
+    # In-memory levels plus a list of (time, control, level) writes.
+    def __init__(self, volume=0.5, brightness=0.5):
+        self.volume = volume
+        self.brightness = brightness
+        self.events = []
+        self.lock = threading.Lock()
+
+    def get_volume(self):
+        return self.volume
+
+    def set_volume(self, level):
+        with self.lock:
+            self.volume = clamp(level)
+            self.events.append((time.perf_counter(), 'volume', self.volume))
+
+    def get_brightness(self):
+        return self.brightness
+
+    def set_brightness(self, level):
+        with self.lock:
+            self.brightness = clamp(level)
+            self.events.append((time.perf_counter(), 'brightness', self.brightness))
+
+
+class QueueSystemControls(LevelControls):
+    # In-memory levels; every write goes to a queue as (source, time, control,
+    # (level,)), the same shape as input_backends.QueueInput's actions.
+    def __init__(self, queue, source, volume=0.5, brightness=0.5):
+        self.queue = queue
+        self.source = source
+        self.volume = volume
+        self.brightness = brightness
+
+    def get_volume(self):
+        return self.volume
+
+    def set_volume(self, level):
+        self.volume = clamp(level)
+        self.queue.put((self.source, time.perf_counter(), 'volume', (self.volume,)))
+
+    def get_brightness(self):
+        return self.brightness
+
+    def set_brightness(self, level):
+        self.brightness = clamp(level)
+        self.queue.put((self.source, time.perf_counter(), 'brightness', (self.brightness,)))
+
+
+class CoalescingSystemControls:
+    # change_* only update a local level and return; the writer thread pushes
+    # the newest level to the device at most once per `interval`. The level is
+    # read back from the device once, and again after `resync_after` seconds
+    # without writes so changes made elsewhere are picked up.
+    def __init__(self, backend, interval=0.05, resync_after=5.0):
+        self.backend = backend
+        self.interval = interval
+        self.resync_after = resync_after
+        self.cond = threading.Condition()
+        self.controls = {
+            name: {'level': None, 'delta': 0.0, 'dirty': False, 'last_write': 0.0}
+            for name in ('volume', 'brightness')}
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def change(self, name, delta):
+        with self.cond:
+            control = self.controls[name]
+            if control['level'] is None:
+                control['delta'] += delta
+            else:
+                control['level'] = clamp(control['level'] + delta)
+            control['dirty'] = True
+            self.cond.notify()
+
+    def change_volume(self, delta):
+        self.change('volume', delta)
+
+    def change_brightness(self, delta):
+        self.change('brightness', delta)
+
+    def flush(self, name, control):
+        getter = getattr(self.backend, 'get_' + name)
+        setter = getattr(self.backend, 'set_' + name)
+        with self.cond:
+            level, delta = control['level'], control['delta']
+        if level is None:
+            level = getter()
+        with self.cond:
+            if control['level'] is None:
+                control['level'] = clamp(level + delta)
+                control['delta'] = 0.0
+            level = control['level']
+            control['dirty'] = False
+        setter(level)
+        control['last_write'] = time.perf_counter()
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(
+                    lambda: not self.running or any(c['dirty'] for c in self.controls.values()),
+                    self.resync_after)
+                running = self.running
+            now = time.perf_counter()
+            for name, control in self.controls.items():
+                if control['dirty']:
+                    wait = control['last_write'] + self.interval - now
+                    if wait > 0 and running:
+                        time.sleep(wait)
+                    try:
+                        self.flush(name, control)
+                    except Exception as e:
+                        print(f"Unable to set {name} ({e})")
+                elif control['level'] is not None and now - control['last_write'] > self.resync_after:
+                    with self.cond:
+                        # a change() since the check above keeps its level
+                        if not control['dirty'] and control['level'] is not None:
+                            control['level'] = None
+            if not running:
+                break
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout=1.0)
+        self.backend.close()
+
+
+def default_system_controls():
+    if sys.platform == "win32":
+        backend = WindowsSystemControls()
+    else:
+        backend = LinuxSystemControls()
+    return CoalescingSystemControls(backend)
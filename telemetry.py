@@ -0,0 +1,158 @@
+import math
+import os
+import threading
+import time
+from array import array
+
+# Background system telemetry for the assistant's status answers. A sampler
+# thread reads CPU, RAM and battery (and, when GESTURE_PID is set, the
+# gesture process's CPU and RSS) every `interval` seconds into a fixed-size
+# ring buffer. Status requests read the buffer, so they get a CPU figure
+# measured over an interval and a minute of history to average and trend.
+# This is not a speedup: a buffered read costs a little more than calling
+# psutil directly (benchmarks/bench_status.py).
+#
+#   sampler = TelemetrySampler(interval=2.0, window=300).start()
+#   sampler.latest()['cpu'], sampler.average('cpu', 60), sampler.trend('cpu', 60)
+#
+# Battery changes slowly, so it is polled every `battery_interval` seconds
+# only. Samples live in one preallocated array of doubles (NaN for missing
+# values), so the buffer never grows or allocates.
+
+FIELDS = ('t', 'cpu', 'ram', 'battery', 'plugged', 'gesture_cpu', 'gesture_rss_mb')
+
+
+class TelemetrySampler:
+    def __init__(self, interval=2.0, window=300.0, battery_interval=30.0, pid=None):
+        self.interval = interval
+        self.battery_interval = battery_interval
+        self.capacity = max(2, int(window / interval))
+        self.data = array('d', [math.nan]) * (self.capacity * len(FIELDS))
+        self.count = 0   # samples written so far; the newest is at (count - 1) % capacity
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        if pid is None and os.environ.get("GESTURE_PID"):
+            pid = int(os.environ["GESTURE_PID"])
+        self.pid = pid
+        self.process = None
+        self.psutil = None
+        self.primed = False   # cpu_percent has a previous call to measure from
+        self.battery = (math.nan, math.nan)
+        self.last_battery = -math.inf
+
+    def load(self):
+        # psutil is imported on first use, by start() or a sample() before it
+        if self.psutil is None:
+            import psutil
+            self.psutil = psutil
+        return self.psutil
+
+    def start(self):
+        self.load().cpu_percent(interval=None)   # the first reading is always 0.0
+        self.primed = True
+        self.attach(self.pid)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def attach(self, pid):
+        self.pid = pid
+        self.process = None
+        if pid:
+            self.load()
+            try:
+                self.process = self.psutil.Process(pid)
+                self.process.cpu_percent(interval=None)
+            except self.psutil.Error:
+                self.process = None
+
+    def sample(self, now=None):
+        psutil = self.load()
+        now = time.time() if now is None else now
+        if now - self.last_battery >= self.battery_interval:
+            self.last_battery = now
+            try:
+                battery = psutil.sensors_battery()
+            except (AttributeError, OSError, RuntimeError):
+                battery = None
+            self.battery = (battery.percent, float(battery.power_plugged)) if battery else (math.nan, math.nan)
+        gesture_cpu = gesture_rss = math.nan
+        if self.process is not None:
+            try:
+                with self.process.oneshot():
+                    gesture_cpu = self.process.cpu_percent(interval=None)
+                    gesture_rss = self.process.memory_info().rss / (1024 * 1024)
+            except self.psutil.Error:
+                self.process = None
+        # unprimed, interval=None would measure nothing, so wait a moment once
+        cpu = psutil.cpu_percent(interval=None if self.primed else 0.1)
+        self.primed = True
+        row = (now, cpu, psutil.virtual_memory().percent,
+               self.battery[0], self.battery[1], gesture_cpu, gesture_rss)
+        with self.lock:
+            start = (self.count % self.capacity) * len(FIELDS)
+            self.data[start:start + len(FIELDS)] = array('d', row)
+            self.count += 1
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Telemetry sample failed ({e})")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def row(self, k):
+        # k-th newest sample (0 = latest) as a tuple
+        start = ((self.count - 1 - k) % self.capacity) * len(FIELDS)
+        return tuple(self.data[start:start + len(FIELDS)])
+
+    def window(self, field, seconds=None):
+        # [(t, value)] for the last `seconds`, oldest first, skipping missing values
+        i = FIELDS.index(field)
+        width = len(FIELDS)
+        data = self.data
+        out = []
+        with self.lock:
+            n = len(self)
+            newest = (self.count - 1) % self.capacity
+            cutoff = -math.inf if seconds is None or not n else data[newest * width] - seconds
+            for k in range(n):
+                start = ((newest - k) % self.capacity) * width
+                t = data[start]
+                if t < cutoff:
+                    break
+                value = data[start + i]
+                if value == value:   # not NaN
+                    out.append((t, value))
+        out.reverse()
+        return out
+
+    def latest(self):
+        with self.lock:
+            return dict(zip(FIELDS, self.row(0))) if self.count else None
+
+    def average(self, field, seconds=60.0):
+        values = [v for _, v in self.window(field, seconds)]
+        return sum(values) / len(values) if values else None
+
+    def trend(self, field, seconds=60.0, threshold=5.0):
+        # 'rising', 'falling' or 'steady': second half of the window against the first
+        values = [v for _, v in self.window(field, seconds)]
+        if len(values) < 4:
+            return 'steady'
+        half = len(values) // 2
+        change = sum(values[half:]) / (len(values) - half) - sum(values[:half]) / half
+        if change > threshold:
+            return 'rising'
+        if change < -threshold:
+            return 'falling'
+        return 'steady'
@@ -0,0 +1,72 @@
+import argparse
+
+import numpy as np
+
+from hand_gesture import CentroidClassifier, Gest, HLabel, RuleClassifier
+from replay import load_session
+
+# Trains the nearest-centroid gesture model from recorded landmark sessions
+# (hand_gesture.py --record PATH). Record one session per gesture, holding
+# it with every hand in view, then:
+#
+#   python train_gestures.py palm.npz=PALM fist.npz=FIST thumb.npz=THUMB -o gestures.npz
+#   python hand_gesture.py --gesture-model gestures.npz
+#
+# Gestures the model was not trained on still come from the rules: hands far
+# from every centroid fall back to RuleClassifier at run time.
+
+
+def session_hands(path):
+    # every tracked hand in a session -> (N, 21, 3)
+    session = load_session(path)
+    present = session['labels'] >= 0
+    return session['landmarks'][present]
+
+
+def load_examples(specs):
+    coords, gestures = [], []
+    for spec in specs:
+        path, _, name = spec.rpartition("=")
+        if not path:
+            raise SystemExit(f"expected PATH=GESTURE, got {spec!r}")
+        gesture = Gest[name.upper()]
+        hands = session_hands(path)
+        print(f"{path}: {len(hands)} hands as {gesture.name}")
+        coords.append(hands)
+        gestures.append(np.full(len(hands), int(gesture)))
+    return np.concatenate(coords), np.concatenate(gestures)
+
+
+def accuracy(classifier, coords, gestures):
+    labels = [HLabel.MAJOR] * len(coords)
+    predicted = np.array(classifier.classify(coords, labels))
+    gestures = np.where(gestures == Gest.PINCH_MINOR, int(Gest.PINCH_MAJOR), gestures)
+    return float((predicted == gestures).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the gesture model from recorded sessions")
+    parser.add_argument("sessions", nargs="+", metavar="PATH=GESTURE",
+                        help="a .npz landmark session and the Gest it shows")
+    parser.add_argument("-o", "--out", default="gestures.npz")
+    parser.add_argument("--margin", type=float, default=1.5,
+                        help="fall back to the rules beyond this many times the 99th percentile "
+                             "training distance")
+    parser.add_argument("--holdout", type=int, default=5,
+                        help="hold out every Nth hand to report accuracy (0 to train on all)")
+    args = parser.parse_args()
+
+    coords, gestures = load_examples(args.sessions)
+    if args.holdout:
+        test = np.zeros(len(coords), dtype=bool)
+        test[::args.holdout] = True
+        model = CentroidClassifier.fit(coords[~test], gestures[~test], margin=args.margin)
+        print(f"held-out accuracy: model {accuracy(model, coords[test], gestures[test]):.1%}, "
+              f"rules {accuracy(RuleClassifier(), coords[test], gestures[test]):.1%}")
+    model = CentroidClassifier.fit(coords, gestures, margin=args.margin)
+    model.save(args.out)
+    print(f"saved {len(model.classes)} gestures to {args.out} (max_dist {model.max_dist:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Translation layer for assistant responses. Wraps a googletrans-style
+# backend (backend.translate(text, dest=lang).text) with:
+#   - an identity short-circuit when the target is the source language
+#   - a bounded LRU keyed by (lang, text), optionally persisted as JSON
+#   - templates with {name} placeholders, so "The current time is {time}"
+#     is translated once per language and the value filled in afterwards
+#
+#   translations = TranslationCache(Translator(), path="translations.json")
+#   translations.format("Opening {name}...", "hi", name="Chrome")
+
+FIELD = re.compile(r"\{(\w+)\}")
+SLOT = re.compile(r"\{(\d+)\}")
+
+
+def protect(template):
+    # "{time}, {day}" -> ("{0}, {1}", ["time", "day"]); the backend leaves
+    # numbered slots alone where it would translate the names
+    names = list(dict.fromkeys(FIELD.findall(template)))
+    return FIELD.sub(lambda m: "{%d}" % names.index(m.group(1)), template), names
+
+
+class TranslationCache:
+    def __init__(self, backend=None, source="en", max_items=1024, path=None):
+        self.backend = backend
+        self.source = source
+        self.max_items = max_items
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def is_source(self, lang):
+        return not lang or lang.split("-")[0].lower() == self.source
+
+    def translate(self, text, lang):
+        if self.is_source(lang) or not text.strip():
+            return text
+        key = (lang, text)
+        with self.lock:
+            translated = self.entries.get(key)
+            if translated is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return translated
+            self.misses += 1
+        if self.backend is None:
+            from googletrans import Translator
+            self.backend = Translator()
+        translated = self.backend.translate(text, dest=lang).text
+        self.remember(key, translated)
+        return translated
+
+    def remember(self, key, translated):
+        with self.lock:
+            self.entries[key] = translated
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_items:
+                self.entries.popitem(last=False)
+
+    def translate_value(self, value, lang):
+        # words (a day name, a weather description) go through the cache on
+        # their own; numbers, times and percentages are left as they are
+        if isinstance(value, str) and any(c.isalpha() for c in value):
+            return self.translate(value, lang)
+        return str(value)
+
+    def format(self, template, lang, **values):
+        if not values:
+            return self.translate(template, lang)
+        if self.is_source(lang):
+            return template.format(**values)
+        protected, names = protect(template)
+        translated = self.translate(protected, lang)
+        if sorted(set(SLOT.findall(translated))) != [str(i) for i in range(len(names))]:
+            return self.translate(template.format(**values), lang)
+        filled = [self.translate_value(values[name], lang) for name in names]
+        return SLOT.sub(lambda m: filled[int(m.group(1))], translated)
+
+    def warm(self, lang, templates):
+        # translates templates in the background; returns the thread
+        def run():
+            if self.is_source(lang):
+                return
+            for template in templates:
+                try:
+                    self.translate(protect(template)[0], lang)
+                except Exception as e:
+                    print(f"Translation warm-up stopped ({e})")
+                    return
+            self.save()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            for lang, text, translated in rows[-self.max_items:]:
+                self.entries[(lang, text)] = translated
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            rows = [[lang, text, translated] for (lang, text), translated in self.entries.items()]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
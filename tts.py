@@ -0,0 +1,302 @@
+import hashlib
+import io
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict
+
+# Text-to-speech for the assistant: pluggable synthesis engines, an LRU
+# cache of synthesized audio (memory + disk) keyed by (engine, lang, text),
+# and a single playback worker that owns the pygame mixer.
+#
+#   speaker = Speaker(GTTSEngine(), AudioCache(cache_dir))
+#   speaker.say("Volume up", "en", on_start=..., on_done=...)   # returns at once
+#   speaker.cancel()                                            # stop and drop everything queued
+#
+# Long responses are streamed: split at sentence boundaries, synthesized a
+# few chunks ahead on a separate thread, and played from the first chunk
+# while the rest are still being produced. The first chunk is kept short so
+# time to first audio doesn't grow with the length of the response.
+
+SENTENCE_END = re.compile(r"(?<=[^\d\s][.!?।。])\s+|\n+")   # not after "1." in a list
+CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_chunks(text, first_chars=80, max_chars=220):
+    # sentences packed into chunks of up to max_chars; the first chunk is cut
+    # at a clause (or word) boundary if it is longer than first_chars
+    sentences = [s.strip() for s in SENTENCE_END.split(text) if s.strip()]
+    chunks = []
+    for sentence in sentences:
+        limit = first_chars if not chunks else max_chars
+        if len(chunks) > 1 and len(chunks[-1]) + len(sentence) < max_chars:
+            chunks[-1] += " " + sentence
+            continue
+        while len(sentence) > limit:
+            cut = max((m.end() for m in CLAUSE_END.finditer(sentence, 0, limit)), default=0)
+            if not cut:
+                cut = sentence.rfind(" ", 0, limit) + 1 or limit
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+            limit = max_chars
+        if sentence:
+            chunks.append(sentence)
+    return chunks or [text]
+
+
+class GTTSEngine:
+    # Google TTS over the network, mp3 output.
+    name = "gtts"
+    format = "mp3"
+
+    def synthesize(self, text, lang):
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class EspeakEngine:
+    # Local, offline: espeak-ng (or espeak) writing wav to stdout.
+    name = "espeak"
+    format = "wav"
+
+    def __init__(self, binary=None):
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak") or "espeak-ng"
+
+    def synthesize(self, text, lang):
+        return subprocess.run([self.binary, "-v", lang, "--stdout", text],
+                              capture_output=True, check=True, timeout=30).stdout
+
+
+class SilenceEngine:
+    # Offline and dependency free: a short silent wav per utterance. Lets the
+    # whole pipeline run in tests and on machines with no audio stack.
+    name = "silence"
+    format = "wav"
+
+    def __init__(self, seconds_per_char=0.0, rate=8000):
+        self.seconds_per_char = seconds_per_char
+        self.rate = rate
+
+    def synthesize(self, text, lang):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(1)
+            w.setframerate(self.rate)
+            w.writeframes(b"\x80" * int(self.rate * self.seconds_per_char * len(text)))
+        return buf.getvalue()
+
+
+ENGINES = {"gtts": GTTSEngine, "espeak": EspeakEngine, "silence": SilenceEngine}
+
+
+class AudioCache:
+    # Two-level LRU. Memory holds up to `max_items` clips; the disk directory
+    # is trimmed to `max_disk_bytes`, oldest access first.
+    def __init__(self, directory=None, max_items=64, max_disk_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, engine, text, lang):
+        digest = hashlib.sha1(f"{engine.name}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+        return f"{digest}.{engine.format}"
+
+    def get(self, key):
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                return data
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self.remember(key, data)
+        return data
+
+    def put(self, key, data):
+        self.remember(key, data)
+        if self.directory:
+            path = os.path.join(self.directory, key)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.trim_disk()
+
+    def remember(self, key, data):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_items:
+                self.memory.popitem(last=False)
+
+    def trim_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_mtime, st.st_size, path))
+        total = sum(e[2] for e in entries)
+        for _, _, size, path in sorted(entries, key=lambda e: max(e[0], e[1])):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def synthesize(self, engine, text, lang):
+        key = self.key(engine, text, lang)
+        data = self.get(key)
+        if data is None:
+            data = engine.synthesize(text, lang)
+            self.put(key, data)
+        return data
+
+
+class Utterance:
+    def __init__(self, chunks, lang, on_start, on_done, lookahead):
+        self.chunks = chunks
+        self.lang = lang
+        self.on_start = on_start
+        self.on_done = on_done
+        self.audio = queue.Queue(maxsize=lookahead)   # synthesized chunks, None at the end
+        self.cancelled = threading.Event()
+        self.queued_at = time.perf_counter()
+
+
+class Speaker:
+    # A synthesis thread fills each utterance's audio queue (through the
+    # cache, `lookahead` chunks ahead of playback); the playback thread owns
+    # the mixer, which is initialized once and kept up.
+    def __init__(self, engine, cache=None, stream=True, lookahead=2):
+        self.engine = engine
+        self.cache = cache or AudioCache()
+        self.stream = stream
+        self.lookahead = lookahead
+        self.synth_queue = queue.Queue()
+        self.play_queue = queue.Queue()
+        self.pending = []
+        self.lock = threading.Lock()
+        self.mixer = None
+        self.first_audio_s = None   # say() to first chunk playing, last utterance
+        self.synth_thread = threading.Thread(target=self.synthesize_loop, daemon=True)
+        self.play_thread = threading.Thread(target=self.play_loop, daemon=True)
+        self.synth_thread.start()
+        self.play_thread.start()
+
+    def say(self, text, lang="en", on_start=None, on_done=None):
+        chunks = split_chunks(text) if self.stream else [text]
+        utterance = Utterance(chunks, lang, on_start, on_done, self.lookahead)
+        with self.lock:
+            self.pending.append(utterance)
+        self.synth_queue.put(utterance)
+        self.play_queue.put(utterance)
+        return utterance
+
+    def cancel(self):
+        # stops what is playing and drops everything queued so far
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for utterance in pending:
+            utterance.cancelled.set()
+
+    def init_mixer(self):
+        if self.mixer is None:
+            import pygame
+            pygame.mixer.init()
+            self.mixer = pygame.mixer
+        return self.mixer
+
+    def play(self, data, cancelled):
+        mixer = self.init_mixer()
+        mixer.music.load(io.BytesIO(data), self.engine.format)
+        mixer.music.play()
+        while mixer.music.get_busy():
+            if cancelled.wait(0.02):
+                mixer.music.stop()
+                break
+
+    def synthesize_loop(self):
+        while True:
+            utterance = self.synth_queue.get()
+            if utterance is None:
+                break
+            for chunk in utterance.chunks:
+                if utterance.cancelled.is_set():
+                    break
+                try:
+                    data = self.cache.synthesize(self.engine, chunk, utterance.lang)
+                except Exception as e:
+                    print(f"TTS error: {e}")
+                    continue
+                while not utterance.cancelled.is_set():
+                    try:
+                        utterance.audio.put(data, timeout=0.05)
+                        break
+                    except queue.Full:
+                        pass
+            while not utterance.cancelled.is_set():
+                try:
+                    utterance.audio.put(None, timeout=0.05)
+                    break
+                except queue.Full:
+                    pass
+
+    def play_loop(self):
+        while True:
+            utterance = self.play_queue.get()
+            if utterance is None:
+                break
+            started = False
+            try:
+                while not utterance.cancelled.is_set():
+                    try:
+                        data = utterance.audio.get(timeout=0.05)
+                    except queue.Empty:
+                        continue
+                    if data is None:
+                        break
+                    if not started:
+                        started = True
+                        self.first_audio_s = time.perf_counter() - utterance.queued_at
+                        if utterance.on_start:
+                            utterance.on_start()
+                    self.play(data, utterance.cancelled)
+            except Exception as e:
+                print(f"TTS error: {e}")
+            finally:
+                with self.lock:
+                    if utterance in self.pending:
+                        self.pending.remove(utterance)
+                if utterance.on_done:
+                    utterance.on_done()
+
+    def close(self):
+        self.cancel()
+        self.synth_queue.put(None)
+        self.play_queue.put(None)
+        self.synth_thread.join(timeout=1.0)
+        self.play_thread.join(timeout=1.0)
@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+
+# One-way control channel from Python to the web UI. Everything that talks
+# to the page (chat messages, mic on/off) is posted to a queue and sent by a
+# single dispatcher thread as fire-and-forget eel calls, i.e. eel.fn(args)
+# without the trailing () that would wait for the browser's reply. Keyboard
+# hooks, the speaker and chat handlers only ever enqueue.
+#
+#   ui = UiChannel(eel).start()
+#   ui.send("addMsgToChat", "Hello")
+#   ui.push_to_talk(True)                       # from a key hook; never blocks
+#   ui.speech_started(token) / ui.speech_ended(token)
+#
+# The mic is driven by MicState and only its transitions reach the page, so
+# repeated key events and overlapping speech can't leave it out of step.
+
+
+class MicState:
+    # The mic is open when the user wants it and nothing is being spoken.
+    # Hands-free (the page starts listening on load) until push-to-talk is
+    # first used; after that it follows the key. Speech closes it and it
+    # reopens when the last utterance ends, if it is still wanted.
+    def __init__(self, hands_free=True):
+        self.hands_free = hands_free
+        self.ptt_held = False
+        self.speaking = set()
+
+    def push_to_talk(self, active):
+        self.hands_free = False
+        self.ptt_held = active
+
+    def speech_started(self, token):
+        self.speaking.add(token)
+
+    def speech_ended(self, token):
+        self.speaking.discard(token)
+
+    @property
+    def open(self):
+        return (self.hands_free or self.ptt_held) and not self.speaking
+
+
+class UiChannel:
+    def __init__(self, target, debounce=0.05, mic=None):
+        # target: the eel module, or anything with the page's functions
+        self.target = target
+        self.debounce = debounce
+        self.mic = mic or MicState()
+        self.mic_sent = self.mic.open   # what the page is doing right now
+        self.queue = queue.Queue()
+        self.stats = {'calls': 0, 'mic_events': 0, 'mic_changes': 0, 'errors': 0}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def send(self, name, *args):
+        self.queue.put(('call', name, args))
+
+    def push_to_talk(self, active):
+        self.queue.put(('push_to_talk', active))
+
+    def speech_started(self, token):
+        self.queue.put(('speech_started', token))
+
+    def speech_ended(self, token):
+        self.queue.put(('speech_ended', token))
+
+    def call(self, name, args):
+        self.stats['calls'] += 1
+        try:
+            getattr(self.target, name)(*args)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"UI call {name} failed ({e!r})")
+
+    def handle(self, item):
+        kind, value = item[0], item[1:]
+        if kind == 'call':
+            self.call(*value)
+        else:
+            self.stats['mic_events'] += 1
+            getattr(self.mic, kind)(*value)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            self.handle(item)
+            if self.mic.open == self.mic_sent:
+                continue
+            # let a burst of key/speech events settle before touching the mic
+            deadline = time.perf_counter() + self.debounce
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    return
+                self.handle(item)
+            if self.mic.open != self.mic_sent:
+                self.mic_sent = self.mic.open
+                self.stats['mic_changes'] += 1
+                self.call("startListening" if self.mic_sent else "stopListening", ())
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=1.0)
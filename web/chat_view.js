@@ -0,0 +1,257 @@
+// ====== Virtualized chat log ======
+// Only the messages in or near the viewport are in the DOM, and at most
+// maxMessages are held in memory; the rest of the history stays with Python
+// (chat_history.py) and is paged in with eel.getHistory as the user scrolls
+// to either end. Heights are measured once per message and cached, and all
+// reading, rendering and scrolling happens once per animation frame however
+// many messages arrive in it.
+//
+//   const chat = new ChatView(document.getElementById("chat-box"));
+//   chat.loadLatest().then(() => eel.uiReady());
+//   const message = chat.add("You", text, "user-msg");
+//   eel.getUserInput(text)(id => chat.setId(message, id));
+//   chat.add("Bot", reply, "bot-msg", id);   // id from Python, skipped if already shown
+
+class ChatView {
+  constructor(box, options = {}) {
+    this.box = box;
+    this.maxMessages = options.maxMessages || 300;
+    this.pageSize = options.pageSize || 50;
+    this.overscan = options.overscan || 400;   // px rendered past each edge of the viewport
+    this.estimate = options.estimate || 56;    // px for a message not measured yet
+    this.messages = [];       // {id, sender, text, cls, height}
+    this.hasOlder = false;    // Python has turns before messages[0]
+    this.hasNewer = false;    // ... and after the last one (scrolled back through history)
+    this.loading = false;
+    this.stick = true;        // keep the newest message in view
+    this.anchor = null;       // {message, offset}: what stays put while scrolled up
+    this.scrolled = false;
+    this.nodes = new Map();   // message -> its row, for the rendered ones
+    this.rows = [];
+    this.laidOut = [];        // messages and offsets as of the last frame
+    this.offsets = [0];
+    this.pad = null;
+    this.frame = 0;
+
+    this.top = document.createElement("div");
+    this.list = document.createElement("div");
+    this.bottom = document.createElement("div");
+    this.footer = document.createElement("div");
+    box.replaceChildren(this.top, this.list, this.bottom, this.footer);
+    box.addEventListener("scroll", () => { this.scrolled = true; this.schedule(); }, { passive: true });
+    window.addEventListener("resize", () => {
+      // widths changed, so every cached height may be wrong
+      this.messages.forEach(message => { message.height = 0; });
+      this.schedule();
+    });
+  }
+
+  // ---------- Messages ----------
+  add(sender, text, cls, id = null) {
+    if (id !== null && this.find(id)) return null;
+    if (this.hasNewer) {
+      // scrolled back through history, so the newest turns aren't loaded:
+      // the user's own message jumps back to the end, others wait for loadNewer
+      if (sender !== "You") return null;
+      this.messages = [];
+      this.hasNewer = false;
+      this.hasOlder = true;
+    }
+    const message = { id, sender, text, cls, height: 0 };
+    this.messages.push(message);
+    if (sender === "You") this.stick = true;
+    this.trim(!this.stick);
+    this.schedule();
+    return message;
+  }
+
+  setId(message, id) {
+    // the id Python gave a message added before it knew it
+    if (message) message.id = id;
+    this.schedule();
+  }
+
+  setFooter(node) {
+    // e.g. a typing indicator, kept below the newest message
+    this.footer.replaceChildren(...(node ? [node] : []));
+    this.schedule();
+  }
+
+  find(id) {
+    for (let i = this.messages.length - 1; i >= 0; i--) {
+      if (this.messages[i].id === id) return this.messages[i];
+    }
+    return null;
+  }
+
+  trim(dropNewest) {
+    // over maxMessages: drop from the end away from what's being read
+    const extra = this.messages.length - this.maxMessages;
+    if (extra <= 0) return;
+    if (dropNewest) {
+      this.messages.splice(this.maxMessages);
+      this.hasNewer = true;
+      this.stick = false;
+    } else {
+      this.messages.splice(0, extra);
+      this.hasOlder = true;
+    }
+  }
+
+  // ---------- History paging ----------
+  fetch(before, after) {
+    this.loading = true;
+    return eel.getHistory(before, after, this.pageSize)()
+      .then(turns => turns.map(turn => ({
+        id: turn.id, sender: turn.sender === "user" ? "You" : "Bot", text: turn.text,
+        cls: turn.sender === "user" ? "user-msg" : "bot-msg", height: 0,
+      })))
+      .catch(error => { console.error("getHistory failed:", error); return null; })
+      .finally(() => { this.loading = false; this.schedule(); });
+  }
+
+  loadLatest() {
+    return this.fetch(null, null).then(turns => {
+      if (!turns) return;
+      // keep whatever arrived while the page was on its way
+      const known = new Set(turns.map(turn => turn.id));
+      const live = this.messages.filter(message => message.id === null || !known.has(message.id));
+      this.messages = turns.concat(live);
+      this.hasOlder = turns.length === this.pageSize;
+      this.hasNewer = false;
+      this.stick = true;
+      this.trim(false);
+    });
+  }
+
+  loadOlder() {
+    const first = this.messages[0];
+    if (this.loading || !this.hasOlder || !first || first.id === null) return;
+    this.fetch(first.id, null).then(turns => {
+      if (!turns || this.messages[0] !== first) return;
+      this.hasOlder = turns.length === this.pageSize;
+      this.messages.unshift(...turns);
+      this.trim(true);
+    });
+  }
+
+  loadNewer() {
+    const last = this.messages[this.messages.length - 1];
+    if (this.loading || !this.hasNewer || !last || last.id === null) return;
+    this.fetch(null, last.id).then(turns => {
+      if (!turns || this.messages[this.messages.length - 1] !== last) return;
+      this.hasNewer = turns.length === this.pageSize;
+      this.messages.push(...turns);
+      this.trim(false);
+    });
+  }
+
+  // ---------- Rendering ----------
+  schedule() {
+    if (!this.frame) this.frame = requestAnimationFrame(() => this.render());
+  }
+
+  row(message) {
+    let row = this.nodes.get(message);
+    if (row) return row;
+    // a flex row keeps the message's margins inside it, so one offsetHeight
+    // is the whole height, and lets user/bot messages align to their side
+    row = document.createElement("div");
+    row.style.display = "flex";
+    row.style.flexDirection = "column";
+    const div = document.createElement("div");
+    div.classList.add("message", message.cls);
+    div.innerText = (message.sender === "Bot" ? "🤖 " : "🧑 ") + message.text;
+    row.appendChild(div);
+    return row;
+  }
+
+  indexAt(offsets, y) {
+    // the message whose box contains content offset y
+    let lo = 0, hi = offsets.length - 2;
+    while (lo < hi) {
+      const mid = (lo + hi + 1) >> 1;
+      if (offsets[mid] <= y) lo = mid; else hi = mid - 1;
+    }
+    return Math.max(0, lo);
+  }
+
+  anchorAt(y) {
+    if (!this.laidOut.length) return null;
+    const i = this.indexAt(this.offsets, y);
+    return { message: this.laidOut[i], offset: y - this.offsets[i] };
+  }
+
+  render() {
+    this.frame = 0;
+    const box = this.box;
+    if (this.pad === null) this.pad = parseFloat(getComputedStyle(box).paddingTop) || 0;
+
+    // reads first, all from the layout the last frame left
+    const scrollTop = box.scrollTop;
+    const viewport = box.clientHeight;
+    const scrollHeight = box.scrollHeight;
+    for (const [message, row] of this.nodes) {
+      message.height = row.offsetHeight || message.height;
+    }
+    if (this.scrolled) {
+      this.scrolled = false;
+      this.stick = !this.hasNewer && scrollTop + viewport >= scrollHeight - 24;
+      this.anchor = this.stick ? null : this.anchorAt(scrollTop - this.pad);
+    }
+
+    const messages = this.messages;
+    const offsets = new Array(messages.length + 1);
+    offsets[0] = 0;
+    messages.forEach((message, i) => { offsets[i + 1] = offsets[i] + (message.height || this.estimate); });
+    const total = offsets[messages.length];
+
+    // where the view should be: at the end, or where the anchor message now is
+    let y = scrollTop - this.pad;
+    if (this.stick) {
+      y = Math.max(0, total - viewport);
+    } else if (this.anchor) {
+      const i = messages.indexOf(this.anchor.message);
+      if (i >= 0) y = offsets[i] + this.anchor.offset;
+    }
+
+    // writes: spacers stand in for everything outside the window
+    const rows = [];
+    const nodes = new Map();
+    let unmeasured = false;
+    if (messages.length) {
+      const first = this.indexAt(offsets, y - this.overscan);
+      const last = this.indexAt(offsets, y + viewport + this.overscan);
+      for (let i = first; i <= last; i++) {
+        const row = this.row(messages[i]);
+        nodes.set(messages[i], row);
+        rows.push(row);
+        unmeasured = unmeasured || !this.nodes.has(messages[i]);
+      }
+      this.top.style.height = offsets[first] + "px";
+      this.bottom.style.height = (total - offsets[last + 1]) + "px";
+    } else {
+      this.top.style.height = this.bottom.style.height = "0px";
+    }
+    if (rows.length !== this.rows.length || rows.some((row, i) => row !== this.rows[i])) {
+      this.list.replaceChildren(...rows);
+    }
+    this.rows = rows;
+    this.nodes = nodes;
+    this.laidOut = messages.slice();
+    this.offsets = offsets;
+
+    if (this.stick) {
+      box.scrollTop = box.scrollHeight;
+    } else if (Math.abs(y - (scrollTop - this.pad)) >= 1) {
+      box.scrollTop = y + this.pad;
+    }
+    if (!this.stick) this.anchor = this.anchorAt(y);
+
+    // page in more history when either end of what's loaded is near
+    if (y < viewport) this.loadOlder();
+    if (total - y - viewport < viewport) this.loadNewer();
+    // new rows are placed at estimated heights; settle them next frame
+    if (unmeasured) this.schedule();
+  }
+}
@@ -55,17 +55,17 @@ function speak(text) {
 }
 
 // ---------- Chat UI helpers ----------
-function addMessage(sender, text, cls) {
-  const msgDiv = document.createElement("div");
-  msgDiv.classList.add("message", cls);
-  msgDiv.innerText = (sender === "Bot" ? "🤖 " : "🧑 ") + text;
-  chatBoxEl.appendChild(msgDiv);
-  chatBoxEl.scrollTop = chatBoxEl.scrollHeight;
+// needs chat_view.js; only the visible messages are kept in the DOM
+const chat = new ChatView(chatBoxEl);
+chat.loadLatest();
+
+function addMessage(sender, text, cls, id) {
+  return chat.add(sender, text, cls, id);
 }
 
-// Expose to Python: addMsgToChat(msg)
+// Expose to Python: addMsgToChat(msg, id)
 eel.expose(addMsgToChat);
-function addMsgToChat(msg) {
+function addMsgToChat(msg, id) {
   console.log("Message from Python:", msg);
   // Python already calls eel.speak(msg), so we don't auto-speak here
 }
@@ -77,14 +77,12 @@ function showTypingIndicator() {
   typing.id = "typing";
   typing.classList.add("typing");
   typing.innerText = "🤖 Bot is typing...";
-  chatBoxEl.appendChild(typing);
-  chatBoxEl.scrollTop = chatBoxEl.scrollHeight;
+  chat.setFooter(typing);
 }
 
 eel.expose(hideTypingIndicator);
 function hideTypingIndicator() {
-  const typing = document.getElementById("typing");
-  if (typing) typing.remove();
+  chat.setFooter(null);
 }
 
 
@@ -93,8 +91,8 @@ function sendMessage() {
   const msg = userInputEl.value.trim();
   if (!msg) return;
 
-  addMessage("You", msg, "user-msg");
-  eel.getUserInput(msg);
+  const message = addMessage("You", msg, "user-msg");
+  eel.getUserInput(msg)(id => chat.setId(message, id));
   userInputEl.value = "";
 }
 
@@ -130,8 +128,8 @@ let recognizing = false;
   recognition.onresult = function (event) {
     try {
       const transcript = event.results[0][0].transcript;
-      addMessage("You", transcript, "user-msg");
-      eel.getUserInput(transcript);
+      const message = addMessage("You", transcript, "user-msg");
+      eel.getUserInput(transcript)(id => chat.setId(message, id));
     } catch (e) {
       console.error("onresult error:", e);
     }